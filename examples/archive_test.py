@@ -0,0 +1,85 @@
+import io
+import os
+import tarfile
+import tempfile
+import zipfile
+
+from py_context_fs.resolvers import ArchiveResolver
+
+_MEMBERS = {
+    "rubrics/math/grade_1.md": "Fractions: halves and thirds",
+    "rubrics/math/grade_1.summary.md": "Fractions",
+    "rubrics/science/grade_2.md": "Plants need light – café",
+    "readme.txt": "Rubric archive",
+}
+
+
+def _write_zip(path: str) -> None:
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, content in _MEMBERS.items():
+            archive.writestr(name, content)
+
+
+def _write_tar(path: str) -> None:
+    with tarfile.open(path, "w") as archive:
+        for name, content in _MEMBERS.items():
+            data = content.encode("utf-8")
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = 1_700_000_000
+            archive.addfile(info, io.BytesIO(data))
+
+
+def test_zip_and_tar_archives_serve_members() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, write in (("rubrics.zip", _write_zip), ("rubrics.tar", _write_tar)):
+            archive_path = os.path.join(tmp, name)
+            write(archive_path)
+            with ArchiveResolver(archive_path, cache_bytes=16) as resolver:
+                assert len(resolver) == 4
+                assert resolver.read("rubrics/math/grade_1.md").content == _MEMBERS["rubrics/math/grade_1.md"]
+                assert resolver.read("rubrics/math/grade_1.md", "summary").content == "Fractions"
+                assert "".join(resolver.read_stream("rubrics/science/grade_2.md", chunk_size=3)) == (
+                    "Plants need light – café"
+                )
+                file_stat = resolver.stat("rubrics/math/grade_1.md")
+                assert file_stat.views == ["default", "summary"]
+                assert file_stat.sizes["summary"] == 9
+                assert resolver.list("rubrics") == [
+                    "rubrics/math/grade_1.md",
+                    "rubrics/math/grade_1.summary.md",
+                    "rubrics/science/grade_2.md",
+                ]
+                assert list(resolver.ilist("", limit=1, cursor="readme.txt")) == ["rubrics/math/grade_1.md"]
+                assert resolver.glob("rubrics/*/grade_*.md")[0] == "rubrics/math/grade_1.md"
+                assert resolver.search("café") == ["rubrics/science/grade_2.md"]
+                assert resolver.search("Fractions") == ["rubrics/math/grade_1.md", "rubrics/math/grade_1.summary.md"]
+                for call, error in (
+                    (lambda: resolver.read("missing.md"), FileNotFoundError),
+                    (lambda: resolver.write("readme.txt", "changed"), PermissionError),
+                ):
+                    try:
+                        call()
+                    except error:
+                        pass
+                    else:
+                        raise AssertionError(f"{name}: expected {error.__name__}")
+
+
+def test_rejects_other_files() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "notes.txt")
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write("not an archive")
+        try:
+            ArchiveResolver(path)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("plain file accepted as an archive")
+
+
+if __name__ == "__main__":
+    test_zip_and_tar_archives_serve_members()
+    test_rejects_other_files()
+    print("Archive resolver tests passed.")
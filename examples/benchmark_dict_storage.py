@@ -0,0 +1,81 @@
+import gc
+import os
+import random
+import sys
+import tracemalloc
+
+# Ensure the package is in python path
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from py_context_fs.resolvers import DictResolver
+
+WORDS = (
+    "student assessment module score feedback rubric essay analysis draft "
+    "revision concept understanding evidence reasoning summary teacher note "
+    "improvement strength weakness question answer reference"
+).split()
+
+
+def make_record(rng: random.Random, index: int):
+    default = " ".join(rng.choice(WORDS) for _ in range(rng.randint(150, 300)))
+    summary = " ".join(rng.choice(WORDS) for _ in range(rng.randint(12, 24)))
+    metadata = {
+        "priority": rng.random(),
+        "token_count": rng.randint(150, 300),
+        "student_id": f"s{index % 500}",
+        "kind": "assessment",
+    }
+    return f"students/{index % 500}/assessment_{index}.txt", {"default": default, "summary": summary}, metadata
+
+
+def bytes_per_record(count: int, **options) -> float:
+    """Returns the traced bytes retained per populated record."""
+    rng = random.Random(0)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    resolver = DictResolver(**options)
+    for index in range(count):
+        resolver.populate(*make_record(rng, index))
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del resolver
+    return (after - before) / count
+
+
+def sample_dictionary(size: int = 32 * 1024) -> bytes:
+    """Builds a zlib preset dictionary from records outside the measured set."""
+    rng = random.Random(1)
+    sample = []
+    while sum(len(text) for text in sample) < size:
+        _, views, _ = make_record(rng, 0)
+        sample.extend(view.encode("utf-8") for view in views.values())
+    return b"".join(sample)[-size:]
+
+
+def main():
+    count = 20_000
+    zdict = sample_dictionary()
+    configurations = [
+        ("plain dicts", {}),
+        ("compact", {"compact": True}),
+        ("compact + zlib", {"compact": True, "compression": "zlib"}),
+        ("compact + lzma", {"compact": True, "compression": "lzma"}),
+        ("compact + zlib/dict", {
+            "compact": True,
+            "compression": "zlib",
+            "compress_threshold": 64,
+            "compression_dictionary": zdict,
+        }),
+    ]
+    baseline = None
+    print(f"{'storage':<20} {'bytes/record':>13} {'vs plain':>9}")
+    for name, options in configurations:
+        size = bytes_per_record(count, **options)
+        baseline = baseline or size
+        print(f"{name:<20} {size:>13.0f} {baseline / size:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import os
+import sys
+import timeit
+
+# Ensure the package is in python path
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from py_context_fs.core import ContextRouter
+from py_context_fs.resolvers import DictResolver
+
+
+def build_router(mount_count: int, resolve_cache_size: int) -> ContextRouter:
+    fs = ContextRouter(resolve_cache_size=resolve_cache_size)
+    resolver = DictResolver()
+    for index in range(mount_count):
+        fs.mount(f"/tenants/{index}", resolver)
+    fs.mount("/system", resolver)
+    return fs
+
+
+def bench(mount_count: int, resolve_cache_size: int, number: int = 20000) -> float:
+    """Returns the mean resolve latency in microseconds."""
+    fs = build_router(mount_count, resolve_cache_size)
+    # Touch a spread of tenants so the memo (when enabled) sees a realistic mix.
+    paths = [
+        f"/tenants/{index}/history/assessment_{index % 7}.json"
+        for index in range(0, mount_count, max(1, mount_count // 64))
+    ]
+    count = len(paths)
+    counter = iter(range(10 ** 9))
+
+    def resolve() -> None:
+        fs._resolve(paths[next(counter) % count])
+
+    seconds = timeit.timeit(resolve, number=number)
+    return seconds / number * 1e6
+
+
+def main():
+    print(f"{'mounts':>8} {'uncached (us)':>14} {'memoized (us)':>14}")
+    for mount_count in (10, 1_000, 10_000):
+        uncached = bench(mount_count, resolve_cache_size=0)
+        memoized = bench(mount_count, resolve_cache_size=4096)
+        print(f"{mount_count:>8} {uncached:>14.2f} {memoized:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
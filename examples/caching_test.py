@@ -0,0 +1,89 @@
+import os
+import tempfile
+
+from py_context_fs.resolvers import CachingSource, DictResolver, LocalFileResolver
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_hits_are_private_copies() -> None:
+    resolver = DictResolver()
+    resolver.populate("a.txt", {"default": "fractions"}, {"priority": 1})
+    cache = CachingSource(resolver)
+    first = cache.read("a.txt")
+    first.metadata["priority"] = 99
+    first.content = "mutated"
+    second = cache.read("a.txt")
+    assert second.content == "fractions"
+    assert second.metadata == {"priority": 1}
+    second.metadata["priority"] = 42
+    assert cache.read("a.txt").metadata == {"priority": 1}
+    assert cache.stats().hits == 2
+
+
+def test_expired_entries_are_purged_on_insert() -> None:
+    resolver = DictResolver()
+    for name in ("a", "b", "c"):
+        resolver.populate(f"{name}.txt", {"default": name * 10})
+    clock = _Clock()
+    cache = CachingSource(resolver, ttl=10.0, clock=clock)
+    cache.read("a.txt")
+    cache.read("b.txt")
+    clock.now = 11.0
+    cache.read("c.txt")
+    stats = cache.stats()
+    assert stats.entries == 1
+    assert stats.expirations == 2
+    assert stats.size_bytes == 10
+
+
+def test_unloaded_lazy_files_are_not_cached() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, "big.txt"), "w", encoding="utf-8") as handle:
+            handle.write("x" * 4096)
+        cache = CachingSource(LocalFileResolver(tmp, mmap_threshold=1024))
+        lazy = cache.read("big.txt")
+        assert not lazy.is_loaded
+        assert cache.stats().entries == 0
+        assert cache.read("big.txt").content == "x" * 4096
+
+
+def test_budget_counts_utf8_bytes() -> None:
+    resolver = DictResolver()
+    resolver.populate("a.txt", {"default": "é" * 100})
+    resolver.populate("b.txt", {"default": "e" * 100})
+    cache = CachingSource(resolver, max_bytes=250)
+    cache.read("a.txt")
+    cache.read("b.txt")
+    # 200 + 100 bytes exceed the budget although both files are 100 characters.
+    stats = cache.stats()
+    assert (stats.entries, stats.size_bytes, stats.evictions) == (1, 100, 1)
+
+
+def test_lru_eviction_respects_max_bytes() -> None:
+    resolver = DictResolver()
+    for index in range(5):
+        resolver.populate(f"{index}.txt", {"default": "y" * 100})
+    cache = CachingSource(resolver, max_bytes=250)
+    for index in range(5):
+        cache.read(f"{index}.txt")
+    stats = cache.stats()
+    assert stats.entries == 2
+    assert stats.evictions == 3
+    cache.write("0.txt", "rewritten")
+    assert cache.read("0.txt").content == "rewritten"
+
+
+if __name__ == "__main__":
+    test_hits_are_private_copies()
+    test_expired_entries_are_purged_on_insert()
+    test_unloaded_lazy_files_are_not_cached()
+    test_budget_counts_utf8_bytes()
+    test_lru_eviction_respects_max_bytes()
+    print("Caching source tests passed.")
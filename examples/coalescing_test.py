@@ -0,0 +1,157 @@
+import asyncio
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from py_context_fs.core import AsyncContextSource, ContextFile
+from py_context_fs.resolvers import AsyncCoalescingSource, CoalescingSource, DictResolver
+
+
+class _SlowResolver(DictResolver):
+    def __init__(self, delay: float):
+        super().__init__()
+        self.delay = delay
+        self.reads = 0
+        self.searches = 0
+
+    def read(self, path: str, view: str = "default") -> ContextFile:
+        self.reads += 1
+        try:
+            return super().read(path, view)
+        finally:
+            time.sleep(self.delay)
+
+    def search(self, query: str) -> List[str]:
+        self.searches += 1
+        results = super().search(query)
+        time.sleep(self.delay)
+        return results
+
+
+class _SlowAsyncSource(AsyncContextSource):
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.reads = 0
+        self.files: Dict[str, str] = {"a.txt": "fractions"}
+
+    async def aread(self, path: str, view: str = "default") -> ContextFile:
+        self.reads += 1
+        await asyncio.sleep(self.delay)
+        if path not in self.files:
+            raise FileNotFoundError(path)
+        return ContextFile(content=self.files[path], metadata={})
+
+    async def alist(self, path: str) -> List[str]:
+        return sorted(self.files)
+
+    async def asearch(self, query: str) -> List[str]:
+        return [path for path, content in self.files.items() if query in content]
+
+    async def awrite(self, path: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        self.files[path] = content
+
+
+def _run_threads(count: int, target) -> List[Any]:
+    results: List[Any] = [None] * count
+
+    def run(index: int) -> None:
+        try:
+            results[index] = target()
+        except Exception as exc:
+            results[index] = exc
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_reads_and_searches_share_one_call() -> None:
+    resolver = _SlowResolver(0.1)
+    resolver.populate("a.txt", {"default": "fractions"})
+    source = CoalescingSource(resolver)
+
+    files = _run_threads(5, lambda: source.read("a.txt"))
+    assert resolver.reads == 1
+    assert all(file_obj is files[0] for file_obj in files)
+    assert files[0].content == "fractions"
+
+    results = _run_threads(4, lambda: source.search("fractions"))
+    assert resolver.searches == 1
+    assert results == [["a.txt"]] * 4 and results[0] is not results[1]
+
+    errors = _run_threads(3, lambda: source.read("missing.txt"))
+    assert all(isinstance(error, FileNotFoundError) for error in errors)
+    stats = source.stats()
+    assert (stats.backend_calls, stats.coalesced, stats.in_flight) == (3, 9, 0)
+
+
+def test_reads_after_a_write_never_join_older_calls() -> None:
+    resolver = _SlowResolver(0.2)
+    resolver.populate("a.txt", {"default": "old"})
+    source = CoalescingSource(resolver)
+    started = threading.Event()
+    first = []
+
+    def read_before_write() -> None:
+        started.set()
+        first.append(source.read("a.txt").content)
+
+    reader = threading.Thread(target=read_before_write)
+    reader.start()
+    started.wait()
+    time.sleep(0.05)
+    source.write("a.txt", "new")
+    assert source.read("a.txt").content == "new"
+    reader.join()
+    assert first == ["old"]
+    assert resolver.reads == 2
+
+
+def test_read_many_joins_in_flight_reads() -> None:
+    resolver = _SlowResolver(0.1)
+    resolver.populate("a.txt", {"default": "fractions"})
+    resolver.populate("b.txt", {"default": "decimals"})
+    source = CoalescingSource(resolver)
+    reader = threading.Thread(target=source.read, args=("a.txt",))
+    reader.start()
+    time.sleep(0.05)
+    files = source.read_many(["a.txt", "b.txt", "missing.txt"])
+    reader.join()
+    assert {key: file_obj.content for key, file_obj in files.items()} == {
+        ("a.txt", "default"): "fractions",
+        ("b.txt", "default"): "decimals",
+    }
+    # "a.txt" was joined; the batch only fetched the other two.
+    assert source.stats().coalesced == 1
+    assert resolver.reads == 3
+
+
+def test_async_waiters_share_one_task_and_survive_cancellation() -> None:
+    async def scenario() -> None:
+        wrapped = _SlowAsyncSource(0.1)
+        source = AsyncCoalescingSource(wrapped)
+        cancelled = asyncio.ensure_future(source.aread("a.txt"))
+        await asyncio.sleep(0)
+        waiters = [source.aread("a.txt") for _ in range(3)]
+        cancelled.cancel()
+        files = await asyncio.gather(*waiters)
+        assert [file_obj.content for file_obj in files] == ["fractions"] * 3
+        assert wrapped.reads == 1
+
+        results = await asyncio.gather(*(source.aread("missing.txt") for _ in range(2)), return_exceptions=True)
+        assert all(isinstance(result, FileNotFoundError) for result in results)
+        stats = source.stats()
+        assert (stats.backend_calls, stats.coalesced, stats.in_flight) == (2, 4, 0)
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    test_concurrent_reads_and_searches_share_one_call()
+    test_reads_after_a_write_never_join_older_calls()
+    test_read_many_joins_in_flight_reads()
+    test_async_waiters_share_one_task_and_survive_cancellation()
+    print("Coalescing source tests passed.")
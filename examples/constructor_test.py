@@ -0,0 +1,97 @@
+import asyncio
+from typing import List, Tuple
+
+from py_context_fs.core import AsyncContextRouter, ContextRouter, SearchReport
+from py_context_fs.pipeline import (
+    AsyncContextConstructor,
+    AsyncContextLoader,
+    ContextConstructor,
+    ContextLoader,
+    SelectionCriteria,
+)
+from py_context_fs.resolvers import DictResolver
+
+
+def _resolver() -> DictResolver:
+    resolver = DictResolver()
+    for index in range(7):
+        resolver.populate(
+            f"notes/{index}.txt",
+            {"default": f"fractions lesson {index} " * (index + 1), "summary": f"lesson {index}"},
+            {"priority": index % 3},
+        )
+    resolver.populate("other/x.txt", {"default": "geometry"})
+    return resolver
+
+
+def _word_count(text: str) -> int:
+    return len(text.split())
+
+
+def _routers() -> Tuple[ContextRouter, AsyncContextRouter]:
+    resolver = _resolver()
+    fs = ContextRouter()
+    fs.mount("/m", resolver)
+    afs = AsyncContextRouter()
+    afs.mount("/m", resolver)
+    return fs, afs
+
+
+def test_sync_and_async_manifests_match() -> None:
+    fs, afs = _routers()
+    cases = [
+        SelectionCriteria(query="fractions"),
+        SelectionCriteria(query="fractions", ranked_search=True, search_limit=3),
+        SelectionCriteria(directories=["/m/notes", "/m/other"], max_results=4),
+        SelectionCriteria(directories=["/m"], time_range=(0, None), exclude_patterns=[r"other"]),
+        SelectionCriteria(paths=["/m/other/x.txt"], query="lesson", max_tokens=12, token_counter=_word_count),
+    ]
+    for criteria in cases:
+        expected = ContextConstructor(fs, list_page_size=2).construct(criteria)
+        actual = asyncio.run(AsyncContextConstructor(afs, list_page_size=2).construct(criteria))
+        assert actual == expected, criteria
+        assert expected.files
+
+
+def test_sync_and_async_loads_match() -> None:
+    fs, afs = _routers()
+    manifest = ContextConstructor(fs).construct(SelectionCriteria(directories=["/m"]))
+    for max_tokens in (0, 10, 40, 1000):
+        expected = ContextLoader(fs).load(manifest, max_tokens)
+        actual = asyncio.run(AsyncContextLoader(afs).load(manifest, max_tokens))
+        assert actual == expected, max_tokens
+        assert ContextLoader(fs, lazy=True).load(manifest, max_tokens) == expected
+    assert "(Summary)" in ContextLoader(fs).load(manifest, 40)
+
+
+def test_sync_and_async_router_searches_match() -> None:
+    fs, afs = _routers()
+    extra = DictResolver()
+    extra.populate("y.txt", {"default": "fractions again"})
+    fs.mount("/x", extra)
+    afs.mount("/x", extra)
+
+    async def search_iter(limit: int) -> Tuple[List[str], SearchReport]:
+        report = SearchReport()
+        paths = [path async for path in afs.search_iter("fractions", limit=limit, report=report)]
+        return paths, report
+
+    for limit in (1, 3):
+        sync_report = SearchReport()
+        expected = sorted(fs.search_iter("fractions", limit=limit, report=sync_report))
+        paths, report = asyncio.run(search_iter(limit))
+        assert sorted(paths) == sorted(report.paths) == expected
+        assert report.complete and sync_report.complete
+        assert "/x/y.txt" in expected
+
+    for k in (None, 2):
+        expected_ranked = fs.search_ranked("fractions", k)
+        assert asyncio.run(afs.search_ranked("fractions", k)) == expected_ranked
+        assert expected_ranked
+
+
+if __name__ == "__main__":
+    test_sync_and_async_manifests_match()
+    test_sync_and_async_loads_match()
+    test_sync_and_async_router_searches_match()
+    print("Constructor tests passed.")
@@ -0,0 +1,39 @@
+from py_context_fs.resolvers import DictResolver
+
+
+def test_compact_compressed_round_trip() -> None:
+    resolver = DictResolver(compact=True, compression="zlib", compress_threshold=16, search_index="ngram")
+    long_text = "Fractions and decimals. " * 20
+    resolver.populate("notes/a.txt", {"default": long_text, "summary": "short"}, {"priority": 3})
+    resolver.write("notes/b.txt", "tiny")
+    assert resolver.read("notes/a.txt").content == long_text
+    assert resolver.read("notes/a.txt", "summary").content == "short"
+    assert resolver.read("notes/a.txt").metadata == {"priority": 3}
+    assert resolver.stat("notes/a.txt").sizes == {"default": len(long_text), "summary": 5}
+    assert resolver.search("decimals") == ["notes/a.txt"]
+    assert resolver.search("ny") == ["notes/b.txt"]
+
+
+def test_hot_cache_never_keeps_replaced_views() -> None:
+    resolver = DictResolver(compact=True, compression="zlib", compress_threshold=1)
+    resolver.populate("a.txt", {"default": "old content"})
+    store = resolver._store
+    compress, decompress = store._codec
+    replaced = []
+
+    def decompress_racing_a_write(data: bytes) -> bytes:
+        if not replaced:
+            # A concurrent writer replaces the file mid-decompression.
+            replaced.append(True)
+            resolver.populate("a.txt", {"default": "new content"})
+        return decompress(data)
+
+    store._codec = (compress, decompress_racing_a_write)
+    assert resolver.read("a.txt").content == "old content"
+    assert resolver.read("a.txt").content == "new content"
+
+
+if __name__ == "__main__":
+    test_compact_compressed_round_trip()
+    test_hot_cache_never_keeps_replaced_views()
+    print("Dict resolver tests passed.")
@@ -0,0 +1,62 @@
+from py_context_fs.index import NgramIndex, PathIndex, TokenIndex, _InvertedIndex, path_segments
+
+
+def test_inverted_index_is_abstract() -> None:
+    try:
+        _InvertedIndex()
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("_InvertedIndex must declare `terms` abstract")
+
+
+def test_ngram_index_short_and_long_queries() -> None:
+    index = NgramIndex()
+    texts = {"a": "fractions", "b": "factor", "c": "ox", "d": ""}
+    for doc, text in texts.items():
+        index.update(doc, [], [text])
+    for query in ("fraction", "act", "ox", "o", "x", "s", "fr", "zz"):
+        expected = {doc for doc, text in texts.items() if query in text}
+        assert index.candidates(query) == expected, query
+    assert index.candidates("") == set()
+
+    index.update("a", ["fractions"], ["decimals"])
+    assert index.candidates("fr") == set()
+    assert index.candidates("ls") == {"a"}
+    index.update("c", ["ox"], [])
+    assert index.candidates("x") == set()
+
+
+def test_token_index_matches_every_token() -> None:
+    index = TokenIndex()
+    index.update("a", [], ["Fractions and decimals"])
+    index.update("b", [], ["fractions only"])
+    assert index.candidates("fractions") == {"a", "b"}
+    assert index.candidates("DECIMALS fractions") == {"a"}
+    index.update("a", ["Fractions and decimals"], ["geometry"])
+    assert index.candidates("decimals") == set()
+
+
+def test_path_index_listing_order_and_cursor() -> None:
+    index = PathIndex()
+    paths = ["b/x.json", "a/z.json", "a/b/c.json", "a-b.json", "a"]
+    for path in paths:
+        index.add(path)
+    listing = list(index.iter_files())
+    assert listing == sorted(paths, key=path_segments)
+    assert listing == ["a", "a/b/c.json", "a/z.json", "a-b.json", "b/x.json"]
+    assert list(index.iter_files("", cursor="a/z.json")) == ["a-b.json", "b/x.json"]
+    assert index.children("a") == [("b", True), ("z.json", False)]
+    assert list(index.glob("a/**/*.json")) == ["a/b/c.json", "a/z.json"]
+
+    index.discard("a/b/c.json")
+    assert index.children("a/b") is None
+    assert len(index) == 4
+
+
+if __name__ == "__main__":
+    test_inverted_index_is_abstract()
+    test_ngram_index_short_and_long_queries()
+    test_token_index_matches_every_token()
+    test_path_index_listing_order_and_cursor()
+    print("Index tests passed.")
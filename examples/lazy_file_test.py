@@ -0,0 +1,52 @@
+import dataclasses
+
+from py_context_fs.core import ContextFile, ContextRouter, LazyContextFile
+from py_context_fs.resolvers import DictResolver
+
+
+def test_lazy_file_never_loads_for_comparisons() -> None:
+    loads = []
+
+    def loader() -> str:
+        loads.append(True)
+        return "fractions"
+
+    lazy = LazyContextFile(loader, metadata={"priority": 1}, token_count=1)
+    other = LazyContextFile(loader, metadata={"priority": 1}, token_count=1)
+    assert lazy == lazy and lazy != other
+    assert not dataclasses.is_dataclass(lazy)
+    assert "<not loaded>" in repr(lazy)
+    assert loads == []
+
+    loaded = lazy.load()
+    assert loads == [True] and lazy.is_loaded
+    assert loaded == ContextFile(content="fractions", metadata={"priority": 1}, token_count=1)
+    assert dataclasses.replace(loaded, token_count=2).token_count == 2
+    assert dataclasses.asdict(loaded) == {"content": "fractions", "metadata": {"priority": 1}, "token_count": 1}
+
+    lazy.release()
+    assert not lazy.is_loaded
+    assert "".join(lazy.iter_chunks(4)) == "fractions"
+    assert len(loads) == 2
+
+
+def test_router_lazy_files_stream_and_reload() -> None:
+    resolver = DictResolver()
+    resolver.populate("a.txt", {"default": "fractions practice", "summary": "fractions"}, {"priority": 2})
+    fs = ContextRouter()
+    fs.mount("/notes", resolver)
+    lazy = fs.open_lazy("/notes/a.txt", view="summary")
+    assert lazy.metadata == {"priority": 2} and lazy.size_bytes == 9
+    assert not lazy.is_loaded
+    assert "".join(lazy.iter_chunks(4)) == "fractions"
+    assert not lazy.is_loaded
+    assert lazy.content == "fractions"
+    files = fs.open_many_lazy(["/notes/a.txt"], ("default", "missing"))
+    assert list(files) == [("/notes/a.txt", "default")]
+    assert files[("/notes/a.txt", "default")].load().content == "fractions practice"
+
+
+if __name__ == "__main__":
+    test_lazy_file_never_loads_for_comparisons()
+    test_router_lazy_files_stream_and_reload()
+    print("Lazy file tests passed.")
@@ -0,0 +1,64 @@
+from typing import Dict, Iterator, List, Tuple
+
+from py_context_fs.core import DEFAULT_CHUNK_SIZE, ContextFile, ContextRouter
+from py_context_fs.pipeline import ContextLoader, ContextManifest
+from py_context_fs.resolvers import DictResolver
+
+
+class _CountingResolver(DictResolver):
+    """Counts full reads and the chunks handed out by streamed reads."""
+
+    def __init__(self):
+        super().__init__()
+        self.reads: List[Tuple[str, str]] = []
+        self.streamed_chunks: Dict[Tuple[str, str], int] = {}
+
+    def read(self, path: str, view: str = "default") -> ContextFile:
+        self.reads.append((path, view))
+        return super().read(path, view)
+
+    def read_stream(self, path: str, view: str = "default", chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+        content = super().read(path, view).content
+        for start in range(0, len(content), chunk_size):
+            self.streamed_chunks[(path, view)] = self.streamed_chunks.get((path, view), 0) + 1
+            yield content[start:start + chunk_size]
+
+
+def _router() -> Tuple[ContextRouter, _CountingResolver]:
+    resolver = _CountingResolver()
+    resolver.populate("big.txt", {"default": "fractions " * 20000, "summary": "Fractions, summarized."})
+    resolver.populate("small.txt", {"default": "Decimals practice."})
+    fs = ContextRouter()
+    fs.mount("/notes", resolver)
+    return fs, resolver
+
+
+def test_oversized_streamed_view_is_dropped_without_loading() -> None:
+    fs, resolver = _router()
+    manifest = ContextManifest(files=["/notes/big.txt", "/notes/small.txt"])
+    loader = ContextLoader(fs, lazy=True, stream_threshold=1024, chunk_size=256)
+    context = loader.load(manifest, max_tokens=200)
+    assert "--- File: /notes/big.txt (Summary) ---" in context
+    assert "Decimals practice." in context
+    assert "fractions fractions" not in context
+    # The default view of big.txt was never read whole, and streaming it
+    # stopped soon after the budget was exceeded.
+    assert ("big.txt", "default") not in resolver.reads
+    total_chunks = len("fractions " * 20000) // 256 + 1
+    assert 0 < resolver.streamed_chunks[("big.txt", "default")] < total_chunks // 10
+
+
+def test_lazy_and_eager_loads_agree() -> None:
+    fs, _ = _router()
+    manifest = ContextManifest(files=["/notes/big.txt", "/notes/small.txt"])
+    for max_tokens in (20, 200, 50000):
+        eager = ContextLoader(fs).load(manifest, max_tokens=max_tokens)
+        for stream_threshold in (0, 1024, 10 * 1024 * 1024):
+            lazy = ContextLoader(fs, lazy=True, stream_threshold=stream_threshold, chunk_size=256)
+            assert lazy.load(manifest, max_tokens=max_tokens) == eager, (max_tokens, stream_threshold)
+
+
+if __name__ == "__main__":
+    test_oversized_streamed_view_is_dropped_without_loading()
+    test_lazy_and_eager_loads_agree()
+    print("Loader tests passed.")
@@ -0,0 +1,61 @@
+import os
+import tempfile
+
+from py_context_fs.resolvers import LocalFileResolver
+
+
+def test_stat_never_counts_tokens() -> None:
+    counted = []
+
+    def counter(text: str) -> int:
+        counted.append(text)
+        return len(text.split())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        resolver = LocalFileResolver(tmp, token_counter=counter, token_cache_size=2)
+        for name in ("a", "b", "c"):
+            resolver.write(f"{name}.txt", f"{name} has four words")
+        assert resolver.stat("a.txt").token_count is None
+        assert counted == []
+
+        assert resolver.read("a.txt").token_count == 4
+        assert resolver.stat("a.txt").token_count == 4
+        assert len(counted) == 1
+
+        resolver.read("b.txt")
+        resolver.read("c.txt")
+        # Only the two most recently read files keep their counts.
+        assert resolver.stat("a.txt").token_count is None
+        assert resolver.stat("c.txt").token_count == 4
+
+        resolver.write("c.txt", "now five words in it")
+        assert resolver.stat("c.txt").token_count is None
+        assert resolver.read("c.txt").token_count == 5
+
+
+def test_refresh_index_tolerates_vanished_files() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        resolver = LocalFileResolver(tmp, index_path=os.path.join(tmp, "index.db"))
+        resolver.write("keep.txt", "fractions kept")
+        resolver.write("gone.txt", "fractions gone")
+        assert sorted(resolver.search("fractions")) == ["gone.txt", "keep.txt"]
+
+        scan = resolver._iter_files
+
+        def scan_then_delete(*args):
+            entries = list(scan(*args))
+            os.remove(os.path.join(tmp, "gone.txt"))
+            return iter(entries)
+
+        resolver.write("new.txt", "fractions new")
+        resolver._iter_files = scan_then_delete
+        resolver.refresh_index()
+        resolver._iter_files = scan
+        assert resolver.search("fractions") == ["keep.txt", "new.txt"]
+        resolver.close()
+
+
+if __name__ == "__main__":
+    test_stat_never_counts_tokens()
+    test_refresh_index_tolerates_vanished_files()
+    print("Local file resolver tests passed.")
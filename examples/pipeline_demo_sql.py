@@ -1,7 +1,7 @@
 import os
 import sqlite3
 import sys
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 # Ensure the package is in python path
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
@@ -27,6 +27,35 @@ class SQLResolver(ContextSource):
             raise FileNotFoundError(f"Note not found: {path} (view={view})")
         return ContextFile(content=row[1], metadata={"id": row[0], "view": view})
 
+    def read_many(
+        self, paths: Sequence[str], views: Sequence[str] = ("default",)
+    ) -> Dict[Tuple[str, str], ContextFile]:
+        ids = {}
+        for path in paths:
+            try:
+                ids[self._parse_id(path)] = path
+            except ValueError:
+                continue
+        note_ids = list(ids)
+        results = {}
+        # Stay well below SQLite's bound-parameter limit.
+        for start in range(0, len(note_ids), 500):
+            chunk = note_ids[start:start + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = self._query_all(
+                f"SELECT id, content, summary FROM notes WHERE id IN ({placeholders})",
+                tuple(chunk),
+            )
+            for note_id, content, summary in rows:
+                for view in views:
+                    value = summary if view == "summary" else content
+                    if value is None:
+                        continue
+                    results[(ids[note_id], view)] = ContextFile(
+                        content=value, metadata={"id": note_id, "view": view}
+                    )
+        return results
+
     def list(self, path: str) -> List[str]:
         if path not in ("", ".", "/"):
             return []
@@ -0,0 +1,306 @@
+import json
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from py_context_fs import repository as repository_module
+from py_context_fs.migrate import main as migrate_main
+from py_context_fs.repository import PersistentContextRepository, migrate_repository
+
+
+def test_writes_are_atomic_across_threads() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = PersistentContextRepository(tmp)
+        errors = []
+
+        def writer(number: int) -> None:
+            try:
+                for round_number in range(20):
+                    repo.write("memory/shared.json", f"writer {number} round {round_number}")
+            except Exception as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=writer, args=(number,)) for number in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+        assert repo.read("memory/shared.json").content.endswith("round 19")
+        assert list(Path(tmp, "memory").glob("*.tmp")) == []
+        repo.close()
+
+
+def test_durability_modes_persist_writes() -> None:
+    for storage in ("json", "segments"):
+        for durability in ("always", "interval", "os"):
+            with tempfile.TemporaryDirectory() as tmp:
+                repo = PersistentContextRepository(tmp, storage=storage, durability=durability, compaction_interval=None)
+                repo.write("memory/note.json", "kept")
+                repo.close()
+                repo = PersistentContextRepository(tmp, storage=storage, compaction_interval=None)
+                assert repo.read("memory/note.json").content == "kept"
+                repo.close()
+    try:
+        PersistentContextRepository(tempfile.gettempdir(), durability="never")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unknown durability accepted")
+
+
+def test_batch_commits_and_rolls_back() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = PersistentContextRepository(tmp)
+        repo.write("memory/a.json", "original fractions")
+        with repo.batch():
+            repo.write("memory/a.json", "updated decimals")
+            repo.write("memory/b.json", "new decimals")
+            assert repo.read("memory/a.json").content == "updated decimals"
+        assert repo.read("memory/b.json").content == "new decimals"
+
+        try:
+            with repo.batch():
+                repo.write("memory/a.json", "rolled back")
+                repo.write("memory/c.json", "rolled back")
+                raise RuntimeError("abort")
+        except RuntimeError:
+            pass
+        assert repo.read("memory/a.json").content == "updated decimals"
+        assert not Path(tmp, "memory", "c.json").exists()
+        assert "memory/c.json" not in repo.search("rolled")
+        repo.close()
+
+
+def test_batch_does_not_capture_other_threads() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = PersistentContextRepository(tmp)
+        opened = threading.Event()
+        written = threading.Event()
+
+        def other_thread() -> None:
+            opened.wait()
+            repo.write("memory/other.json", "independent write")
+            written.set()
+
+        thread = threading.Thread(target=other_thread)
+        thread.start()
+        try:
+            with repo.batch():
+                opened.set()
+                written.wait()
+                raise RuntimeError("abort")
+        except RuntimeError:
+            pass
+        thread.join()
+        assert repo.read("memory/other.json").content == "independent write"
+        repo.close()
+
+
+def test_search_skips_records_deleted_outside() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = PersistentContextRepository(tmp)
+        kept = repo.append_history("Student practiced fractions")
+        deleted = repo.append_history("Student reviewed fractions")
+        repo.write("scratchpad/draft.json", "fractions draft")
+        Path(tmp, deleted).unlink()
+        Path(tmp, "scratchpad", "draft.json").unlink()
+
+        assert repo.search("fractions") == [kept]
+        assert [path for path, _ in repo.search_ranked("fractions")] == [kept]
+        assert [path for path, _ in repo.search_ranked("fractions", k=1)] == [kept]
+        repo.close()
+
+
+def test_signatures_skip_records_deleted_during_scan() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = PersistentContextRepository(tmp)
+        repo.write("memory/a.json", "alpha")
+        repo.write("memory/b.json", "beta")
+        scan_tree = repository_module.scan_tree
+
+        def deleting_scan_tree(*args):
+            for key, entry in scan_tree(*args):
+                if key == "memory/a.json":
+                    Path(tmp, key).unlink()
+                yield key, entry
+
+        repository_module.scan_tree = deleting_scan_tree
+        try:
+            signatures = list(repo._storage.iter_signatures("memory"))
+        finally:
+            repository_module.scan_tree = scan_tree
+        assert [key for key, _ in signatures] == ["memory/b.json"]
+        repo.close()
+
+
+def test_substring_search_uses_partial_tokens() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = PersistentContextRepository(tmp)
+        fractions = repo.append_history("Multiplication of fractions")
+        geometry = repo.append_history("Geometry basics")
+        for query in ("fractions", "ultiplica", "plication of frac", "tions", "Multi"):
+            assert repo.search(query) == [fractions], query
+        assert repo.search("ry ba") == [geometry]
+        assert repo.search("i") == sorted([fractions, geometry])
+        assert repo.search("zzz") == []
+        repo.close()
+
+
+def test_history_range_over_buckets() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = PersistentContextRepository(tmp, history_partition="day")
+        before = time.time()
+        first = repo.append_history("first turn")
+        second = repo.append_history("second turn")
+        # A flat-layout entry written before partitioning was turned on.
+        flat = f"history/{int(before) - 3600}_{'0' * 32}.json"
+        repo.write(flat, "older turn")
+
+        assert repo.history_range() == [second, first, flat]
+        assert repo.history_range(start=before) == [second, first]
+        assert repo.history_range(end=before - 1, reverse=False) == [flat]
+        bucket = first.rsplit("/", 1)[0]
+        assert list(repo.ilist_range(bucket)) == [second, first]
+        assert list(repo.ilist_range(bucket.rsplit("/", 1)[0], limit=1)) == [second]
+        repo.close()
+
+
+def test_index_reconciles_after_crash() -> None:
+    for storage in ("json", "segments"):
+        with tempfile.TemporaryDirectory() as tmp:
+            repo = PersistentContextRepository(tmp, storage=storage, compaction_interval=None, index_batch_size=2)
+            for name, word in (("a", "alpha"), ("b", "beta"), ("c", "gamma"), ("d", "delta")):
+                repo.write(f"memory/{name}.json", f"{word} notes")
+            # Still buffered when the process dies: never journaled.
+            repo.write("memory/a.json", "argon notes")
+            journal = Path(tmp, "index", f"memory-{storage}.journal")
+            assert Path(tmp, "index", f"memory-{storage}.idx").exists()
+            # a and b went into the snapshot, c and d into the journal after it.
+            assert len(journal.read_bytes().splitlines()) == 3
+            # The records reach the disk, but the repository is never closed.
+            repo._storage.sync()
+
+            tokenized = []
+            record_terms = PersistentContextRepository._record_terms
+
+            def counting_record_terms(self, key):
+                tokenized.append(key)
+                return record_terms(self, key)
+
+            PersistentContextRepository._record_terms = counting_record_terms
+            try:
+                repo = PersistentContextRepository(tmp, storage=storage, compaction_interval=None)
+            finally:
+                PersistentContextRepository._record_terms = record_terms
+            # Only the record whose update was lost is parsed again.
+            assert tokenized == ["memory/a.json"], storage
+            assert repo.search("alpha") == []
+            assert repo.search("argon") == ["memory/a.json"]
+            assert repo.search("notes") == [f"memory/{name}.json" for name in "abcd"]
+            assert [path for path, _ in repo.search_ranked("gamma")] == ["memory/c.json"]
+            repo.close()
+
+
+def test_migrate_between_storages() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = PersistentContextRepository(tmp)
+        turn = repo.append_history("Student practiced fractions")
+        repo.write("memory/profile.json", "likes fractions")
+        repo.write("scratchpad/draft.json", "draft answer")
+        repo.close()
+
+        assert migrate_main([tmp, tmp, "--from", "json", "--to", "segments", "--batch-size", "2"]) == 0
+        migrated = PersistentContextRepository(tmp, storage="segments", compaction_interval=None)
+        assert migrated.read(turn).content == "Student practiced fractions"
+        assert migrated.read("scratchpad/draft.json").content == "draft answer"
+        assert migrated.search("fractions") == sorted([turn, "memory/profile.json"])
+        migrated.close()
+
+        back = str(Path(tmp, "back"))
+        assert migrate_repository(tmp, back, source_storage="segments", target_storage="json") == 3
+        restored = PersistentContextRepository(back)
+        assert restored.read("memory/profile.json").content == "likes fractions"
+        restored.close()
+        try:
+            migrate_repository(tmp, tmp, source_storage="json", target_storage="json")
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("migrated a repository onto itself")
+
+
+def test_record_cache_hits_and_invalidation() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = PersistentContextRepository(tmp)
+        repo.write("memory/a.json", "fractions")
+        repo.read("memory/a.json")
+        repo.stat("memory/a.json")
+        stats = repo.cache_stats()
+        assert (stats.hits, stats.misses, stats.entries) == (2, 0, 1)
+
+        # Another writer rewrites the file: the signature changes and the entry is dropped.
+        record_path = Path(tmp, "memory", "a.json")
+        data = json.loads(record_path.read_text(encoding="utf-8"))
+        data["views"]["default"] = "rewritten by another process"
+        record_path.write_text(json.dumps(data), encoding="utf-8")
+        assert repo.read("memory/a.json").content == "rewritten by another process"
+        stats = repo.cache_stats()
+        assert (stats.misses, stats.invalidations) == (1, 1)
+
+        # The repository's own writes and batch commits update the cache in place.
+        repo.write("memory/a.json", "own write")
+        with repo.batch():
+            repo.write("memory/b.json", "batched")
+        assert repo.read("memory/a.json").content == "own write"
+        assert repo.read("memory/b.json").content == "batched"
+        stats = repo.cache_stats()
+        assert (stats.misses, stats.invalidations, stats.entries) == (1, 1, 2)
+        repo.close()
+
+
+def test_record_cache_evicts_within_budget() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = PersistentContextRepository(tmp, cache_bytes=1024)
+        for index in range(10):
+            repo.write(f"memory/{index}.json", "x" * 200)
+        stats = repo.cache_stats()
+        assert stats.evictions > 0 and stats.entries < 10
+        assert 0 < stats.size_bytes <= 1024
+        assert repo.read("memory/0.json").content == "x" * 200
+        repo.close()
+
+        repo = PersistentContextRepository(tmp, cache_bytes=0)
+        repo.read("memory/0.json")
+        assert repo.cache_stats().entries == 0
+        repo.close()
+
+
+def test_cached_metadata_is_never_shared() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = PersistentContextRepository(tmp)
+        metadata = {"history": ["turn 1"]}
+        repo.write("memory/a.json", "fractions", metadata)
+        metadata["history"].append("changed by the caller")
+        repo.read("memory/a.json").metadata["history"].append("changed by a reader")
+        repo.stat("memory/a.json").metadata["history"].append("changed by a stat caller")
+        assert repo.read("memory/a.json").metadata == {"history": ["turn 1"]}
+        repo.close()
+
+
+if __name__ == "__main__":
+    test_writes_are_atomic_across_threads()
+    test_durability_modes_persist_writes()
+    test_batch_commits_and_rolls_back()
+    test_batch_does_not_capture_other_threads()
+    test_search_skips_records_deleted_outside()
+    test_signatures_skip_records_deleted_during_scan()
+    test_substring_search_uses_partial_tokens()
+    test_history_range_over_buckets()
+    test_index_reconciles_after_crash()
+    test_migrate_between_storages()
+    test_record_cache_hits_and_invalidation()
+    test_record_cache_evicts_within_budget()
+    test_cached_metadata_is_never_shared()
+    print("Repository tests passed.")
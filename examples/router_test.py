@@ -0,0 +1,314 @@
+import asyncio
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from py_context_fs.core import (
+    AsyncContextRouter,
+    AsyncContextSource,
+    ContextFile,
+    ContextRouter,
+    ContextSource,
+    SearchReport,
+)
+from py_context_fs.instrumentation import InMemoryCollector
+from py_context_fs.pipeline import AsyncContextConstructor, ContextConstructor, SelectionCriteria
+from py_context_fs.repository import PersistentContextRepository
+from py_context_fs.resolvers import DictResolver, LocalFileResolver
+
+
+def _mount_ranked_and_unranked(root: str):
+    repo = PersistentContextRepository(root)
+    repo.write("memory/fractions.json", "fractions fractions fractions")
+    repo.write("memory/mixed.json", "fractions and decimals")
+    resolver = DictResolver()
+    resolver.populate("notes/fractions.json", {"default": "fractions"}, {"priority": 7.0})
+    fs = ContextRouter()
+    fs.mount("/repo", repo)
+    fs.mount("/notes", resolver)
+    return fs, repo
+
+
+def test_mount_table_resolves_deepest_prefix() -> None:
+    fs = ContextRouter(resolve_cache_size=2)
+    for prefix in ("/", "/a", "/a/b", "/ab/"):
+        fs.mount(prefix, DictResolver())
+    assert sorted(fs.mounts()) == ["/", "/a", "/a/b", "/ab"]
+    cases = {
+        "/a/x.txt": ("/a", "x.txt"),
+        "/a/b/c/d.txt": ("/a/b", "c/d.txt"),
+        "/ab/x.txt": ("/ab", "x.txt"),
+        "/abc.txt": ("/", "abc.txt"),
+        "/a": ("/a", ""),
+    }
+    for path, (mount_point, rel_path) in cases.items():
+        assert fs._resolve_mount(path)[::2] == (mount_point, rel_path), path
+    assert fs._cached_lookup.cache_info().currsize == 2
+
+    # Unmounting drops memoized resolutions.
+    fs.unmount("/a/b")
+    assert fs._resolve_mount("/a/b/c/d.txt")[::2] == ("/a", "b/c/d.txt")
+    fs.unmount("/")
+    for call, error in (
+        (lambda: fs._resolve_mount("/abc.txt"), FileNotFoundError),
+        (lambda: fs._resolve_mount("a/x.txt"), ValueError),
+        (lambda: fs.unmount("/missing"), FileNotFoundError),
+        (lambda: fs.mount("relative", DictResolver()), ValueError),
+    ):
+        try:
+            call()
+        except error:
+            pass
+        else:
+            raise AssertionError(f"expected {error.__name__}")
+    fs.write("/a/x.txt", "fractions")
+    assert fs.open("/a/x.txt").content == "fractions"
+    assert fs.mounts()["/a"].read("x.txt").content == "fractions"
+
+
+def test_search_ranked_normalises_per_mount() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        fs, repo = _mount_ranked_and_unranked(tmp)
+        ranked = fs.search_ranked("fractions")
+        scores = dict(ranked)
+        assert scores["/repo/memory/fractions.json"] == 1.0
+        assert 0.0 < scores["/repo/memory/mixed.json"] < 1.0
+        assert scores["/notes/notes/fractions.json"] is None
+
+        # The unscored mount's best hit competes with the ranked mount's best.
+        top = [path for path, _ in fs.search_ranked("fractions", k=2)]
+        assert top == ["/repo/memory/fractions.json", "/notes/notes/fractions.json"]
+        repo.close()
+
+
+def test_unranked_hits_keep_metadata_priority() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        fs, repo = _mount_ranked_and_unranked(tmp)
+        manifest = ContextConstructor(fs).construct(
+            SelectionCriteria(query="fractions", ranked_search=True, search_limit=3)
+        )
+        priorities = {entry.path: entry.priority for entry in manifest.entries}
+        assert priorities["/notes/notes/fractions.json"] == 7.0
+        assert priorities["/repo/memory/fractions.json"] == 1.0
+        assert manifest.files[0] == "/notes/notes/fractions.json"
+        repo.close()
+
+
+class _NativeAsyncNotes(AsyncContextSource):
+    """An AsyncContextSource that cannot rank its search results."""
+
+    def __init__(self):
+        self.files = {"notes/fractions.json": ("fractions", {"priority": 7.0})}
+
+    async def aread(self, path: str, view: str = "default") -> ContextFile:
+        if path not in self.files or view != "default":
+            raise FileNotFoundError(path)
+        content, metadata = self.files[path]
+        return ContextFile(content=content, metadata=dict(metadata))
+
+    async def alist(self, path: str) -> List[str]:
+        return sorted(self.files)
+
+    async def asearch(self, query: str) -> List[str]:
+        return [path for path, (content, _) in self.files.items() if query in content]
+
+    async def awrite(self, path: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        self.files[path] = (content, metadata or {})
+
+
+def test_async_unranked_hits_keep_metadata_priority() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = PersistentContextRepository(tmp)
+        repo.write("memory/fractions.json", "fractions fractions fractions")
+        repo.write("memory/mixed.json", "fractions and decimals")
+        fs = AsyncContextRouter()
+        fs.mount("/repo", repo)
+        fs.mount("/notes", _NativeAsyncNotes())
+
+        async def scenario() -> None:
+            ranked = dict(await fs.search_ranked("fractions"))
+            assert ranked["/notes/notes/fractions.json"] is None
+            manifest = await AsyncContextConstructor(fs).construct(
+                SelectionCriteria(query="fractions", ranked_search=True, search_limit=3)
+            )
+            priorities = {entry.path: entry.priority for entry in manifest.entries}
+            assert priorities["/notes/notes/fractions.json"] == 7.0
+            assert priorities["/repo/memory/fractions.json"] == 1.0
+            assert manifest.files[0] == "/notes/notes/fractions.json"
+
+        asyncio.run(scenario())
+        repo.close()
+
+
+def test_ilist_range_orders_by_update_time() -> None:
+    resolver = DictResolver()
+    resolver.populate("notes/old.json", {"default": "old"})
+    time.sleep(0.01)
+    resolver.populate("notes/new.json", {"default": "new"})
+    fs = ContextRouter()
+    fs.mount("/notes", resolver)
+    assert list(fs.ilist_range("/notes/notes")) == ["/notes/notes/new.json", "/notes/notes/old.json"]
+    assert list(fs.ilist_range("/notes/notes", start=time.time() + 60)) == []
+
+
+class _SlowResolver(DictResolver):
+    def __init__(self, delay: float, calls=None):
+        super().__init__()
+        self._delay = delay
+        self._calls = calls
+        self.populate("hit.txt", {"default": "fractions"})
+
+    def search(self, query: str):
+        if self._calls is not None:
+            self._calls.append(query)
+        time.sleep(self._delay)
+        return super().search(query)
+
+
+def test_search_concurrent_times_out_each_mount() -> None:
+    fs = ContextRouter()
+    fs.mount("/fast", _SlowResolver(0.0))
+    fs.mount("/slow", _SlowResolver(0.5))
+    report = fs.search_concurrent("fractions", timeout=0.1)
+    assert report.paths == ["/fast/hit.txt"]
+    assert report.timed_out == ["/slow"]
+
+    fs.close()
+
+    # Results that arrived in time are kept, however slowly they are consumed.
+    fs = ContextRouter()
+    fs.mount("/fast", _SlowResolver(0.0))
+    fs.mount("/medium", _SlowResolver(0.1))
+    report = SearchReport()
+    for _ in fs.search_iter("fractions", timeout=0.3, report=report):
+        time.sleep(0.4)
+    assert sorted(report.paths) == ["/fast/hit.txt", "/medium/hit.txt"]
+    assert report.timed_out == []
+    fs.close()
+
+
+def test_search_iter_reuses_pool_and_cancels_on_break() -> None:
+    calls = []
+    fs = ContextRouter(search_workers=3)
+    fs.mount("/a", _SlowResolver(0.0, calls))
+    fs.mount("/b", _SlowResolver(0.2, calls))
+    fs.mount("/c", _SlowResolver(0.0, calls))
+    for _ in fs.search_iter("fractions", max_workers=1):
+        break
+    time.sleep(0.3)
+    # The first mount answered; the queued ones were never started.
+    assert len(calls) == 1
+    first_pool = fs._search_executor
+    assert sorted(fs.search_concurrent("fractions").paths) == ["/a/hit.txt", "/b/hit.txt", "/c/hit.txt"]
+    assert fs._search_executor is first_pool
+    for _ in range(5):
+        fs.search_concurrent("fractions")
+    search_threads = [thread for thread in threading.enumerate() if thread.name.startswith("context-search")]
+    assert len(search_threads) <= 3
+    fs.close()
+
+
+def test_open_stream_is_instrumented() -> None:
+    collector = InMemoryCollector()
+    fs = ContextRouter(instrumentation=collector)
+    resolver = DictResolver()
+    resolver.populate("a.txt", {"default": "fractions practice"})
+    fs.mount("/notes", resolver)
+    assert "".join(fs.open_stream("/notes/a.txt", chunk_size=4)) == "fractions practice"
+    stream = fs.open_stream("/notes/a.txt", chunk_size=4)
+    assert next(stream) == "frac"
+    stream.close()
+    try:
+        list(fs.open_stream("/notes/missing.txt"))
+    except FileNotFoundError:
+        pass
+    else:
+        raise AssertionError("missing file streamed")
+    stats = collector.operations()[("/notes", "open_stream")]
+    assert (stats.calls, stats.errors, stats.size) == (3, 1, 18 + 4)
+
+
+def test_open_records_utf8_bytes() -> None:
+    collector = InMemoryCollector()
+    fs = ContextRouter(instrumentation=collector)
+    resolver = DictResolver()
+    resolver.populate("a.txt", {"default": "café"})
+    fs.mount("/notes", resolver)
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(f"{tmp}/big.txt", "w", encoding="utf-8") as handle:
+            handle.write("é" * 2048)
+        fs.mount("/files", LocalFileResolver(tmp, mmap_threshold=1024))
+        fs.open("/notes/a.txt")
+        lazy = fs.open("/files/big.txt")
+        fs.open_many(["/notes/a.txt", "/files/big.txt"])
+        assert not lazy.is_loaded
+    operations = collector.operations()
+    assert operations[("/notes", "open")].size == 5
+    assert operations[("/files", "open")].size == 4096
+    assert operations[("/notes", "open_many")].size == 5
+    assert operations[("/files", "open_many")].size == 4096
+
+
+class _PlainSource(ContextSource):
+    """A third-party style source: no native stat, every read is recorded."""
+
+    def __init__(self, files: Dict[Tuple[str, str], str]):
+        self.files = files
+        self.reads: List[Tuple[str, str]] = []
+
+    def read(self, path: str, view: str = "default") -> ContextFile:
+        self.reads.append((path, view))
+        if (path, view) not in self.files:
+            raise FileNotFoundError(path)
+        return ContextFile(content=self.files[(path, view)], metadata={})
+
+    def list(self, path: str) -> List[str]:
+        return sorted({path for path, _ in self.files})
+
+    def search(self, query: str) -> List[str]:
+        return []
+
+    def write(self, path: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        self.files[(path, "default")] = content
+
+
+def test_default_stat_reads_summary_only_for_misses() -> None:
+    source = _PlainSource({
+        ("both.txt", "default"): "full text",
+        ("both.txt", "summary"): "short",
+        ("summary_only.txt", "summary"): "short",
+    })
+    fs = ContextRouter()
+    fs.mount("/plain", source)
+    assert fs.exists("/plain/both.txt")
+    assert source.reads == [("both.txt", "default")]
+
+    source.reads.clear()
+    stats = fs.stat_many(["/plain/both.txt", "/plain/summary_only.txt", "/plain/missing.txt"])
+    assert {path: file_stat.views for path, file_stat in stats.items()} == {
+        "/plain/both.txt": ["default"],
+        "/plain/summary_only.txt": ["summary"],
+    }
+    assert sorted(source.reads) == [
+        ("both.txt", "default"),
+        ("missing.txt", "default"),
+        ("missing.txt", "summary"),
+        ("summary_only.txt", "default"),
+        ("summary_only.txt", "summary"),
+    ]
+    assert not fs.exists("/plain/missing.txt")
+
+
+if __name__ == "__main__":
+    test_mount_table_resolves_deepest_prefix()
+    test_search_ranked_normalises_per_mount()
+    test_unranked_hits_keep_metadata_priority()
+    test_async_unranked_hits_keep_metadata_priority()
+    test_ilist_range_orders_by_update_time()
+    test_search_concurrent_times_out_each_mount()
+    test_search_iter_reuses_pool_and_cancels_on_break()
+    test_open_stream_is_instrumented()
+    test_open_records_utf8_bytes()
+    test_default_stat_reads_summary_only_for_misses()
+    print("Router tests passed.")
@@ -0,0 +1,96 @@
+import os
+import tempfile
+from pathlib import Path
+
+from py_context_fs.repository import PersistentContextRepository
+from py_context_fs.segments import SegmentStore
+
+
+def test_put_get_and_reopen() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SegmentStore(tmp)
+        store.put_many([("memory/a.json", b"one"), ("memory/b.json", b"two")])
+        store.put("memory/a.json", b"three")
+        assert store.get("memory/a.json") == b"three"
+        assert list(store.iter_keys("memory")) == ["memory/a.json", "memory/b.json"]
+        fingerprint = store.fingerprint("memory/a.json")
+        store.close()
+
+        store = SegmentStore(tmp)
+        assert store.get("memory/a.json") == b"three"
+        assert store.get("memory/b.json") == b"two"
+        assert store.fingerprint("memory/a.json") == fingerprint
+        store.close()
+
+
+def test_compaction_keeps_live_records() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SegmentStore(tmp, segment_bytes=256)
+        for round_number in range(5):
+            store.put_many((f"k{i}", f"value {round_number} {i}".encode()) for i in range(10))
+        fingerprints = {f"k{i}": store.fingerprint(f"k{i}") for i in range(10)}
+        segments_before = len(list(Path(tmp).glob("*.seg")))
+        assert store.compact(force=True) > 0
+        assert len(list(Path(tmp).glob("*.seg"))) < segments_before
+        for i in range(10):
+            assert store.get(f"k{i}") == f"value 4 {i}".encode()
+            assert store.fingerprint(f"k{i}") == fingerprints[f"k{i}"]
+        store.close()
+
+        store = SegmentStore(tmp, segment_bytes=256)
+        assert all(store.get(f"k{i}") == f"value 4 {i}".encode() for i in range(10))
+        store.close()
+
+
+def test_torn_tail_is_truncated() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SegmentStore(tmp)
+        store.put("a", b"intact")
+        store.close()
+        # Forget the saved index so the segment is replayed from the start.
+        os.remove(Path(tmp) / "index.json")
+        segment = next(Path(tmp).glob("*.seg"))
+        intact_size = segment.stat().st_size
+        with open(segment, "ab") as handle:
+            handle.write(b"\x01\x02\x03 half a record")
+
+        store = SegmentStore(tmp)
+        assert store.get("a") == b"intact"
+        assert "b" not in store
+        assert segment.stat().st_size == intact_size
+        store.put("b", b"after")
+        store.close()
+
+        store = SegmentStore(tmp)
+        assert store.get("b") == b"after"
+        store.close()
+
+
+def test_index_survives_compaction() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = PersistentContextRepository(tmp, storage="segments", segment_bytes=512, compaction_interval=None)
+        for round_number in range(4):
+            for i in range(8):
+                repo.write(f"memory/note{i}.json", f"fractions note {round_number} {i}")
+        repo.compact()
+        repo.close()
+
+        tokenized = []
+
+        class CountingRepository(PersistentContextRepository):
+            def _record_terms(self, key):
+                tokenized.append(key)
+                return super()._record_terms(key)
+
+        repo = CountingRepository(tmp, storage="segments", segment_bytes=512, compaction_interval=None)
+        assert tokenized == []
+        assert len(repo.search("fractions")) == 8
+        repo.close()
+
+
+if __name__ == "__main__":
+    test_put_get_and_reopen()
+    test_compaction_keeps_live_records()
+    test_torn_tail_is_truncated()
+    test_index_survives_compaction()
+    print("Segment store tests passed.")
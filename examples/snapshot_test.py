@@ -0,0 +1,97 @@
+import os
+import tempfile
+from typing import Any, Dict, List, Optional
+
+from py_context_fs.core import ContextFile, ContextSource
+from py_context_fs.resolvers import DictResolver
+from py_context_fs.snapshot import SnapshotResolver, freeze_snapshot
+
+
+def test_snapshot_round_trip() -> None:
+    source = DictResolver()
+    source.populate("notes/b.txt", {"default": "decimals – café", "summary": "decimals"}, {"priority": 2})
+    source.populate("notes/a.txt", {"default": "fractions"})
+    source.populate("notes/a/deep.txt", {"default": "nested fractions"})
+    source.populate("other.txt", {"default": "geometry"})
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "corpus.snap")
+        assert freeze_snapshot(source, path) == 4
+        assert not os.path.exists(f"{path}.tmp")
+        with SnapshotResolver(path) as snapshot:
+            assert len(snapshot) == 4
+            assert snapshot.list("") == source.list("")
+            # Listing order is `path_segments`: "a" sorts before "a.txt".
+            assert snapshot.list("notes") == ["notes/a/deep.txt", "notes/a.txt", "notes/b.txt"]
+            assert list(snapshot.ilist("notes", cursor="notes/a/deep.txt", limit=1)) == ["notes/a.txt"]
+            assert snapshot.read("notes/b.txt", "summary").content == "decimals"
+            assert snapshot.read("notes/b.txt").metadata == {"priority": 2}
+            assert "".join(snapshot.read_stream("notes/b.txt", chunk_size=4)) == "decimals – café"
+            file_stat = snapshot.stat("notes/b.txt")
+            assert file_stat.views == ["default", "summary"]
+            assert file_stat.sizes["default"] == len("decimals – café".encode("utf-8"))
+            assert snapshot.search("fractions") == ["notes/a/deep.txt", "notes/a.txt"]
+            assert snapshot.search("café") == ["notes/b.txt"]
+            for call, error in (
+                (lambda: snapshot.read("notes/c.txt"), FileNotFoundError),
+                (lambda: snapshot.read("notes/a.txt", "summary"), ValueError),
+                (lambda: list(snapshot.ilist("notes", cursor="other.txt")), ValueError),
+                (lambda: snapshot.write("notes/a.txt", "changed"), PermissionError),
+            ):
+                try:
+                    call()
+                except error:
+                    pass
+                else:
+                    raise AssertionError(f"expected {error.__name__}")
+
+
+class _PlainSource(ContextSource):
+    """A source without a native stat."""
+
+    def __init__(self, files: Dict[str, Dict[str, str]]):
+        self.files = files
+
+    def read(self, path: str, view: str = "default") -> ContextFile:
+        if view not in self.files.get(path, {}):
+            raise FileNotFoundError(path)
+        return ContextFile(content=self.files[path][view], metadata={})
+
+    def list(self, path: str) -> List[str]:
+        return sorted(self.files)
+
+    def search(self, query: str) -> List[str]:
+        return []
+
+    def write(self, path: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        self.files.setdefault(path, {})["default"] = content
+
+
+def test_freeze_keeps_summaries_of_sources_without_stat() -> None:
+    source = _PlainSource({"a.txt": {"default": "full", "summary": "short"}, "b.txt": {"summary": "only"}})
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "plain.snap")
+        assert freeze_snapshot(source, path) == 2
+        with SnapshotResolver(path) as snapshot:
+            assert snapshot.stat("a.txt").views == ["default", "summary"]
+            assert snapshot.read("a.txt", "summary").content == "short"
+            assert snapshot.stat("b.txt").views == ["summary"]
+
+
+def test_rejects_other_files() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "notes.txt")
+        with open(path, "wb") as handle:
+            handle.write(b"\0" * 128)
+        try:
+            SnapshotResolver(path)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("plain file accepted as a snapshot")
+
+
+if __name__ == "__main__":
+    test_snapshot_round_trip()
+    test_freeze_keeps_summaries_of_sources_without_stat()
+    test_rejects_other_files()
+    print("Snapshot resolver tests passed.")
@@ -0,0 +1,87 @@
+import gc
+import sqlite3
+import threading
+
+from py_context_fs.resolvers import SQLiteResolver
+
+
+def test_read_write_list_and_search() -> None:
+    resolver = SQLiteResolver(":memory:")
+    resolver.populate("notes/a.txt", {"default": "fractions practice", "summary": "fractions"}, {"priority": 2})
+    resolver.write("notes/b.txt", "geometry practice")
+    assert resolver.read("notes/a.txt", "summary").content == "fractions"
+    assert resolver.read("notes/a.txt").metadata == {"priority": 2}
+    assert resolver.list("notes") == ["notes/a.txt", "notes/b.txt"]
+    assert list(resolver.ilist("notes", cursor="notes/a.txt")) == ["notes/b.txt"]
+    assert resolver.search("fractions") == ["notes/a.txt"]
+    assert resolver.stat("notes/a.txt").views == ["default", "summary"]
+    try:
+        resolver.read("notes/missing.txt")
+    except FileNotFoundError:
+        pass
+    else:
+        raise AssertionError("missing file read")
+    resolver.close()
+
+
+def test_readers_never_see_half_applied_populate() -> None:
+    resolver = SQLiteResolver(":memory:")
+    views = {"default": "round 0", "summary": "summary 0"}
+    resolver.populate("notes/a.txt", views)
+    stop = threading.Event()
+    errors = []
+
+    def writer() -> None:
+        for round_number in range(1, 200):
+            resolver.populate("notes/a.txt", {"default": f"round {round_number}", "summary": f"summary {round_number}"})
+        stop.set()
+
+    def reader() -> None:
+        try:
+            while not stop.is_set():
+                assert resolver.stat("notes/a.txt").views == ["default", "summary"]
+                assert resolver.read("notes/a.txt", "summary").content.startswith("summary")
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    resolver.close()
+
+
+def test_connections_close_when_their_thread_ends() -> None:
+    resolver = SQLiteResolver(":memory:")
+    resolver.write("notes/a.txt", "fractions")
+    connections = []
+
+    def reader() -> None:
+        assert resolver.read("notes/a.txt").content == "fractions"
+        connections.append(resolver._connection())
+
+    for _ in range(20):
+        thread = threading.Thread(target=reader)
+        thread.start()
+        thread.join()
+    gc.collect()
+    # Only the constructing thread's connection is still pooled.
+    assert len(resolver._connections) == 1
+    for conn in connections:
+        try:
+            conn.execute("SELECT 1")
+        except sqlite3.ProgrammingError:
+            pass
+        else:
+            raise AssertionError("connection of a finished thread left open")
+    assert resolver.read("notes/a.txt").content == "fractions"
+    resolver.close()
+
+
+if __name__ == "__main__":
+    test_read_write_list_and_search()
+    test_readers_never_see_half_applied_populate()
+    test_connections_close_when_their_thread_ends()
+    print("SQLite resolver tests passed.")
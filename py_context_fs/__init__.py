@@ -1,9 +1,26 @@
-from .core import ContextFile, ContextRouter, ContextSource
+from .core import (
+    AsyncContextRouter,
+    AsyncContextSource,
+    ContextFile,
+    ContextRouter,
+    ContextSource,
+    ContextStat,
+    LazyContextFile,
+    SearchReport,
+)
+from .instrumentation import InMemoryCollector, Instrumentation
 from .repository import PersistentContextRepository
 
 __all__ = [
+    "AsyncContextRouter",
+    "AsyncContextSource",
     "ContextFile",
     "ContextRouter",
     "ContextSource",
+    "ContextStat",
+    "InMemoryCollector",
+    "Instrumentation",
+    "LazyContextFile",
     "PersistentContextRepository",
+    "SearchReport",
 ]
@@ -1,8 +1,31 @@
 import abc
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+import asyncio
+import bisect
+import codecs
+import functools
+import heapq
+import itertools
+import mmap
+import threading
+import time
+from concurrent import futures
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 import os
 
+from .index import path_segments
+from .instrumentation import NULL_INSTRUMENTATION, Instrumentation
+
+# Default chunk size for streamed reads.
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Page size used when an executor-backed source streams a listing.
+_LIST_PAGE_SIZE = 1000
+
+# Marker key for a mount point inside the router's segment trie. Path segments
+# can never contain "/", so it cannot collide with a real segment.
+_MOUNT_KEY = "/"
+
 @dataclass
 class ContextFile:
     """Represents a virtual file in the Agentic File System."""
@@ -10,6 +33,168 @@ class ContextFile:
     metadata: Dict[str, Any]
     token_count: Optional[int] = None
 
+class LazyContextFile:
+    """Stand-in for a ContextFile that loads its content on first access.
+
+    Metadata and token_count are carried eagerly; `content` is produced by
+    `loader` the first time it is read and then kept until `release()`.
+    Code that only reads `.content`, `.metadata` and `.token_count` cannot tell
+    it apart from a ContextFile. It is not a dataclass, so comparisons are by
+    identity and never force a load; use `load()` for a plain ContextFile to
+    compare, `dataclasses.replace` or `asdict`.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], str],
+        metadata: Optional[Dict[str, Any]] = None,
+        token_count: Optional[int] = None,
+        stream_loader: Optional[Callable[[int], Iterator[str]]] = None,
+        size_bytes: Optional[int] = None,
+    ):
+        self._loader = loader
+        self._stream_loader = stream_loader
+        self._content: Optional[str] = None
+        self.metadata = metadata if metadata is not None else {}
+        self.token_count = token_count
+        self.size_bytes = size_bytes
+
+    @property
+    def content(self) -> str:
+        if self._content is None:
+            self._content = self._loader()
+        return self._content
+
+    @content.setter
+    def content(self, value: str) -> None:
+        self._content = value
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._content is not None
+
+    def release(self) -> None:
+        """Drops loaded content; the next access reloads it."""
+        self._content = None
+
+    def load(self) -> ContextFile:
+        """Returns the file as a ContextFile, loading its content if needed."""
+        return ContextFile(content=self.content, metadata=self.metadata, token_count=self.token_count)
+
+    def iter_chunks(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+        """Yields the content in chunks without keeping it loaded, when possible."""
+        if self._content is None and self._stream_loader is not None:
+            return self._stream_loader(chunk_size)
+        content = self.content
+        return (content[start:start + chunk_size] for start in range(0, len(content), chunk_size))
+
+    def __repr__(self) -> str:
+        content = repr(self._content) if self._content is not None else "<not loaded>"
+        return (
+            f"LazyContextFile(content={content}, metadata={self.metadata!r}, "
+            f"token_count={self.token_count!r})"
+        )
+
+    @classmethod
+    def from_path(
+        cls,
+        file_path: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        token_count: Optional[int] = None,
+        encoding: str = "utf-8",
+    ) -> "LazyContextFile":
+        """Creates a lazy file whose content is decoded from a memory-mapped local file."""
+
+        def load() -> str:
+            with open(file_path, "rb") as handle:
+                if os.fstat(handle.fileno()).st_size == 0:
+                    return ""
+                with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return str(mapped, encoding)
+
+        return cls(
+            load,
+            metadata=metadata,
+            token_count=token_count,
+            stream_loader=lambda chunk_size: iter_file_chunks(file_path, chunk_size, encoding),
+            size_bytes=os.path.getsize(file_path),
+        )
+
+def iter_file_chunks(file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, encoding: str = "utf-8") -> Iterator[str]:
+    """Incrementally decodes a local file, `chunk_size` bytes at a time.
+
+    Multi-byte characters split across chunk boundaries are handled by an
+    incremental decoder, so chunks always contain whole characters.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    with open(file_path, "rb") as handle:
+        while True:
+            data = handle.read(chunk_size)
+            if not data:
+                break
+            text = decoder.decode(data)
+            if text:
+                yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+@dataclass
+class ContextStat:
+    """Lightweight description of a virtual file, obtained without its content.
+
+    Attributes:
+        views: Names of the available views.
+        sizes: Size in bytes (UTF-8) of each view.
+        metadata: The file metadata.
+        token_count: Cached token count, if the source knows one.
+        updated_at: UNIX timestamp of the last update, or None if the source
+            does not track it (stats built with `from_files` never have one).
+    """
+    views: List[str]
+    sizes: Dict[str, int] = field(default_factory=dict)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    token_count: Optional[int] = None
+    updated_at: Optional[float] = None
+
+    @staticmethod
+    def from_files(files: Dict[str, ContextFile]) -> "ContextStat":
+        """Builds a stat from already-read views (view -> file)."""
+        metadata: Dict[str, Any] = {}
+        token_count = None
+        for view in ("summary", "default"):
+            file_obj = files.get(view)
+            if file_obj is not None:
+                metadata = file_obj.metadata or {}
+                if file_obj.token_count is not None:
+                    token_count = file_obj.token_count
+        if token_count is None and isinstance(metadata.get("token_count"), int):
+            token_count = metadata["token_count"]
+        return ContextStat(
+            views=list(files),
+            sizes={view: len(file_obj.content.encode("utf-8")) for view, file_obj in files.items()},
+            metadata=metadata,
+            token_count=token_count,
+        )
+
+@dataclass
+class SearchReport:
+    """Outcome of a concurrent search across mounts.
+
+    Attributes:
+        paths: Full paths returned by mounts that answered in time.
+        timed_out: Mount points that did not answer before the timeout.
+        failed: Mount points whose search raised, mapped to the error repr.
+    """
+    paths: List[str] = field(default_factory=list)
+    timed_out: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def complete(self) -> bool:
+        """True if every mount answered successfully."""
+        return not self.timed_out and not self.failed
+
 class ContextSource(abc.ABC):
     """Abstract base class for sources in the Context File System."""
 
@@ -41,6 +226,57 @@ class ContextSource(abc.ABC):
         """
         pass
 
+    def ilist(self, path: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> Iterator[str]:
+        """Iterates the listing of `path` in a stable, resumable order.
+
+        Paths come out sorted by their '/'-separated segments. To fetch the
+        next page, pass the last path received as `cursor`; entries written or
+        removed between pages do not cause others to be skipped or repeated.
+
+        The default implementation sorts the result of `list`; sources with
+        large directories should override it to stream.
+
+        Args:
+            path: The relative path to list.
+            limit: Maximum number of paths to yield (None for all).
+            cursor: Resume after this previously returned path.
+
+        Returns:
+            An iterator of paths, in the same form `list` returns them.
+        """
+        return _page_listing(self.list(path), limit, cursor)
+
+    def ilist_range(
+        self,
+        path: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        limit: Optional[int] = None,
+        reverse: bool = True,
+    ) -> Iterator[str]:
+        """Iterates the files below `path` updated within [start, end), by time.
+
+        The default implementation stats the whole listing and orders it by
+        `ContextStat.updated_at`; sources that store entries by time (e.g.
+        time-partitioned history) should override it to visit only the
+        relevant entries.
+
+        Args:
+            path: The relative path to list.
+            start: Earliest UNIX timestamp included (None for no bound).
+            end: UNIX timestamp the range stops before (None for no bound).
+            limit: Maximum number of paths to yield (None for all).
+            reverse: Newest first (the default) instead of oldest first.
+
+        Returns:
+            An iterator of paths, in the same form `list` returns them.
+
+        Raises:
+            ValueError: If the source does not know when a listed file was
+                updated (its stat has no `updated_at`).
+        """
+        return _time_ordered(self.stat_many(list(self.ilist(path))), start, end, limit, reverse)
+
     @abc.abstractmethod
     def search(self, query: str) -> List[str]:
         """Searches for files matching the query.
@@ -53,6 +289,23 @@ class ContextSource(abc.ABC):
         """
         pass
 
+    def search_ranked(self, query: str, k: Optional[int] = None) -> List[Tuple[str, Optional[float]]]:
+        """Searches for files matching the query, best match first.
+
+        The default implementation returns the `search` results unscored (with
+        a score of None), in the source's order; sources that can score
+        matches (e.g. with BM25 over an inverted index) should override it.
+
+        Args:
+            query: The search query.
+            k: Maximum number of results (None for all).
+
+        Returns:
+            A list of (path, score) pairs, best first; the score is None for
+            results the source could not rank.
+        """
+        return [(path, None) for path in itertools.islice(self.search(query), k)]
+
     @abc.abstractmethod
     def write(self, path: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> None:
         """Writes content to a virtual file.
@@ -64,14 +317,365 @@ class ContextSource(abc.ABC):
         """
         pass
 
-class ContextRouter:
-    """The Router for the Agentic File System.
+    def read_many(
+        self,
+        paths: Sequence[str],
+        views: Sequence[str] = ("default",),
+    ) -> Dict[Tuple[str, str], ContextFile]:
+        """Reads several views of several files in one call.
 
-    Mounts ContextSources at specific prefixes and routes operations to them.
+        The default implementation loops over `read`; sources with a cheaper
+        bulk path (e.g. one SQL `IN (...)` query) should override it.
+
+        Args:
+            paths: Relative paths to read.
+            views: Views to read for every path.
+
+        Returns:
+            A dict keyed by (path, view). Missing files or views are omitted.
+        """
+        results = {}
+        for path in paths:
+            for view in views:
+                try:
+                    results[(path, view)] = self.read(path, view=view)
+                except (FileNotFoundError, ValueError):
+                    continue
+        return results
+
+    def read_stream(self, path: str, view: str = "default", chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+        """Reads a view as a sequence of text chunks.
+
+        The default implementation slices the result of `read`; sources backed
+        by large files should override it to decode incrementally.
+
+        Args:
+            path: The relative path to the file within this node.
+            view: The view to read.
+            chunk_size: Approximate chunk size (characters or bytes, per source).
+
+        Returns:
+            An iterator of text chunks whose concatenation is the view content.
+        """
+        content = self.read(path, view=view).content
+        return (content[start:start + chunk_size] for start in range(0, len(content), chunk_size))
+
+    def stat(self, path: str) -> ContextStat:
+        """Describes a file (views, sizes, metadata) without returning its content.
+
+        The default implementation reads the 'default' view through
+        `read_many`, and the 'summary' view only for files without one, so
+        it lists 'summary' only for summary-only files. Sources that can
+        answer from an index or record header should override it and list
+        every view.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+        """
+        found = self.stat_many([path])
+        if path not in found:
+            raise FileNotFoundError(f"File not found: {path}")
+        return found[path]
+
+    def stat_many(self, paths: Sequence[str]) -> Dict[str, ContextStat]:
+        """Stats several files. Missing files are omitted from the result."""
+        if type(self).stat is not ContextSource.stat:
+            results = {}
+            for path in paths:
+                try:
+                    results[path] = self.stat(path)
+                except (FileNotFoundError, ValueError):
+                    continue
+            return results
+
+        files: Dict[str, Dict[str, ContextFile]] = {}
+        for (path, view), file_obj in self.read_many(paths, ("default",)).items():
+            files[path] = {view: file_obj}
+        missing = [path for path in dict.fromkeys(paths) if path not in files]
+        if missing:
+            for (path, view), file_obj in self.read_many(missing, ("summary",)).items():
+                files[path] = {view: file_obj}
+        return {path: ContextStat.from_files(views) for path, views in files.items()}
+
+class AsyncContextSource(abc.ABC):
+    """Abstract base class for natively asynchronous sources.
+
+    Mirrors ContextSource with coroutine methods. Mount these on an
+    AsyncContextRouter; synchronous ContextSources are accepted there too and
+    run on an executor.
+    """
+
+    @abc.abstractmethod
+    async def aread(self, path: str, view: str = "default") -> ContextFile:
+        """Reads a virtual file.
+
+        Args:
+            path: The relative path to the file within this node.
+            view: The view to read (e.g., 'default', 'summary').
+
+        Returns:
+            A ContextFile object.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+        """
+        pass
+
+    @abc.abstractmethod
+    async def alist(self, path: str) -> List[str]:
+        """Lists virtual files in the given path."""
+        pass
+
+    async def ailist(
+        self, path: str, limit: Optional[int] = None, cursor: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Iterates a listing in a stable, resumable order; see ContextSource.ilist."""
+        for listed in _page_listing(await self.alist(path), limit, cursor):
+            yield listed
+
+    async def ailist_range(
+        self,
+        path: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        limit: Optional[int] = None,
+        reverse: bool = True,
+    ) -> AsyncIterator[str]:
+        """Iterates files updated within [start, end) by time; see ContextSource.ilist_range."""
+        paths = [listed async for listed in self.ailist(path)]
+        for listed in _time_ordered(await self.astat_many(paths), start, end, limit, reverse):
+            yield listed
+
+    @abc.abstractmethod
+    async def asearch(self, query: str) -> List[str]:
+        """Searches for files matching the query."""
+        pass
+
+    async def asearch_ranked(self, query: str, k: Optional[int] = None) -> List[Tuple[str, Optional[float]]]:
+        """Searches for files matching the query, best first; see ContextSource.search_ranked."""
+        return [(path, None) for path in itertools.islice(await self.asearch(query), k)]
+
+    @abc.abstractmethod
+    async def awrite(self, path: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """Writes content to a virtual file."""
+        pass
+
+    async def astat(self, path: str) -> ContextStat:
+        """Describes a file without its content; see ContextSource.stat."""
+        found = await self.astat_many([path])
+        if path not in found:
+            raise FileNotFoundError(f"File not found: {path}")
+        return found[path]
+
+    async def astat_many(self, paths: Sequence[str]) -> Dict[str, ContextStat]:
+        """Stats several files. Missing files are omitted from the result."""
+        if type(self).astat is not AsyncContextSource.astat:
+            answers = await asyncio.gather(*(self.astat(path) for path in paths), return_exceptions=True)
+            results = {}
+            for path, answer in zip(paths, answers):
+                if isinstance(answer, (FileNotFoundError, ValueError)):
+                    continue
+                if isinstance(answer, BaseException):
+                    raise answer
+                results[path] = answer
+            return results
+
+        files: Dict[str, Dict[str, ContextFile]] = {}
+        for (path, view), file_obj in (await self.aread_many(paths, ("default", "summary"))).items():
+            files.setdefault(path, {})[view] = file_obj
+        return {path: ContextStat.from_files(views) for path, views in files.items()}
+
+    async def aread_many(
+        self,
+        paths: Sequence[str],
+        views: Sequence[str] = ("default",),
+    ) -> Dict[Tuple[str, str], ContextFile]:
+        """Reads several views of several files; see ContextSource.read_many."""
+        keys = [(path, view) for path in paths for view in views]
+        answers = await asyncio.gather(
+            *(self.aread(path, view=view) for path, view in keys),
+            return_exceptions=True,
+        )
+        results = {}
+        for key, answer in zip(keys, answers):
+            if isinstance(answer, (FileNotFoundError, ValueError)):
+                continue
+            if isinstance(answer, BaseException):
+                raise answer
+            results[key] = answer
+        return results
+
+class _ExecutorSource(AsyncContextSource):
+    """Adapts a synchronous ContextSource by running its calls on an executor."""
+
+    def __init__(self, wrapped: ContextSource, executor: Optional[futures.Executor] = None):
+        self._wrapped = wrapped
+        self._executor = executor
+
+    @property
+    def wrapped(self) -> ContextSource:
+        return self._wrapped
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def aread(self, path: str, view: str = "default") -> ContextFile:
+        return await self._run(self._wrapped.read, path, view=view)
+
+    async def alist(self, path: str) -> List[str]:
+        return await self._run(self._wrapped.list, path)
+
+    async def ailist(
+        self, path: str, limit: Optional[int] = None, cursor: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        # Pull the wrapped iterator a page at a time so a huge listing never
+        # has to be materialized on the executor.
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = _LIST_PAGE_SIZE if remaining is None else min(remaining, _LIST_PAGE_SIZE)
+            page = await self._run(_take, self._wrapped.ilist, path, size, cursor)
+            for listed in page:
+                yield listed
+            if len(page) < size:
+                return
+            cursor = page[-1]
+            if remaining is not None:
+                remaining -= len(page)
+
+    async def ailist_range(
+        self,
+        path: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        limit: Optional[int] = None,
+        reverse: bool = True,
+    ) -> AsyncIterator[str]:
+        listing = await self._run(_take_range, self._wrapped.ilist_range, path, start, end, limit, reverse)
+        for listed in listing:
+            yield listed
+
+    async def asearch(self, query: str) -> List[str]:
+        return await self._run(self._wrapped.search, query)
+
+    async def asearch_ranked(self, query: str, k: Optional[int] = None) -> List[Tuple[str, Optional[float]]]:
+        return await self._run(self._wrapped.search_ranked, query, k)
+
+    async def awrite(self, path: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        await self._run(self._wrapped.write, path, content, metadata)
+
+    async def aread_many(
+        self,
+        paths: Sequence[str],
+        views: Sequence[str] = ("default",),
+    ) -> Dict[Tuple[str, str], ContextFile]:
+        return await self._run(self._wrapped.read_many, paths, views)
+
+    async def astat(self, path: str) -> ContextStat:
+        return await self._run(self._wrapped.stat, path)
+
+    async def astat_many(self, paths: Sequence[str]) -> Dict[str, ContextStat]:
+        return await self._run(self._wrapped.stat_many, paths)
+
+def _merge_ranked(
+    mount_results: List[Tuple[str, List[Tuple[str, Optional[float]]]]], k: Optional[int]
+) -> List[Tuple[str, Optional[float]]]:
+    """Merges per-mount ranked results into the `k` best (all if k is None).
+
+    Each mount's scores are divided by its best score, so every mount's top
+    hit scores 1.0 whatever the scale of its ranking function. Unscored
+    results keep a score of None and are placed by their position in the
+    mount's order instead. Ties keep mount order.
+    """
+    merged = []
+    for mount_point, results in mount_results:
+        best = max((score for _, score in results if score is not None), default=0.0)
+        for position, (path, score) in enumerate(results):
+            if score is not None:
+                score = score / best if best > 0 else 0.0
+                rank = score
+            else:
+                rank = 1.0 - position / len(results)
+            merged.append((rank, _join_path(mount_point, path), score))
+    if k is None:
+        best_first = sorted(merged, key=lambda item: item[0], reverse=True)
+    else:
+        best_first = heapq.nlargest(k, merged, key=lambda item: item[0])
+    return [(path, score) for _, path, score in best_first]
+
+def _page_listing(paths: List[str], limit: Optional[int], cursor: Optional[str]) -> Iterator[str]:
+    """Orders a materialized listing and cuts the page after `cursor`."""
+    paths = sorted(paths, key=path_segments)
+    start = 0
+    if cursor is not None:
+        start = bisect.bisect_right([path_segments(path) for path in paths], path_segments(cursor))
+    return itertools.islice(paths, start, None if limit is None else start + limit)
+
+def _take(ilist: Callable[..., Iterator[str]], path: str, limit: int, cursor: Optional[str]) -> List[str]:
+    return list(ilist(path, limit=limit, cursor=cursor))
+
+def _take_range(ilist_range: Callable[..., Iterator[str]], *args) -> List[str]:
+    return list(ilist_range(*args))
+
+def _next_deadline(started: Dict[str, float], mount_points: Iterable[str], timeout: Optional[float]) -> Optional[float]:
+    """Seconds until the first running search among `mount_points` exceeds `timeout`."""
+    if timeout is None:
+        return None
+    deadlines = [started[mount_point] + timeout for mount_point in mount_points if mount_point in started]
+    if not deadlines:
+        # Nothing has started yet (the pool is busy); check again shortly.
+        return min(timeout, 0.05)
+    return max(0.0, min(deadlines) - time.monotonic())
+
+def _time_ordered(
+    stats: Dict[str, ContextStat],
+    start: Optional[float],
+    end: Optional[float],
+    limit: Optional[int],
+    reverse: bool,
+) -> Iterator[str]:
+    """Orders stat-ed paths by `updated_at`, keeping those within [start, end)."""
+    for path, file_stat in stats.items():
+        if file_stat.updated_at is None:
+            raise ValueError(f"Cannot order '{path}' by time: its source does not track updated_at")
+    stamped = sorted(
+        (file_stat.updated_at, path)
+        for path, file_stat in stats.items()
+        if (start is None or file_stat.updated_at >= start)
+        and (end is None or file_stat.updated_at < end)
+    )
+    if reverse:
+        stamped.reverse()
+    return (path for _, path in itertools.islice(stamped, limit))
+
+def _content_size(file_obj: Union[ContextFile, LazyContextFile]) -> int:
+    """UTF-8 size of a returned file; unloaded lazy files report their `size_bytes`."""
+    if isinstance(file_obj, LazyContextFile) and not file_obj.is_loaded:
+        return file_obj.size_bytes or 0
+    return len(file_obj.content.encode("utf-8"))
+
+def _batch_size(files: Dict[Tuple[str, str], ContextFile]) -> int:
+    return sum(_content_size(file_obj) for file_obj in files.values())
+
+def _join_path(mount_point: str, rel_path: str) -> str:
+    """Joins a mount point and a source-relative path into a full path."""
+    return f"{mount_point}/{rel_path}".replace("//", "/")
+
+class _MountTable:
+    """Mount table shared by the sync and async routers.
+
+    Mount points are compiled into a segment trie, so resolving a path costs
+    one dict lookup per path segment regardless of how many sources are
+    mounted. Recently resolved paths are memoized in a bounded LRU that is
+    cleared whenever the mount table changes.
     """
 
-    def __init__(self):
-        self._mounts: Dict[str, ContextSource] = {}
+    def __init__(self, resolve_cache_size: int = 4096, instrumentation: Optional[Instrumentation] = None):
+        self._instrumentation = instrumentation or NULL_INSTRUMENTATION
+        self._mounts: Dict[str, Any] = {}
+        self._trie: Dict[str, Any] = {}
+        self._resolve_cache_size = resolve_cache_size
+        self._cached_lookup = functools.lru_cache(maxsize=resolve_cache_size)(self._lookup)
 
     def mount(self, path_prefix: str, node: ContextSource) -> None:
         """Mounts a ContextSource at a specific path prefix.
@@ -81,15 +685,120 @@ class ContextRouter:
                          Must start with '/'.
             node: The ContextSource to mount.
         """
+        path_prefix = self._normalize_prefix(path_prefix)
+        self._mounts[path_prefix] = node
+        self._insert_index(path_prefix)
+
+    def unmount(self, path_prefix: str) -> ContextSource:
+        """Removes the ContextSource mounted at a path prefix.
+
+        Args:
+            path_prefix: The prefix the source was mounted at.
+
+        Returns:
+            The ContextSource that was unmounted.
+
+        Raises:
+            FileNotFoundError: If nothing is mounted at the prefix.
+        """
+        path_prefix = self._normalize_prefix(path_prefix)
+        if path_prefix not in self._mounts:
+            raise FileNotFoundError(f"No mount point found at: {path_prefix}")
+        node = self._mounts.pop(path_prefix)
+        self._rebuild_index()
+        return node
+
+    def mounts(self) -> Dict[str, ContextSource]:
+        """Returns a copy of the mount table (prefix -> source)."""
+        return dict(self._mounts)
+
+    @property
+    def instrumentation(self) -> Instrumentation:
+        """Metrics and tracing hooks (a no-op unless one was passed in)."""
+        return self._instrumentation
+
+    def _call(
+        self,
+        mount_point: str,
+        operation: str,
+        func: Callable,
+        *args,
+        measure: Optional[Callable[[Any], int]] = None,
+        **kwargs,
+    ) -> Any:
+        """Calls a source method, recording latency/size/errors when instrumented."""
+        instrumentation = self._instrumentation
+        if not instrumentation.enabled:
+            return func(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            instrumentation.record(mount_point, operation, time.perf_counter() - started, error=True)
+            raise
+        size = measure(result) if measure is not None else 0
+        instrumentation.record(mount_point, operation, time.perf_counter() - started, size)
+        return result
+
+    async def _acall(
+        self,
+        mount_point: str,
+        operation: str,
+        func: Callable,
+        *args,
+        measure: Optional[Callable[[Any], int]] = None,
+        **kwargs,
+    ) -> Any:
+        """Async variant of `_call` for coroutine source methods."""
+        instrumentation = self._instrumentation
+        if not instrumentation.enabled:
+            return await func(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            result = await func(*args, **kwargs)
+        except Exception:
+            instrumentation.record(mount_point, operation, time.perf_counter() - started, error=True)
+            raise
+        size = measure(result) if measure is not None else 0
+        instrumentation.record(mount_point, operation, time.perf_counter() - started, size)
+        return result
+
+    def _normalize_prefix(self, path_prefix: str) -> str:
         if not path_prefix.startswith("/"):
             raise ValueError("Path prefix must start with '/'")
         # Ensure prefix doesn't end with / unless it's just root (though usually we want distinct mounts)
         if path_prefix != "/" and path_prefix.endswith("/"):
             path_prefix = path_prefix.rstrip("/")
-        
-        self._mounts[path_prefix] = node
+        return path_prefix
 
-    def _resolve(self, path: str) -> tuple[ContextSource, str]:
+    def _insert_index(self, mount_point: str) -> None:
+        """Adds a mount point to the trie and drops memoized resolutions."""
+        node = self._trie
+        if mount_point != "/":
+            for segment in mount_point[1:].split("/"):
+                node = node.setdefault(segment, {})
+        node[_MOUNT_KEY] = mount_point
+        self._cached_lookup.cache_clear()
+
+    def _rebuild_index(self) -> None:
+        """Recompiles the mount trie from the mount table."""
+        self._trie = {}
+        for mount_point in self._mounts:
+            self._insert_index(mount_point)
+        self._cached_lookup.cache_clear()
+
+    def _lookup(self, path: str) -> Optional[str]:
+        """Returns the deepest mount point that owns `path`, if any."""
+        node = self._trie
+        match = node.get(_MOUNT_KEY)
+        for segment in path[1:].split("/"):
+            node = node.get(segment)
+            if node is None:
+                break
+            match = node.get(_MOUNT_KEY, match)
+        return match
+
+    def _resolve(self, path: str) -> Tuple[Any, str]:
         """Resolves a full path to a (node, relative_path) tuple.
 
         Args:
@@ -101,23 +810,75 @@ class ContextRouter:
         Raises:
             FileNotFoundError: If no mount point matches the path.
         """
+        mount_point, node, rel_path = self._resolve_mount(path)
+        return node, rel_path
+
+    def _resolve_mount(self, path: str) -> Tuple[str, Any, str]:
+        """Like `_resolve`, but also returns the matching mount point."""
         if not path.startswith("/"):
              raise ValueError("Path must be absolute (start with '/')")
 
-        # Sort mounts by length (descending) to match specific prefixes first
-        sorted_mounts = sorted(self._mounts.keys(), key=len, reverse=True)
+        mount_point = self._cached_lookup(path)
+        if mount_point is None:
+            raise FileNotFoundError(f"No mount point found for path: {path}")
 
-        for mount_point in sorted_mounts:
-            if path == mount_point or path.startswith(mount_point + "/"):
-                node = self._mounts[mount_point]
-                # specific case for root mount
-                if mount_point == "/":
-                    rel_path = path[1:] # strip leading /
-                else:
-                    rel_path = path[len(mount_point):].lstrip("/")
-                return node, rel_path
+        node = self._mounts[mount_point]
+        # specific case for root mount
+        if mount_point == "/":
+            rel_path = path[1:] # strip leading /
+        else:
+            rel_path = path[len(mount_point):].lstrip("/")
+        return mount_point, node, rel_path
 
-        raise FileNotFoundError(f"No mount point found for path: {path}")
+    def _relative_cursor(self, mount_point: str, cursor: Optional[str]) -> Optional[str]:
+        """Maps a full-path listing cursor back to the source-relative form."""
+        if cursor is None:
+            return None
+        if mount_point == "/":
+            return cursor[1:]
+        if cursor != mount_point and not cursor.startswith(f"{mount_point}/"):
+            raise ValueError(f"Cursor '{cursor}' does not belong to mount '{mount_point}'")
+        return cursor[len(mount_point):].lstrip("/")
+
+    def _group_by_mount(self, paths: Sequence[str]) -> Dict[str, Tuple[Any, Dict[str, str]]]:
+        """Groups full paths by mount point as {mount: (node, {rel_path: full_path})}.
+
+        Paths that do not resolve to a mount are dropped.
+        """
+        groups: Dict[str, Tuple[Any, Dict[str, str]]] = {}
+        for path in paths:
+            try:
+                mount_point, node, rel_path = self._resolve_mount(path)
+            except (FileNotFoundError, ValueError):
+                continue
+            groups.setdefault(mount_point, (node, {}))[1][rel_path] = path
+        return groups
+
+class ContextRouter(_MountTable):
+    """The Router for the Agentic File System.
+
+    Mounts ContextSources at specific prefixes and routes operations to them.
+    Concurrent searches run on one thread pool owned by the router, created
+    on first use; `close()` shuts it down.
+    """
+
+    def __init__(
+        self,
+        resolve_cache_size: int = 4096,
+        instrumentation: Optional[Instrumentation] = None,
+        search_workers: int = 32,
+    ):
+        super().__init__(resolve_cache_size, instrumentation)
+        self._search_workers = search_workers
+        self._search_executor: Optional[futures.ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def close(self) -> None:
+        """Shuts down the search thread pool; searches still running finish in the background."""
+        with self._executor_lock:
+            executor, self._search_executor = self._search_executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
 
     def open(self, path: str, view: str = "default") -> ContextFile:
         """Opens a virtual file.
@@ -129,44 +890,489 @@ class ContextRouter:
         Returns:
             A ContextFile object.
         """
-        node, rel_path = self._resolve(path)
-        return node.read(rel_path, view=view)
+        mount_point, node, rel_path = self._resolve_mount(path)
+        return self._call(mount_point, "open", node.read, rel_path, view=view, measure=_content_size)
+
+    def open_many(
+        self,
+        paths: Sequence[str],
+        views: Sequence[str] = ("default",),
+    ) -> Dict[Tuple[str, str], ContextFile]:
+        """Opens several views of several files with one batched call per mount.
+
+        Args:
+            paths: Full paths to open.
+            views: Views to read for every path.
+
+        Returns:
+            A dict keyed by (full_path, view). Missing files, views and
+            unmounted paths are omitted.
+        """
+        results = {}
+        for mount_point, (node, rel_to_full) in self._group_by_mount(paths).items():
+            batch = self._call(
+                mount_point, "open_many", node.read_many, list(rel_to_full), views, measure=_batch_size
+            )
+            for (rel_path, view), file_obj in batch.items():
+                results[(rel_to_full[rel_path], view)] = file_obj
+        return results
+
+    def open_lazy(self, path: str, view: str = "default") -> LazyContextFile:
+        """Opens a virtual file whose content is only read on first access.
+
+        Metadata comes from `stat`, so a missing file or view still raises here.
+        """
+        return self._lazy_file(path, view, self.stat(path))
+
+    def open_many_lazy(
+        self,
+        paths: Sequence[str],
+        views: Sequence[str] = ("default",),
+    ) -> Dict[Tuple[str, str], LazyContextFile]:
+        """Like `open_many`, but only stats files now and defers content reads."""
+        results = {}
+        for path, file_stat in self.stat_many(paths).items():
+            for view in views:
+                if view in file_stat.views:
+                    results[(path, view)] = self._lazy_file(path, view, file_stat)
+        return results
+
+    def _lazy_file(self, path: str, view: str, file_stat: ContextStat) -> LazyContextFile:
+        if view not in file_stat.views:
+            raise ValueError(f"View '{view}' not found for file {path}")
+        return LazyContextFile(
+            lambda: self.open(path, view=view).content,
+            metadata=file_stat.metadata,
+            # The stat's token count describes the file's primary (default) view.
+            token_count=file_stat.token_count if view == "default" else None,
+            stream_loader=lambda chunk_size: self.open_stream(path, view=view, chunk_size=chunk_size),
+            size_bytes=file_stat.sizes.get(view),
+        )
+
+    def open_stream(self, path: str, view: str = "default", chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+        """Opens a virtual file as an iterator of text chunks.
+
+        When instrumented, the "open_stream" operation is recorded once the
+        stream is exhausted, fails or is closed, with the UTF-8 bytes read as
+        its size and the time from opening as its latency.
+        """
+        mount_point, node, rel_path = self._resolve_mount(path)
+        instrumentation = self._instrumentation
+        if not instrumentation.enabled:
+            return node.read_stream(rel_path, view=view, chunk_size=chunk_size)
+        started = time.perf_counter()
+        try:
+            chunks = node.read_stream(rel_path, view=view, chunk_size=chunk_size)
+        except Exception:
+            instrumentation.record(mount_point, "open_stream", time.perf_counter() - started, error=True)
+            raise
+        return self._recorded_stream(mount_point, chunks, started)
+
+    def _recorded_stream(self, mount_point: str, chunks: Iterator[str], started: float) -> Iterator[str]:
+        size = 0
+        error = False
+        try:
+            for chunk in chunks:
+                size += len(chunk.encode("utf-8"))
+                yield chunk
+        except Exception:
+            error = True
+            raise
+        finally:
+            self._instrumentation.record(mount_point, "open_stream", time.perf_counter() - started, size, error)
 
     def list(self, path: str) -> List[str]:
          """Lists files at a given path."""
-         node, rel_path = self._resolve(path)
-         return node.list(rel_path)
+         mount_point, node, rel_path = self._resolve_mount(path)
+         return self._call(mount_point, "list", node.list, rel_path, measure=len)
+
+    def ilist(self, path: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> Iterator[str]:
+        """Iterates the listing of a path lazily, in a stable order.
+
+        Args:
+            path: The directory to list.
+            limit: Maximum number of paths to yield (None for all).
+            cursor: Resume after this full path, typically the last one
+                returned by a previous call.
+
+        Returns:
+            An iterator of full paths; see ContextSource.ilist for the order.
+        """
+        mount_point, node, rel_path = self._resolve_mount(path)
+        rel_cursor = self._relative_cursor(mount_point, cursor)
+        listing = self._call(mount_point, "ilist", node.ilist, rel_path, limit=limit, cursor=rel_cursor)
+        return (_join_path(mount_point, listed) for listed in listing)
+
+    def ilist_range(
+        self,
+        path: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        limit: Optional[int] = None,
+        reverse: bool = True,
+    ) -> Iterator[str]:
+        """Iterates the files below a path updated within [start, end), newest first.
+
+        See ContextSource.ilist_range for the arguments.
+
+        Returns:
+            An iterator of full paths.
+        """
+        mount_point, node, rel_path = self._resolve_mount(path)
+        listing = self._call(mount_point, "ilist_range", node.ilist_range, rel_path, start, end, limit, reverse)
+        return (_join_path(mount_point, listed) for listed in listing)
     
     def search(self, query: str) -> List[str]:
         """Global search across all mounts (naive implementation).
         
-        For a real system, you might want to only search specific mounts or parallelize.
-        Here we'll iterate all mounts.
+        Mounts are searched one after another and the first failure propagates.
+        Use `search_concurrent` or `search_iter` to fan out in parallel.
         """
         results = []
         for mount_point, node in self._mounts.items():
             # This is a bit simplistic as search logic might vary per node
             # We assume node.search returns relative paths, so we prepend mount point
-            node_results = node.search(query)
+            node_results = self._call(mount_point, "search", node.search, query, measure=len)
             for res in node_results:
-                full_path = f"{mount_point}/{res}".replace("//", "/")
-                results.append(full_path)
+                results.append(_join_path(mount_point, res))
+        return results
+
+    def search_ranked(self, query: str, k: Optional[int] = None) -> List[Tuple[str, Optional[float]]]:
+        """Ranked search across all mounts, merged into one top-k list.
+
+        Each mount returns at most `k` results; see
+        ContextSource.search_ranked. Scores are normalised per mount (its
+        best hit scores 1.0) before the merge, and unscored results are
+        placed by their position in their mount's order.
+
+        Returns:
+            A list of (full path, score) pairs, best first; the score is None
+            for results their source could not rank.
+        """
+        mount_results = []
+        for mount_point, node in self._mounts.items():
+            node_results = self._call(mount_point, "search", node.search_ranked, query, k, measure=len)
+            mount_results.append((mount_point, node_results))
+        return _merge_ranked(mount_results, k)
+
+    def search_iter(
+        self,
+        query: str,
+        timeout: Optional[float] = None,
+        limit: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        report: Optional["SearchReport"] = None,
+    ) -> Iterator[str]:
+        """Searches all mounts concurrently, yielding full paths as each mount answers.
+
+        Mount searches run on the router's thread pool. Stopping the
+        iteration early cancels the searches that have not started; running
+        ones cannot be interrupted and finish in the background.
+
+        Args:
+            query: The search query.
+            timeout: Seconds each mount's search may run, counted from when it
+                starts. Mounts that exceed it are skipped and reported; results
+                that arrived in time are kept however slowly they are consumed.
+            limit: Maximum number of results taken from each mount.
+            max_workers: Maximum number of this call's mount searches running
+                at once (defaults to all of them, within the router's pool).
+            report: Optional SearchReport filled in with paths, timeouts and failures.
+
+        Yields:
+            Full paths, grouped by mount in completion order.
+        """
+        report = report if report is not None else SearchReport()
+        waiting = list(reversed(self._mounts.items()))
+        if not waiting:
+            return
+        executor = self._executor()
+        slots = max_workers or len(waiting)
+        started: Dict[str, float] = {}
+
+        def run(mount_point: str, node: ContextSource) -> List[str]:
+            started[mount_point] = time.monotonic()
+            return self._call(mount_point, "search", node.search, query, measure=len)
+
+        pending: Dict[futures.Future, str] = {}
+        try:
+            while waiting or pending:
+                while waiting and len(pending) < slots:
+                    mount_point, node = waiting.pop()
+                    pending[executor.submit(run, mount_point, node)] = mount_point
+                done, _ = futures.wait(
+                    list(pending),
+                    timeout=_next_deadline(started, pending.values(), timeout),
+                    return_when=futures.FIRST_COMPLETED,
+                )
+                for future in done:
+                    mount_point = pending.pop(future)
+                    try:
+                        node_results = future.result()
+                    except Exception as exc:
+                        report.failed[mount_point] = repr(exc)
+                        continue
+                    if limit is not None:
+                        node_results = node_results[:limit]
+                    for res in node_results:
+                        full_path = _join_path(mount_point, res)
+                        report.paths.append(full_path)
+                        yield full_path
+                if timeout is None:
+                    continue
+                now = time.monotonic()
+                for future, mount_point in list(pending.items()):
+                    began = started.get(mount_point)
+                    if began is not None and now - began >= timeout and not future.done():
+                        del pending[future]
+                        report.timed_out.append(mount_point)
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _executor(self) -> futures.ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._search_executor is None:
+                self._search_executor = futures.ThreadPoolExecutor(
+                    max_workers=self._search_workers, thread_name_prefix="context-search"
+                )
+            return self._search_executor
+
+    def search_concurrent(
+        self,
+        query: str,
+        timeout: Optional[float] = None,
+        limit: Optional[int] = None,
+        max_workers: Optional[int] = None,
+    ) -> "SearchReport":
+        """Searches all mounts concurrently and collects the (possibly partial) results.
+
+        Slow or failing mounts degrade into partial results instead of failing
+        the whole query; see `SearchReport.timed_out` and `SearchReport.failed`.
+        """
+        report = SearchReport()
+        for _ in self.search_iter(
+            query, timeout=timeout, limit=limit, max_workers=max_workers, report=report
+        ):
+            pass
+        return report
+
+    def stat(self, path: str) -> ContextStat:
+        """Describes a virtual file without reading its content."""
+        mount_point, node, rel_path = self._resolve_mount(path)
+        return self._call(mount_point, "stat", node.stat, rel_path)
+
+    def stat_many(self, paths: Sequence[str]) -> Dict[str, ContextStat]:
+        """Stats several files with one batched call per mount.
+
+        Returns:
+            A dict keyed by full path. Missing and unmounted paths are omitted.
+        """
+        results = {}
+        for mount_point, (node, rel_to_full) in self._group_by_mount(paths).items():
+            batch = self._call(mount_point, "stat_many", node.stat_many, list(rel_to_full), measure=len)
+            for rel_path, file_stat in batch.items():
+                results[rel_to_full[rel_path]] = file_stat
         return results
 
     def exists(self, path: str) -> bool:
         """Checks if a file exists."""
         try:
-            # Try reading default view, then fall back to summary for summary-only sources.
-            self.open(path)
+            self.stat(path)
             return True
         except (FileNotFoundError, ValueError):
-            try:
-                self.open(path, view="summary")
-                return True
-            except (FileNotFoundError, ValueError):
-                return False
+            return False
 
     def write(self, path: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> None:
         """Writes to a virtual file."""
-        node, rel_path = self._resolve(path)
-        node.write(rel_path, content, metadata)
+        mount_point, node, rel_path = self._resolve_mount(path)
+        self._call(
+            mount_point, "write", node.write, rel_path, content, metadata, measure=lambda _: len(content.encode("utf-8"))
+        )
+
+class AsyncContextRouter(_MountTable):
+    """Asyncio counterpart of ContextRouter.
+
+    Accepts both AsyncContextSource and ContextSource mounts; synchronous
+    sources are wrapped so their calls run on `executor` (the loop's default
+    executor when None) instead of blocking the event loop.
+    """
+
+    def __init__(
+        self,
+        resolve_cache_size: int = 4096,
+        executor: Optional[futures.Executor] = None,
+        instrumentation: Optional[Instrumentation] = None,
+    ):
+        super().__init__(resolve_cache_size=resolve_cache_size, instrumentation=instrumentation)
+        self._executor = executor
+
+    def mount(self, path_prefix: str, node: Union[ContextSource, AsyncContextSource]) -> None:
+        """Mounts a sync or async source at a specific path prefix."""
+        if isinstance(node, ContextSource):
+            node = _ExecutorSource(node, self._executor)
+        elif not isinstance(node, AsyncContextSource):
+            raise TypeError(f"Cannot mount {type(node).__name__}: not a context source")
+        super().mount(path_prefix, node)
+
+    async def open(self, path: str, view: str = "default") -> ContextFile:
+        """Opens a virtual file."""
+        mount_point, node, rel_path = self._resolve_mount(path)
+        return await self._acall(mount_point, "open", node.aread, rel_path, view=view, measure=_content_size)
+
+    async def open_many(
+        self,
+        paths: Sequence[str],
+        views: Sequence[str] = ("default",),
+    ) -> Dict[Tuple[str, str], ContextFile]:
+        """Opens several views of several files; one concurrent batch per mount."""
+        groups = list(self._group_by_mount(paths).items())
+        batches = await asyncio.gather(*(
+            self._acall(mount_point, "open_many", node.aread_many, list(rel_to_full), views, measure=_batch_size)
+            for mount_point, (node, rel_to_full) in groups
+        ))
+        results = {}
+        for (_, (_, rel_to_full)), batch in zip(groups, batches):
+            for (rel_path, view), file_obj in batch.items():
+                results[(rel_to_full[rel_path], view)] = file_obj
+        return results
+
+    async def list(self, path: str) -> List[str]:
+        """Lists files at a given path."""
+        mount_point, node, rel_path = self._resolve_mount(path)
+        return await self._acall(mount_point, "list", node.alist, rel_path, measure=len)
+
+    async def ilist(
+        self, path: str, limit: Optional[int] = None, cursor: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Iterates the listing of a path lazily; see ContextRouter.ilist."""
+        mount_point, node, rel_path = self._resolve_mount(path)
+        rel_cursor = self._relative_cursor(mount_point, cursor)
+        async for listed in node.ailist(rel_path, limit=limit, cursor=rel_cursor):
+            yield _join_path(mount_point, listed)
+
+    async def ilist_range(
+        self,
+        path: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        limit: Optional[int] = None,
+        reverse: bool = True,
+    ) -> AsyncIterator[str]:
+        """Iterates files updated within [start, end) by time; see ContextRouter.ilist_range."""
+        mount_point, node, rel_path = self._resolve_mount(path)
+        async for listed in node.ailist_range(rel_path, start, end, limit, reverse):
+            yield _join_path(mount_point, listed)
+
+    async def search(self, query: str) -> List[str]:
+        """Searches all mounts concurrently; the first failure propagates."""
+        mounts = list(self._mounts.items())
+        answers = await asyncio.gather(*(
+            self._acall(mount_point, "search", node.asearch, query, measure=len)
+            for mount_point, node in mounts
+        ))
+        results = []
+        for (mount_point, _), node_results in zip(mounts, answers):
+            for res in node_results:
+                results.append(_join_path(mount_point, res))
+        return results
+
+    async def search_ranked(self, query: str, k: Optional[int] = None) -> List[Tuple[str, Optional[float]]]:
+        """Ranked search across all mounts concurrently; see ContextRouter.search_ranked."""
+        mounts = list(self._mounts.items())
+        answers = await asyncio.gather(*(
+            self._acall(mount_point, "search", node.asearch_ranked, query, k, measure=len)
+            for mount_point, node in mounts
+        ))
+        return _merge_ranked([(mount_point, results) for (mount_point, _), results in zip(mounts, answers)], k)
+
+    async def search_iter(
+        self,
+        query: str,
+        timeout: Optional[float] = None,
+        limit: Optional[int] = None,
+        report: Optional[SearchReport] = None,
+    ) -> AsyncIterator[str]:
+        """Searches all mounts concurrently, yielding full paths as each mount answers.
+
+        Args:
+            query: The search query.
+            timeout: Seconds each mount has to answer; late mounts are reported.
+            limit: Maximum number of results taken from each mount.
+            report: Optional SearchReport filled in with paths, timeouts and failures.
+        """
+        report = report if report is not None else SearchReport()
+
+        async def run(mount_point: str, node: AsyncContextSource):
+            try:
+                search = self._acall(mount_point, "search", node.asearch, query, measure=len)
+                return mount_point, await asyncio.wait_for(search, timeout), None
+            except asyncio.TimeoutError:
+                return mount_point, None, None
+            except Exception as exc:
+                return mount_point, None, exc
+
+        tasks = [asyncio.ensure_future(run(mount_point, node)) for mount_point, node in self._mounts.items()]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                mount_point, node_results, error = await next_done
+                if error is not None:
+                    report.failed[mount_point] = repr(error)
+                    continue
+                if node_results is None:
+                    report.timed_out.append(mount_point)
+                    continue
+                if limit is not None:
+                    node_results = node_results[:limit]
+                for res in node_results:
+                    full_path = _join_path(mount_point, res)
+                    report.paths.append(full_path)
+                    yield full_path
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def search_concurrent(
+        self,
+        query: str,
+        timeout: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> SearchReport:
+        """Searches all mounts concurrently and collects the (possibly partial) results."""
+        report = SearchReport()
+        async for _ in self.search_iter(query, timeout=timeout, limit=limit, report=report):
+            pass
+        return report
+
+    async def stat(self, path: str) -> ContextStat:
+        """Describes a virtual file without reading its content."""
+        mount_point, node, rel_path = self._resolve_mount(path)
+        return await self._acall(mount_point, "stat", node.astat, rel_path)
+
+    async def stat_many(self, paths: Sequence[str]) -> Dict[str, ContextStat]:
+        """Stats several files; one concurrent batch per mount."""
+        groups = list(self._group_by_mount(paths).items())
+        batches = await asyncio.gather(*(
+            self._acall(mount_point, "stat_many", node.astat_many, list(rel_to_full), measure=len)
+            for mount_point, (node, rel_to_full) in groups
+        ))
+        results = {}
+        for (_, (_, rel_to_full)), batch in zip(groups, batches):
+            for rel_path, file_stat in batch.items():
+                results[rel_to_full[rel_path]] = file_stat
+        return results
+
+    async def exists(self, path: str) -> bool:
+        """Checks if a file exists."""
+        try:
+            await self.stat(path)
+            return True
+        except (FileNotFoundError, ValueError):
+            return False
+
+    async def write(self, path: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """Writes to a virtual file."""
+        mount_point, node, rel_path = self._resolve_mount(path)
+        await self._acall(
+            mount_point, "write", node.awrite, rel_path, content, metadata, measure=lambda _: len(content.encode("utf-8"))
+        )
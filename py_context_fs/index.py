@@ -0,0 +1,421 @@
+import abc
+import bisect
+import fnmatch
+import itertools
+import os
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+def path_segments(path: str) -> Tuple[str, ...]:
+    """Sort key giving the stable listing order used by `ilist`.
+
+    Paths are ordered by their '/'-separated segments, which is the order of a
+    depth-first walk that visits the entries of every directory sorted by name.
+    """
+    return tuple(path.split("/"))
+
+
+def scan_tree(
+    directory: str,
+    base: str = "",
+    after: Tuple[str, ...] = (),
+    name_prefix: str = "",
+) -> Iterator[Tuple[str, os.DirEntry]]:
+    """Walks a local directory with `os.scandir` in `path_segments` order.
+
+    Yields `(base + relative path, entry)` for every entry below `directory`
+    that is not a directory; symlinked directories are not followed. Each
+    directory is scanned once and its names sorted, so no per-entry stat is
+    needed on platforms that report entry types.
+
+    Args:
+        directory: Directory to walk.
+        base: Prefix prepended to every yielded path.
+        after: `path_segments` of a cursor relative to `directory`; only
+            entries after it are yielded.
+        name_prefix: Only names in `directory` itself starting with this are
+            visited.
+    """
+    try:
+        with os.scandir(directory) as scan:
+            entries = sorted(
+                (entry for entry in scan if entry.name.startswith(name_prefix)),
+                key=lambda entry: entry.name,
+            )
+    except (FileNotFoundError, NotADirectoryError):
+        return
+    for entry in entries:
+        name = entry.name
+        is_dir = entry.is_dir(follow_symlinks=False)
+        if after:
+            if name < after[0]:
+                continue
+            if name == after[0]:
+                # An entry equal to the cursor was already yielded; a
+                # directory of that name may still hold later entries.
+                if is_dir:
+                    yield from scan_tree(entry.path, f"{base}{name}/", after[1:])
+                continue
+            after = ()
+        if is_dir:
+            yield from scan_tree(entry.path, f"{base}{name}/")
+        else:
+            yield base + name, entry
+
+
+class _DirNode:
+    __slots__ = ("dirs", "files", "_names")
+
+    def __init__(self):
+        self.dirs: Dict[str, "_DirNode"] = {}
+        self.files: Set[str] = set()
+        # Sorted union of `files` and `dirs`, built on first listing and then
+        # kept up to date in place.
+        self._names: Optional[List[str]] = None
+
+    def names(self) -> List[str]:
+        if self._names is None:
+            self._names = sorted(self.files.union(self.dirs))
+        return self._names
+
+    def _name_added(self, name: str) -> None:
+        if self._names is not None:
+            bisect.insort(self._names, name)
+
+    def _name_removed(self, name: str) -> None:
+        if self._names is not None and name not in self.files and name not in self.dirs:
+            index = bisect.bisect_left(self._names, name)
+            if index < len(self._names) and self._names[index] == name:
+                del self._names[index]
+
+
+class PathIndex:
+    """Segment trie over '/'-separated paths.
+
+    Listing a subtree costs time proportional to the entries it yields (plus
+    one sort per directory the first time it is listed), not to the number of
+    indexed paths. A path may be both a file and a directory ("a" and "a/b").
+    """
+
+    def __init__(self):
+        self._root = _DirNode()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, path: str) -> bool:
+        *dirs, name = path.split("/")
+        node = self._find(dirs)
+        return node is not None and name in node.files
+
+    def add(self, path: str) -> None:
+        *dirs, name = path.split("/")
+        node = self._root
+        for segment in dirs:
+            child = node.dirs.get(segment)
+            if child is None:
+                child = node.dirs[segment] = _DirNode()
+                if segment not in node.files:
+                    node._name_added(segment)
+            node = child
+        if name not in node.files:
+            node.files.add(name)
+            if name not in node.dirs:
+                node._name_added(name)
+            self._size += 1
+
+    def discard(self, path: str) -> None:
+        *dirs, name = path.split("/")
+        trail = [(None, self._root)]
+        for segment in dirs:
+            child = trail[-1][1].dirs.get(segment)
+            if child is None:
+                return
+            trail.append((segment, child))
+        node = trail[-1][1]
+        if name not in node.files:
+            return
+        node.files.discard(name)
+        node._name_removed(name)
+        self._size -= 1
+        # Prune directories left empty.
+        for (segment, child), (_, parent) in zip(reversed(trail[1:]), reversed(trail[:-1])):
+            if child.files or child.dirs:
+                break
+            del parent.dirs[segment]
+            parent._name_removed(segment)
+
+    def iter_files(self, directory: str = "", cursor: Optional[str] = None) -> Iterator[str]:
+        """Yields every file below `directory` in `path_segments` order.
+
+        Args:
+            directory: Directory to list ("" for the whole index).
+            cursor: A previously yielded path; iteration resumes after it.
+
+        Raises:
+            ValueError: If the cursor does not lie below `directory`.
+        """
+        dirs = _directory_segments(directory)
+        base = "".join(f"{segment}/" for segment in dirs)
+        after: Tuple[str, ...] = ()
+        if cursor is not None:
+            if not cursor.startswith(base):
+                raise ValueError(f"Cursor '{cursor}' is not below '{directory}'")
+            after = path_segments(cursor[len(base):])
+        node = self._find(dirs)
+        if node is None:
+            return iter(())
+        return self._walk(node, base, after)
+
+    def children(self, directory: str = "") -> Optional[List[Tuple[str, bool]]]:
+        """Returns the immediate entries of a directory as sorted (name, is_dir) pairs.
+
+        A name that is both a file and a directory appears twice, file first.
+        Returns None if the directory does not exist.
+        """
+        node = self._find(_directory_segments(directory))
+        if node is None:
+            return None
+        entries = []
+        for name in node.names():
+            if name in node.files:
+                entries.append((name, False))
+            if name in node.dirs:
+                entries.append((name, True))
+        return entries
+
+    def glob(self, pattern: str) -> Iterator[str]:
+        """Yields files matching a '/'-separated glob pattern, in `path_segments` order.
+
+        Segments use fnmatch syntax (`*`, `?`, `[...]`) and never match across
+        '/'; a `**` segment matches zero or more directories (a trailing `**`
+        matches every file below). Literal segments are looked up directly and
+        wildcard segments only scan names sharing their literal prefix, so only
+        the matching part of the tree is walked.
+        """
+        return self._glob(self._root, "", pattern.strip("/").split("/"))
+
+    def _glob(self, node: _DirNode, base: str, parts: List[str]) -> Iterator[str]:
+        head, rest = parts[0], parts[1:]
+        if head == "**":
+            # Walk the subtree once and match the remainder per path, which
+            # keeps the order and cannot yield a path twice.
+            for path in self._walk(node, "", ()):
+                if _match_segments(parts, path.split("/")):
+                    yield base + path
+            return
+        if not _is_magic(head):
+            if not rest:
+                if head in node.files:
+                    yield base + head
+                return
+            child = node.dirs.get(head)
+            if child is not None:
+                yield from self._glob(child, f"{base}{head}/", rest)
+            return
+        names = node.names()
+        literal = _literal_prefix(head)
+        for name in itertools.islice(names, bisect.bisect_left(names, literal), None):
+            if not name.startswith(literal):
+                break
+            if not fnmatch.fnmatchcase(name, head):
+                continue
+            if not rest:
+                if name in node.files:
+                    yield base + name
+                continue
+            child = node.dirs.get(name)
+            if child is not None:
+                yield from self._glob(child, f"{base}{name}/", rest)
+
+    def _find(self, dirs: List[str]) -> Optional[_DirNode]:
+        node = self._root
+        for segment in dirs:
+            node = node.dirs.get(segment)
+            if node is None:
+                return None
+        return node
+
+    def _walk(self, node: _DirNode, base: str, after: Tuple[str, ...]) -> Iterator[str]:
+        names = node.names()
+        start = 0
+        if after:
+            head = after[0]
+            start = bisect.bisect_left(names, head)
+            if start < len(names) and names[start] == head:
+                # The file `head` is at or before the cursor; only the
+                # directory of the same name can still hold later entries.
+                child = node.dirs.get(head)
+                if child is not None:
+                    yield from self._walk(child, f"{base}{head}/", after[1:])
+                start += 1
+        for name in itertools.islice(names, start, None):
+            if name in node.files:
+                yield base + name
+            child = node.dirs.get(name)
+            if child is not None:
+                yield from self._walk(child, f"{base}{name}/", ())
+
+
+def _directory_segments(directory: str) -> List[str]:
+    directory = directory.strip("/")
+    return directory.split("/") if directory else []
+
+
+def _is_magic(segment: str) -> bool:
+    return any(char in segment for char in "*?[")
+
+
+def _literal_prefix(segment: str) -> str:
+    for index, char in enumerate(segment):
+        if char in "*?[":
+            return segment[:index]
+    return segment
+
+
+def _match_segments(pattern: List[str], parts: List[str]) -> bool:
+    if not pattern:
+        return not parts
+    head = pattern[0]
+    if head == "**":
+        if len(pattern) == 1:
+            # A trailing "**" matches everything below, but not the directory itself.
+            return bool(parts)
+        return any(_match_segments(pattern[1:], parts[index:]) for index in range(len(parts) + 1))
+    return bool(parts) and fnmatch.fnmatchcase(parts[0], head) and _match_segments(pattern[1:], parts[1:])
+
+
+class _InvertedIndex(abc.ABC):
+    """Postings lists from terms to documents, maintained incrementally."""
+
+    def __init__(self):
+        self._postings: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._postings)
+
+    @abc.abstractmethod
+    def terms(self, text: str) -> Set[str]:
+        """The terms a text is indexed under."""
+        pass
+
+    def update(self, doc: str, old_texts: Iterable[str], new_texts: Iterable[str]) -> None:
+        """Re-indexes a document, touching only the terms that changed.
+
+        Args:
+            doc: Document key (e.g. a path).
+            old_texts: The texts previously indexed for `doc` (empty when new).
+            new_texts: The texts to index for `doc` from now on.
+        """
+        old_terms = set().union(*(self.terms(text) for text in old_texts))
+        new_terms = set().union(*(self.terms(text) for text in new_texts))
+        for term in old_terms - new_terms:
+            docs = self._postings.get(term)
+            if docs is not None:
+                docs.discard(doc)
+                if not docs:
+                    del self._postings[term]
+                    self._term_removed(term)
+        for term in new_terms - old_terms:
+            docs = self._postings.get(term)
+            if docs is None:
+                docs = self._postings[term] = set()
+                self._term_added(term)
+            docs.add(doc)
+
+    def _term_added(self, term: str) -> None:
+        pass
+
+    def _term_removed(self, term: str) -> None:
+        pass
+
+    def _intersect(self, terms: Iterable[str]) -> Set[str]:
+        postings = []
+        for term in terms:
+            docs = self._postings.get(term)
+            if not docs:
+                return set()
+            postings.append(docs)
+        if not postings:
+            return set()
+        postings.sort(key=len)
+        result = set(postings[0])
+        for docs in postings[1:]:
+            result &= docs
+            if not result:
+                break
+        return result
+
+
+class NgramIndex(_InvertedIndex):
+    """Character n-gram index answering substring queries.
+
+    `candidates(query)` returns a superset of the documents whose indexed text
+    contains `query`: every document containing it also contains all of its
+    n-grams. Documents can contain all the n-grams without the substring, so
+    exact results need a verification pass over the candidates.
+
+    Each text is also indexed under its suffixes shorter than n, so every
+    occurrence of a shorter query starts some term: such queries are answered
+    from the terms starting with them, one bisection into the sorted
+    vocabulary (built on first use).
+    """
+
+    def __init__(self, n: int = 3):
+        super().__init__()
+        self._n = n
+        self._vocabulary: Optional[List[str]] = None
+
+    def terms(self, text: str) -> Set[str]:
+        terms = self._ngrams(text)
+        terms.update(text[start:] for start in range(max(len(text) - self._n + 1, 0), len(text)))
+        return terms
+
+    def candidates(self, query: str) -> Set[str]:
+        if len(query) >= self._n:
+            return self._intersect(self._ngrams(query))
+        if not query:
+            return set()
+        vocabulary = self._sorted_vocabulary()
+        result: Set[str] = set()
+        for index in range(bisect.bisect_left(vocabulary, query), len(vocabulary)):
+            if not vocabulary[index].startswith(query):
+                break
+            result |= self._postings[vocabulary[index]]
+        return result
+
+    def _ngrams(self, text: str) -> Set[str]:
+        return {text[start:start + self._n] for start in range(len(text) - self._n + 1)}
+
+    def _sorted_vocabulary(self) -> List[str]:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        return self._vocabulary
+
+    def _term_added(self, term: str) -> None:
+        if self._vocabulary is not None:
+            bisect.insort(self._vocabulary, term)
+
+    def _term_removed(self, term: str) -> None:
+        if self._vocabulary is not None:
+            del self._vocabulary[bisect.bisect_left(self._vocabulary, term)]
+
+
+_TOKEN_RE = re.compile(r"[A-Za-z0-9_]+")
+
+
+def tokenize(text: str) -> Set[str]:
+    """Lower-cased word tokens, as used by the token indexes."""
+    return {match.group(0).lower() for match in _TOKEN_RE.finditer(text)}
+
+
+class TokenIndex(_InvertedIndex):
+    """Word-token index; `candidates(query)` returns documents containing every query token."""
+
+    def terms(self, text: str) -> Set[str]:
+        return tokenize(text)
+
+    def candidates(self, query: str) -> Set[str]:
+        return self._intersect(self.terms(query))
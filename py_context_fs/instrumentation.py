@@ -0,0 +1,215 @@
+import bisect
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is open.
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0,
+)
+
+
+class _NullSpan:
+    """Reusable no-op context manager returned by disabled instrumentation."""
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Instrumentation:
+    """No-op instrumentation hooks for the router and the pipeline.
+
+    The router checks `enabled` before taking any timestamps, so the default
+    instance costs one attribute lookup per operation. Subclass it (or use
+    InMemoryCollector) to record metrics or forward spans to a tracer.
+    """
+
+    enabled = False
+
+    def record(
+        self,
+        mount: str,
+        operation: str,
+        seconds: float,
+        size: int = 0,
+        error: bool = False,
+    ) -> None:
+        """Records one routed operation.
+
+        Args:
+            mount: The mount point that served the operation.
+            operation: Operation name ('open', 'open_many', 'list', 'search', ...).
+            seconds: Wall-clock latency.
+            size: UTF-8 bytes of content (or number of entries) returned.
+            error: True if the operation raised.
+        """
+        pass
+
+    def span(self, name: str) -> Any:
+        """Returns a context manager timing a pipeline stage."""
+        return _NULL_SPAN
+
+
+NULL_INSTRUMENTATION = Instrumentation()
+
+
+@dataclass
+class OperationStats:
+    """Aggregated metrics for one (mount, operation) pair or one span name."""
+    calls: int = 0
+    errors: int = 0
+    size: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+
+    def add(self, seconds: float, size: int = 0, error: bool = False) -> None:
+        self.calls += 1
+        self.size += size
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        if error:
+            self.errors += 1
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Estimates a latency percentile as the upper bound of its bucket."""
+        if not self.calls:
+            return 0.0
+        threshold = fraction * self.calls
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= threshold:
+                if index < len(LATENCY_BUCKETS):
+                    return min(LATENCY_BUCKETS[index], self.max_seconds)
+                return self.max_seconds
+        return self.max_seconds
+
+
+class _TimedSpan:
+    def __init__(self, collector: "InMemoryCollector", name: str):
+        self._collector = collector
+        self._name = name
+        self._started = 0.0
+
+    def __enter__(self) -> "_TimedSpan":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._collector.record_span(
+            self._name, time.perf_counter() - self._started, error=exc_type is not None
+        )
+
+
+class InMemoryCollector(Instrumentation):
+    """Thread-safe in-process collector with latency histograms.
+
+    Example:
+        collector = InMemoryCollector()
+        fs = ContextRouter(instrumentation=collector)
+        ...
+        print(collector.summary())
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._operations: Dict[Tuple[str, str], OperationStats] = {}
+        self._spans: Dict[str, OperationStats] = {}
+
+    def record(
+        self,
+        mount: str,
+        operation: str,
+        seconds: float,
+        size: int = 0,
+        error: bool = False,
+    ) -> None:
+        with self._lock:
+            stats = self._operations.get((mount, operation))
+            if stats is None:
+                stats = self._operations[(mount, operation)] = OperationStats()
+            stats.add(seconds, size, error)
+
+    def span(self, name: str) -> Any:
+        return _TimedSpan(self, name)
+
+    def record_span(self, name: str, seconds: float, error: bool = False) -> None:
+        with self._lock:
+            stats = self._spans.get(name)
+            if stats is None:
+                stats = self._spans[name] = OperationStats()
+            stats.add(seconds, error=error)
+
+    def operations(self) -> Dict[Tuple[str, str], OperationStats]:
+        """Returns a copy of the per-(mount, operation) metrics."""
+        with self._lock:
+            return {key: _copy(stats) for key, stats in self._operations.items()}
+
+    def spans(self) -> Dict[str, OperationStats]:
+        """Returns a copy of the per-span metrics."""
+        with self._lock:
+            return {key: _copy(stats) for key, stats in self._spans.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._operations.clear()
+            self._spans.clear()
+
+    def summary(self) -> str:
+        """Formats the collected metrics as plain-text tables."""
+        lines = [
+            f"{'mount':<24} {'op':<10} {'calls':>7} {'errors':>6} {'size':>10} "
+            f"{'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}"
+        ]
+        for (mount, operation), stats in sorted(self.operations().items()):
+            lines.append(
+                f"{mount:<24} {operation:<10} {stats.calls:>7} {stats.errors:>6} {stats.size:>10} "
+                + _latency_columns(stats)
+            )
+        spans = self.spans()
+        if spans:
+            lines.append("")
+            lines.append(
+                f"{'span':<35} {'calls':>7} {'errors':>6} "
+                f"{'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}"
+            )
+            for name, stats in sorted(spans.items()):
+                lines.append(f"{name:<35} {stats.calls:>7} {stats.errors:>6} " + _latency_columns(stats))
+        return "\n".join(lines)
+
+
+def _copy(stats: OperationStats) -> OperationStats:
+    return OperationStats(
+        calls=stats.calls,
+        errors=stats.errors,
+        size=stats.size,
+        total_seconds=stats.total_seconds,
+        max_seconds=stats.max_seconds,
+        buckets=list(stats.buckets),
+    )
+
+
+def _latency_columns(stats: OperationStats) -> str:
+    mean = stats.total_seconds / stats.calls if stats.calls else 0.0
+    return (
+        f"{mean * 1000:>8.3f} {stats.percentile(0.5) * 1000:>8.3f} "
+        f"{stats.percentile(0.95) * 1000:>8.3f} {stats.max_seconds * 1000:>8.3f}"
+    )
+
+
+def resolve_instrumentation(fs: Any, instrumentation: Optional[Instrumentation]) -> Instrumentation:
+    """Picks explicit instrumentation, else the router's, else the no-op default."""
+    if instrumentation is not None:
+        return instrumentation
+    return getattr(fs, "instrumentation", NULL_INSTRUMENTATION)
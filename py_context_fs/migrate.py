@@ -0,0 +1,35 @@
+"""Converts a PersistentContextRepository between storage layouts.
+
+Usage:
+    python -m py_context_fs.migrate SOURCE TARGET [--from json] [--to segments]
+"""
+import argparse
+from typing import List, Optional
+
+from .repository import _STORAGES, migrate_repository
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m py_context_fs.migrate",
+        description="Copy every record of a repository into another storage layout.",
+    )
+    parser.add_argument("source", help="Root directory of the repository to read.")
+    parser.add_argument("target", help="Root directory to write (may equal source).")
+    parser.add_argument("--from", dest="source_storage", choices=_STORAGES, default="json")
+    parser.add_argument("--to", dest="target_storage", choices=_STORAGES, default="segments")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+    count = migrate_repository(
+        args.source,
+        args.target,
+        source_storage=args.source_storage,
+        target_storage=args.target_storage,
+        batch_size=args.batch_size,
+    )
+    print(f"Migrated {count} records from {args.source_storage} to {args.target_storage}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
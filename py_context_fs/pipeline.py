@@ -1,9 +1,20 @@
+import asyncio
+import heapq
+import itertools
 import re
 import time
 import tiktoken
 from dataclasses import dataclass, field
-from typing import List, Optional, Any, Callable, Dict, Iterable, Sequence
-from .core import ContextRouter, ContextFile
+from typing import List, Optional, Any, AsyncIterator, Callable, Dict, Iterable, Iterator, Sequence, Set, Tuple, Union
+from .core import (
+    DEFAULT_CHUNK_SIZE,
+    AsyncContextRouter,
+    ContextFile,
+    ContextRouter,
+    ContextStat,
+    LazyContextFile,
+)
+from .instrumentation import Instrumentation, resolve_instrumentation
 
 @dataclass
 class ContextManifest:
@@ -35,6 +46,18 @@ class SelectionCriteria:
         token_counter: Optional function to estimate token cost.
         preferred_view: Preferred view to request (e.g., "summary").
         view_selector: Function to select a preferred view based on metadata.
+        directories: Directories whose listings are added to the candidates.
+            Listings are consumed page by page through `ilist`, so with
+            `max_results` set only the best entries seen so far are kept.
+        ranked_search: Search with the router's `search_ranked` and use each
+            result's score as its priority (unless `ranker` is set); results
+            their source could not rank keep their metadata priority.
+        search_limit: With `ranked_search`, the number of best-scored search
+            results considered (None for all).
+        time_range: (start, end) UNIX timestamps, either may be None. With it,
+            `directories` are listed through `ilist_range`, keeping only files
+            updated within [start, end), newest first; time-partitioned
+            sources (e.g. repository history) only visit matching partitions.
     """
     query: Optional[str] = None
     paths: Optional[List[str]] = None
@@ -47,44 +70,96 @@ class SelectionCriteria:
     token_counter: Optional[Callable[[str], int]] = None
     preferred_view: Optional[str] = None
     view_selector: Optional[Callable[[Dict[str, Any]], Optional[str]]] = None
+    directories: Optional[List[str]] = None
+    ranked_search: bool = False
+    search_limit: Optional[int] = None
+    time_range: Optional[Tuple[Optional[float], Optional[float]]] = None
+
+class _SelectedEntries:
+    """Collects manifest entries with their stats.
+
+    With a result cap, only the `limit` highest-priority entries are kept
+    (earlier entries win ties, as in the final stable sort), so streaming a
+    large listing does not accumulate an entry per listed file.
+    """
+
+    def __init__(self, limit: Optional[int]):
+        self._limit = limit if limit is not None and limit >= 0 else None
+        self._items: List[Tuple[float, int, ContextManifestEntry]] = []
+        self._stats: Dict[str, ContextStat] = {}
+        self._seq = 0
+
+    def add(self, entry: ContextManifestEntry, file_stat: ContextStat) -> None:
+        item = (entry.priority, -self._seq, entry)
+        self._seq += 1
+        if self._limit is None:
+            self._items.append(item)
+        elif len(self._items) < self._limit:
+            heapq.heappush(self._items, item)
+        elif self._items and item[:2] > self._items[0][:2]:
+            evicted = heapq.heapreplace(self._items, item)[2]
+            del self._stats[evicted.path]
+        else:
+            return
+        self._stats[entry.path] = file_stat
+
+    def entries(self) -> List[ContextManifestEntry]:
+        if self._limit is None:
+            return [entry for _, _, entry in self._items]
+        return [entry for _, _, entry in sorted(self._items, key=lambda item: (-item[0], -item[1]))]
+
+    def stats(self) -> Dict[str, ContextStat]:
+        return self._stats
 
 class ContextConstructor:
     """Component A: Selection."""
 
-    def __init__(self, fs: ContextRouter):
+    def __init__(
+        self,
+        fs: ContextRouter,
+        instrumentation: Optional[Instrumentation] = None,
+        list_page_size: int = 1000,
+    ):
+        """
+        Args:
+            fs: The router to select from.
+            instrumentation: Span hooks; defaults to the router's instrumentation.
+            list_page_size: Listed paths stat-ed per batch for `criteria.directories`.
+        """
         self._fs = fs
+        self._instrumentation = resolve_instrumentation(fs, instrumentation)
+        self._list_page_size = list_page_size
 
     def _matches_patterns(self, path: str, patterns: Optional[List[str]]) -> bool:
         if not patterns:
             return True
         return any(re.search(pattern, path) for pattern in patterns)
 
-    def _open_for_metadata(self, path: str) -> Optional[ContextFile]:
-        try:
-            return self._fs.open(path, view="default")
-        except (ValueError, FileNotFoundError):
-            try:
-                return self._fs.open(path, view="summary")
-            except (ValueError, FileNotFoundError):
-                return None
-
-    def _open_for_estimation(
+    def _loadable_stat(self, stats: Dict[str, ContextStat], path: str) -> Optional[ContextStat]:
+        """Returns the stat of a path the loader can use (default or summary view)."""
+        file_stat = stats.get(path)
+        if file_stat is None:
+            return None
+        if "default" not in file_stat.views and "summary" not in file_stat.views:
+            return None
+        return file_stat
+
+    def _estimation_views(
         self,
-        path: str,
-        preferred_view: Optional[str],
-    ) -> Optional[ContextFile]:
-        if preferred_view:
-            try:
-                return self._fs.open(path, view=preferred_view)
-            except (ValueError, FileNotFoundError):
-                pass
-        try:
-            return self._fs.open(path, view="summary")
-        except (ValueError, FileNotFoundError):
-            try:
-                return self._fs.open(path, view="default")
-            except (ValueError, FileNotFoundError):
-                return None
+        stats: Dict[str, ContextStat],
+        entries: List[ContextManifestEntry],
+    ) -> Dict[str, List[str]]:
+        """Groups paths by the view whose content must be read to estimate tokens."""
+        pending: Dict[str, List[str]] = {}
+        for entry in entries:
+            available = stats[entry.path].views
+            candidates = [entry.preferred_view] if entry.preferred_view else []
+            candidates.extend(["summary", "default"])
+            for view in candidates:
+                if view in available:
+                    pending.setdefault(view, []).append(entry.path)
+                    break
+        return pending
 
     def _select_preferred_view(
         self,
@@ -113,60 +188,206 @@ class ContextConstructor:
         Returns:
             A ContextManifest.
         """
-        criteria = criteria or SelectionCriteria()
+        with self._instrumentation.span("constructor.construct"):
+            criteria = criteria or SelectionCriteria()
+            search_query, ranked = self._search_request(criteria, query)
+            with self._instrumentation.span("constructor.search"):
+                if ranked:
+                    search_results = self._fs.search_ranked(search_query, k=criteria.search_limit)
+                else:
+                    search_results = self._fs.search(search_query) if search_query else []
+
+            candidates, scores = self._searched_candidates(criteria, paths, search_results, ranked)
+            selected = _SelectedEntries(criteria.max_results)
+            with self._instrumentation.span("constructor.stat"):
+                self._collect(selected, candidates, self._fs.stat_many(candidates), criteria, scores)
+
+            if criteria.directories:
+                with self._instrumentation.span("constructor.list"):
+                    seen = set(candidates)
+                    for directory in criteria.directories:
+                        listing = self._listing(directory, criteria)
+                        while True:
+                            page = list(itertools.islice(listing, self._list_page_size))
+                            if not page:
+                                break
+                            page = self._listed_candidates(page, criteria, seen)
+                            self._collect(selected, page, self._fs.stat_many(page), criteria)
+
+            entries, to_estimate, pending = self._estimation_plan(selected, criteria)
+            with self._instrumentation.span("constructor.estimate"):
+                files: Dict[Tuple[str, str], ContextFile] = {}
+                for view, view_paths in pending.items():
+                    files.update(self._fs.open_many(view_paths, (view,)))
+                self._apply_estimates(to_estimate, files, criteria)
+
+            return self._finalize(entries, criteria)
+
+    def _search_request(self, criteria: SelectionCriteria, query: Optional[str]) -> Tuple[Optional[str], bool]:
+        """Returns the search query to run, if any, and whether to rank its results."""
         search_query = criteria.query if criteria.query is not None else query
+        return search_query, bool(search_query and criteria.ranked_search)
+
+    def _searched_candidates(
+        self,
+        criteria: SelectionCriteria,
+        paths: Optional[List[str]],
+        search_results: Sequence[Any],
+        ranked: bool,
+    ) -> Tuple[List[str], Dict[str, Optional[float]]]:
+        """Returns the candidate paths and the relevance score of each ranked hit.
+
+        `search_results` holds (path, score) pairs when `ranked`, plain paths otherwise.
+        """
+        scores: Dict[str, Optional[float]] = dict(search_results) if ranked else {}
+        searched = list(scores) if ranked else list(search_results)
+        return self._candidate_paths(criteria, paths, searched), scores
+
+    def _listing(self, directory: str, criteria: SelectionCriteria) -> Union[Iterator[str], AsyncIterator[str]]:
+        """Returns the (sync or async) listing of `directory` the criteria ask for."""
+        if criteria.time_range is not None:
+            return self._fs.ilist_range(directory, *criteria.time_range)
+        return self._fs.ilist(directory)
+
+    def _estimation_plan(
+        self,
+        selected: _SelectedEntries,
+        criteria: SelectionCriteria,
+    ) -> Tuple[List[ContextManifestEntry], List[ContextManifestEntry], Dict[str, List[str]]]:
+        """Returns the selected entries, those lacking an estimate, and the views to open for them."""
+        entries, stats = selected.entries(), selected.stats()
+        to_estimate = [entry for entry in entries if self._needs_estimation(entry, criteria)]
+        return entries, to_estimate, self._estimation_views(stats, to_estimate)
 
+    def _apply_estimates(
+        self,
+        to_estimate: List[ContextManifestEntry],
+        files: Dict[Tuple[str, str], ContextFile],
+        criteria: SelectionCriteria,
+    ) -> None:
+        for entry in to_estimate:
+            self._apply_estimate(entry, self._estimation_file(files, entry), criteria)
+
+    def _candidate_paths(
+        self,
+        criteria: SelectionCriteria,
+        paths: Optional[List[str]],
+        search_results: List[str],
+    ) -> List[str]:
+        """Merges explicit and searched paths, deduplicated and pattern-filtered."""
         candidate_paths = []
         if criteria.paths:
             candidate_paths.extend(criteria.paths)
         if paths:
             candidate_paths.extend(paths)
-        if search_query:
-            candidate_paths.extend(self._fs.search(search_query))
+        candidate_paths.extend(search_results)
 
         deduped = {}
         for path in candidate_paths:
             if path not in deduped:
                 deduped[path] = None
 
+        return [path for path in deduped.keys() if self._passes_patterns(path, criteria)]
+
+    def _passes_patterns(self, path: str, criteria: SelectionCriteria) -> bool:
         include_patterns = criteria.include_patterns
         exclude_patterns = criteria.exclude_patterns
+        if include_patterns and not self._matches_patterns(path, include_patterns):
+            return False
+        if exclude_patterns and self._matches_patterns(path, exclude_patterns):
+            return False
+        return True
 
-        entries: List[ContextManifestEntry] = []
-        for path in deduped.keys():
-            if include_patterns and not self._matches_patterns(path, include_patterns):
-                continue
-            if exclude_patterns and self._matches_patterns(path, exclude_patterns):
-                continue
+    def _listed_candidates(self, page: List[str], criteria: SelectionCriteria, seen: Set[str]) -> List[str]:
+        """Pattern-filters one page of a directory listing, dropping paths already seen.
 
-            file_obj = self._open_for_metadata(path)
-            if file_obj is None:
-                continue
+        Listed paths are only remembered when several directories are listed,
+        since a single listing never repeats a path.
+        """
+        selected = [path for path in page if path not in seen and self._passes_patterns(path, criteria)]
+        if len(criteria.directories) > 1:
+            seen.update(selected)
+        return selected
 
-            metadata = file_obj.metadata or {}
-            if criteria.metadata_filter and not criteria.metadata_filter(metadata):
-                continue
+    def _collect(
+        self,
+        selected: _SelectedEntries,
+        paths: List[str],
+        stats: Dict[str, ContextStat],
+        criteria: SelectionCriteria,
+        scores: Optional[Dict[str, Optional[float]]] = None,
+    ) -> None:
+        for path in paths:
+            file_stat = self._loadable_stat(stats, path)
+            entry = self._build_entry(path, file_stat, criteria, scores.get(path) if scores else None)
+            if entry is not None:
+                selected.add(entry, file_stat)
+
+    def _build_entry(
+        self,
+        path: str,
+        file_stat: Optional[ContextStat],
+        criteria: SelectionCriteria,
+        score: Optional[float] = None,
+    ) -> Optional[ContextManifestEntry]:
+        """Filters and ranks a candidate from its stat record (or its search score)."""
+        if file_stat is None:
+            return None
+
+        metadata = file_stat.metadata or {}
+        if criteria.metadata_filter and not criteria.metadata_filter(metadata):
+            return None
+
+        if criteria.ranker:
+            priority = criteria.ranker(path, metadata)
+        elif score is not None:
+            priority = score
+        else:
+            priority = float(metadata.get("priority", 0.0))
+        entry = ContextManifestEntry(
+            path=path,
+            priority=priority,
+            preferred_view=self._select_preferred_view(metadata, criteria),
+        )
+        if criteria.max_tokens is not None:
+            meta_tokens = metadata.get("token_count")
+            if isinstance(meta_tokens, int):
+                entry.estimated_tokens = meta_tokens
+        return entry
 
-            ranker = criteria.ranker or (lambda _, meta: float(meta.get("priority", 0.0)))
-            priority = ranker(path, metadata)
-            preferred_view = self._select_preferred_view(metadata, criteria)
-            estimated_tokens = None
-            if criteria.max_tokens is not None:
-                meta_tokens = metadata.get("token_count")
-                if isinstance(meta_tokens, int):
-                    estimated_tokens = meta_tokens
-                else:
-                    token_counter = criteria.token_counter or (lambda text: len(text.split()))
-                    estimation_file = self._open_for_estimation(path, preferred_view)
-                    if estimation_file is not None:
-                        estimated_tokens = token_counter(estimation_file.content)
-            entries.append(ContextManifestEntry(
-                path=path,
-                priority=priority,
-                preferred_view=preferred_view,
-                estimated_tokens=estimated_tokens,
-            ))
+    def _estimation_file(
+        self,
+        files: Dict[Tuple[str, str], ContextFile],
+        entry: ContextManifestEntry,
+    ) -> Optional[ContextFile]:
+        views = [entry.preferred_view] if entry.preferred_view else []
+        views.extend(["summary", "default"])
+        for view in views:
+            file_obj = files.get((entry.path, view))
+            if file_obj is not None:
+                return file_obj
+        return None
+
+    def _needs_estimation(self, entry: ContextManifestEntry, criteria: SelectionCriteria) -> bool:
+        return criteria.max_tokens is not None and entry.estimated_tokens is None
+
+    def _apply_estimate(
+        self,
+        entry: ContextManifestEntry,
+        estimation_file: Optional[ContextFile],
+        criteria: SelectionCriteria,
+    ) -> None:
+        if estimation_file is None:
+            return
+        token_counter = criteria.token_counter or (lambda text: len(text.split()))
+        entry.estimated_tokens = token_counter(estimation_file.content)
 
+    def _finalize(
+        self,
+        entries: List[ContextManifestEntry],
+        criteria: SelectionCriteria,
+    ) -> ContextManifest:
+        """Sorts by priority and applies the result and token caps."""
         entries.sort(key=lambda entry: entry.priority, reverse=True)
         if criteria.max_results is not None:
             entries = entries[:criteria.max_results]
@@ -192,9 +413,35 @@ class ContextConstructor:
 class ContextLoader:
     """Component B: Token Budgeting & Streaming."""
 
-    def __init__(self, fs: ContextRouter, model: str = "gpt-4"):
+    def __init__(
+        self,
+        fs: ContextRouter,
+        model: str = "gpt-4",
+        lazy: bool = False,
+        stream_threshold: int = 1024 * 1024,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        instrumentation: Optional[Instrumentation] = None,
+    ):
+        """
+        Args:
+            fs: The router to read from.
+            model: Model name used to pick the tiktoken encoding.
+            lazy: Stat files up front and read view content only while it is
+                being tokenized or emitted, so only the selected views stay in
+                memory. Views with a known token_count are not read at all
+                unless selected.
+            stream_threshold: In lazy mode, views larger than this many bytes
+                are tokenized incrementally over `open_stream`, stopping as
+                soon as they exceed the budget.
+            chunk_size: Chunk size used for streamed reads.
+            instrumentation: Span hooks; defaults to the router's instrumentation.
+        """
         self._fs = fs
+        self._instrumentation = resolve_instrumentation(fs, instrumentation)
         self._encoding = tiktoken.encoding_for_model(model)
+        self._lazy = lazy
+        self._stream_threshold = stream_threshold
+        self._chunk_size = chunk_size
 
     def count_tokens(self, text: str) -> int:
         return len(self._encoding.encode(text))
@@ -206,58 +453,127 @@ class ContextLoader:
 
     def _select_entries(self, manifest: ContextManifest, max_tokens: int) -> List[Dict[str, Any]]:
         """Selects file entries to include, honoring the token budget."""
-        selections = []
+        entries = self._manifest_entries(manifest)
+        paths = [entry.path for entry in entries]
+        with self._instrumentation.span("loader.fetch"):
+            if self._lazy:
+                files = self._fs.open_many_lazy(paths, ("default", "summary"))
+            else:
+                files = self._fs.open_many(paths, ("default", "summary"))
+        return self._select_from_files(entries, files, max_tokens)
+
+    def _select_from_files(
+        self,
+        entries: List[ContextManifestEntry],
+        files: Dict[Tuple[str, str], ContextFile],
+        max_tokens: int,
+    ) -> List[Dict[str, Any]]:
+        with self._instrumentation.span("loader.tokenize"):
+            selections = [
+                self._build_options(
+                    entry,
+                    files.get((entry.path, "default")),
+                    files.get((entry.path, "summary")),
+                    max_tokens,
+                )
+                for entry in entries
+            ]
+        with self._instrumentation.span("loader.knapsack"):
+            return self._solve(selections, max_tokens)
 
-        entries = manifest.entries or [
+    def _manifest_entries(self, manifest: ContextManifest) -> List[ContextManifestEntry]:
+        return manifest.entries or [
             ContextManifestEntry(path=path) for path in manifest.files
         ]
-        for entry in entries:
-            path = entry.path
-            options = []
-            try:
-                default_file = self._fs.open(path, view="default")
-                default_content = default_file.content
-                default_header = self._format_header(path, "default")
-                default_tokens = self.count_tokens(
-                    f"{default_header}\n{default_content}\n"
-                )
-                default_value = 2.0 + entry.priority
-                if entry.preferred_view == "default":
-                    default_value += 1.0
-                options.append({
-                    "path": path,
-                    "view": "default",
-                    "header": default_header,
-                    "content": default_content,
-                    "tokens": default_tokens,
-                    "value": default_value,
-                })
-            except (ValueError, FileNotFoundError):
-                pass
-
-            try:
-                summary_file = self._fs.open(path, view="summary")
-                summary_content = summary_file.content
-                summary_header = self._format_header(path, "summary")
-                summary_tokens = self.count_tokens(
-                    f"{summary_header}\n{summary_content}\n"
+
+    def _build_options(
+        self,
+        entry: ContextManifestEntry,
+        default_file: Optional[ContextFile],
+        summary_file: Optional[ContextFile],
+        max_tokens: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Builds the knapsack options (one per available view) for an entry."""
+        options = []
+        for view, file_obj, base_value in (
+            ("default", default_file, 2.0),
+            ("summary", summary_file, 1.0),
+        ):
+            if file_obj is None:
+                continue
+            header = self._format_header(entry.path, view)
+            tokens = self._count_option_tokens(header, file_obj, max_tokens)
+            if tokens is None:
+                continue
+            value = base_value + entry.priority
+            if entry.preferred_view == view:
+                value += 1.0
+            options.append({
+                "path": entry.path,
+                "view": view,
+                "header": header,
+                "file": file_obj,
+                "tokens": tokens,
+                "value": value,
+            })
+        return options
+
+    def _count_option_tokens(
+        self,
+        header: str,
+        file_obj: Union[ContextFile, LazyContextFile],
+        max_tokens: Optional[int] = None,
+    ) -> Optional[int]:
+        """Counts the tokens of a formatted view; None if it cannot fit the budget."""
+        if isinstance(file_obj, LazyContextFile) and not file_obj.is_loaded:
+            if file_obj.token_count is not None:
+                return self.count_tokens(f"{header}\n\n") + file_obj.token_count
+            if file_obj.size_bytes is None or file_obj.size_bytes > self._stream_threshold:
+                return self._count_stream_tokens(
+                    header, file_obj.iter_chunks(self._chunk_size), max_tokens
                 )
-                summary_value = 1.0 + entry.priority
-                if entry.preferred_view == "summary":
-                    summary_value += 1.0
-                options.append({
-                    "path": path,
-                    "view": "summary",
-                    "header": summary_header,
-                    "content": summary_content,
-                    "tokens": summary_tokens,
-                    "value": summary_value,
-                })
-            except (ValueError, FileNotFoundError):
-                pass
-
-            selections.append(options)
+            tokens = self.count_tokens(f"{header}\n{file_obj.content}\n")
+            # Only selected views are re-read when the context is emitted.
+            file_obj.release()
+            return tokens
+        return self.count_tokens(f"{header}\n{file_obj.content}\n")
 
+    def _count_stream_tokens(
+        self,
+        header: str,
+        chunks: Iterator[str],
+        max_tokens: Optional[int],
+    ) -> Optional[int]:
+        """Counts tokens chunk by chunk, stopping once `max_tokens` is exceeded.
+
+        Chunks are cut at the last whitespace so that words are not split
+        between two encode calls.
+        """
+        tokens = self.count_tokens(f"{header}\n")
+        pending = ""
+        try:
+            for chunk in chunks:
+                pending += chunk
+                cut = max(pending.rfind(" "), pending.rfind("\n"))
+                if cut <= 0:
+                    if len(pending) < 4 * self._chunk_size:
+                        continue
+                    cut = len(pending)
+                tokens += self.count_tokens(pending[:cut])
+                pending = pending[cut:]
+                if max_tokens is not None and tokens > max_tokens:
+                    return None
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+        tokens += self.count_tokens(f"{pending}\n")
+        if max_tokens is not None and tokens > max_tokens:
+            return None
+        return tokens
+
+    def _solve(self, selections: List[List[Dict[str, Any]]], max_tokens: int) -> List[Dict[str, Any]]:
+        """Picks at most one option per entry, maximizing value within the budget."""
         dp = {0: (0, [])}
         for options in selections:
             next_dp = dict(dp)
@@ -283,17 +599,20 @@ class ContextLoader:
 
         return best_selection
 
+    def _format_selection(self, selection: Dict[str, Any]) -> str:
+        header = selection.get("header") or self._format_header(
+            selection["path"],
+            selection["view"],
+        )
+        return f"{header}\n{selection['file'].content}\n"
+
     def load_stream(self, manifest: ContextManifest, max_tokens: int) -> Iterable[str]:
         """Streams context chunks from the manifest, respecting the token budget.
 
         Yields file-sized chunks so callers can interleave safety checks or abort early.
         """
         for selection in self._select_entries(manifest, max_tokens):
-            header = selection.get("header") or self._format_header(
-                selection["path"],
-                selection["view"],
-            )
-            yield f"{header}\n{selection['content']}\n"
+            yield self._format_selection(selection)
 
     def load(self, manifest: ContextManifest, max_tokens: int) -> str:
         """Loads context from the manifest, respecting the token budget.
@@ -302,11 +621,118 @@ class ContextLoader:
         """
         return "\n".join(self.load_stream(manifest, max_tokens))
 
+class AsyncContextConstructor(ContextConstructor):
+    """Asyncio counterpart of ContextConstructor.
+
+    Candidate stats and token-estimation reads are batched per mount, and
+    mounts are queried concurrently.
+    """
+
+    def __init__(
+        self,
+        fs: AsyncContextRouter,
+        instrumentation: Optional[Instrumentation] = None,
+        list_page_size: int = 1000,
+    ):
+        super().__init__(fs, instrumentation=instrumentation, list_page_size=list_page_size)
+
+    async def _acollect_page(
+        self,
+        selected: _SelectedEntries,
+        page: List[str],
+        criteria: SelectionCriteria,
+        seen: Set[str],
+    ) -> None:
+        page = self._listed_candidates(page, criteria, seen)
+        self._collect(selected, page, await self._fs.stat_many(page), criteria)
+
+    async def construct(
+        self,
+        criteria: Optional[SelectionCriteria] = None,
+        query: str = None,
+        paths: List[str] = None,
+    ) -> ContextManifest:
+        """Constructs a manifest based on search query or explicit paths.
+
+        See ContextConstructor.construct.
+        """
+        with self._instrumentation.span("constructor.construct"):
+            criteria = criteria or SelectionCriteria()
+            search_query, ranked = self._search_request(criteria, query)
+            with self._instrumentation.span("constructor.search"):
+                if ranked:
+                    search_results = await self._fs.search_ranked(search_query, k=criteria.search_limit)
+                else:
+                    search_results = await self._fs.search(search_query) if search_query else []
+
+            candidates, scores = self._searched_candidates(criteria, paths, search_results, ranked)
+            selected = _SelectedEntries(criteria.max_results)
+            with self._instrumentation.span("constructor.stat"):
+                self._collect(selected, candidates, await self._fs.stat_many(candidates), criteria, scores)
+
+            if criteria.directories:
+                with self._instrumentation.span("constructor.list"):
+                    seen = set(candidates)
+                    for directory in criteria.directories:
+                        page = []
+                        async for listed in self._listing(directory, criteria):
+                            page.append(listed)
+                            if len(page) >= self._list_page_size:
+                                await self._acollect_page(selected, page, criteria, seen)
+                                page = []
+                        if page:
+                            await self._acollect_page(selected, page, criteria, seen)
+
+            entries, to_estimate, pending = self._estimation_plan(selected, criteria)
+            with self._instrumentation.span("constructor.estimate"):
+                batches = await asyncio.gather(
+                    *(self._fs.open_many(view_paths, (view,)) for view, view_paths in pending.items())
+                )
+                files: Dict[Tuple[str, str], ContextFile] = {}
+                for batch in batches:
+                    files.update(batch)
+                self._apply_estimates(to_estimate, files, criteria)
+
+            return self._finalize(entries, criteria)
+
+class AsyncContextLoader(ContextLoader):
+    """Asyncio counterpart of ContextLoader.
+
+    All views of every manifest entry are fetched concurrently (one batch per
+    mount) before the token budget is solved. There is no lazy mode: the
+    `lazy`, `stream_threshold` and `chunk_size` options of ContextLoader are
+    not available, so every view is read in full.
+    """
+
+    def __init__(
+        self,
+        fs: AsyncContextRouter,
+        model: str = "gpt-4",
+        instrumentation: Optional[Instrumentation] = None,
+    ):
+        super().__init__(fs, model=model, instrumentation=instrumentation)
+
+    async def _aselect_entries(self, manifest: ContextManifest, max_tokens: int) -> List[Dict[str, Any]]:
+        entries = self._manifest_entries(manifest)
+        with self._instrumentation.span("loader.fetch"):
+            files = await self._fs.open_many([entry.path for entry in entries], ("default", "summary"))
+        return self._select_from_files(entries, files, max_tokens)
+
+    async def load_stream(self, manifest: ContextManifest, max_tokens: int) -> AsyncIterator[str]:
+        """Streams context chunks from the manifest, respecting the token budget."""
+        for selection in await self._aselect_entries(manifest, max_tokens):
+            yield self._format_selection(selection)
+
+    async def load(self, manifest: ContextManifest, max_tokens: int) -> str:
+        """Loads context from the manifest, respecting the token budget."""
+        return "\n".join([chunk async for chunk in self.load_stream(manifest, max_tokens)])
+
 class ContextEvaluator:
     """Component C: Validation & Persistence."""
 
-    def __init__(self, fs: ContextRouter):
+    def __init__(self, fs: ContextRouter, instrumentation: Optional[Instrumentation] = None):
         self._fs = fs
+        self._instrumentation = resolve_instrumentation(fs, instrumentation)
 
     def evaluate(
         self,
@@ -332,15 +758,19 @@ class ContextEvaluator:
         Returns:
             True if valid and saved, False otherwise.
         """
-        if validator(response):
-             metadata = {
-                 "valid": True,
-                 "validator": validator_name,
-                 "history": list(history_paths) if history_paths else None,
-                 "reviewed_at": reviewed_at if reviewed_at is not None else time.time(),
-             }
-             if decision_metadata:
-                 metadata.update(decision_metadata)
-             self._fs.write(output_path, response, metadata=metadata)
-             return True
-        return False
+        with self._instrumentation.span("evaluator.evaluate"):
+            with self._instrumentation.span("evaluator.validate"):
+                valid = validator(response)
+            if valid:
+                 metadata = {
+                     "valid": True,
+                     "validator": validator_name,
+                     "history": list(history_paths) if history_paths else None,
+                     "reviewed_at": reviewed_at if reviewed_at is not None else time.time(),
+                 }
+                 if decision_metadata:
+                     metadata.update(decision_metadata)
+                 with self._instrumentation.span("evaluator.write"):
+                     self._fs.write(output_path, response, metadata=metadata)
+                 return True
+            return False
@@ -1,15 +1,41 @@
+import bisect
+import copy
+import heapq
+import itertools
 import json
+import math
+import os
 import re
+import sys
+import threading
 import time
+import zlib
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
 from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from uuid import uuid4
 
-from .core import ContextFile, ContextSource
+from .core import ContextFile, ContextSource, ContextStat
+from .index import path_segments, scan_tree
+from .resolvers import CacheStats
+from .segments import SegmentStore, _fsync_directory
 
 _TOKEN_RE = re.compile(r"[A-Za-z0-9_]+")
 
+_LAYERS = ("history", "memory", "scratchpad")
+
+_INDEX_VERSION = 2
+# The journal is folded into a snapshot once it has more lines than this and
+# than the index has records.
+_JOURNAL_MIN_LINES = 1024
+
+# BM25 term-frequency saturation and length normalization.
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+
 
 @dataclass
 class RepositoryRecord:
@@ -34,69 +60,834 @@ class RepositoryRecord:
         return RepositoryRecord(views=views, metadata=metadata, updated_at=updated_at)
 
 
+class _JsonStorage:
+    """The original layout: one pretty-printed JSON file per record under <root>/<layer>/.
+
+    Records are written to a temporary file and renamed over the old one, so
+    a crash never leaves a half-written record behind.
+    """
+
+    def __init__(self, root: Path):
+        self._root = root
+        for layer in _LAYERS:
+            (root / layer).mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Records written since the last sync, fsync-ed by `sync`.
+        self._dirty: Set[str] = set()
+
+    def load(self, key: str) -> RepositoryRecord:
+        with (self._root / key).open("r", encoding="utf-8") as handle:
+            data = json.load(handle)
+        return RepositoryRecord.from_dict(data)
+
+    def save(self, key: str, record: RepositoryRecord, durable: bool = False) -> None:
+        self.save_many([(key, record)], durable)
+
+    def save_many(self, items: Iterable[Tuple[str, RepositoryRecord]], durable: bool = False) -> None:
+        """Writes records atomically; with `durable`, they are on stable storage on return."""
+        renames = []
+        for key, record in items:
+            path = self._root / key
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with tmp_path.open("w", encoding="utf-8") as handle:
+                json.dump(record.to_dict(), handle, ensure_ascii=True, indent=2)
+                if durable:
+                    handle.flush()
+                    os.fsync(handle.fileno())
+            renames.append((tmp_path, path))
+        for tmp_path, path in renames:
+            os.replace(tmp_path, path)
+        if durable:
+            for directory in {path.parent for _, path in renames}:
+                _fsync_directory(directory)
+        else:
+            with self._lock:
+                self._dirty.update(str(path) for _, path in renames)
+
+    def sync(self) -> None:
+        """Forces records written without `durable` to stable storage."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+        for file_path in dirty:
+            try:
+                fd = os.open(file_path, os.O_RDONLY)
+            except FileNotFoundError:
+                continue
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        for directory in {os.path.dirname(file_path) for file_path in dirty}:
+            _fsync_directory(Path(directory))
+
+    def iter_keys(self, directory: str, cursor: Optional[str] = None, name_prefix: str = "") -> Iterator[str]:
+        """Yields record keys below `directory` in `path_segments` order, after a cursor."""
+        base = f"{directory}/"
+        after = path_segments(cursor[len(base):]) if cursor is not None else ()
+        for key, _ in scan_tree(str(self._root / directory), base, after, name_prefix):
+            if key.endswith(".json"):
+                yield key
+
+    def signature(self, key: str) -> Optional[Tuple[int, ...]]:
+        """(mtime_ns, size) of the record file, or None if it does not exist."""
+        try:
+            file_stat = os.stat(self._root / key)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        return file_stat.st_mtime_ns, file_stat.st_size
+
+    def children(self, directory: str) -> List[Tuple[str, bool]]:
+        """Immediate (name, is_dir) entries of a key directory, sorted; [] if it does not exist."""
+        try:
+            with os.scandir(self._root / directory) as entries:
+                return sorted((entry.name, entry.is_dir(follow_symlinks=False)) for entry in entries)
+        except (FileNotFoundError, NotADirectoryError):
+            return []
+
+    def iter_signatures(self, directory: str) -> Iterator[Tuple[str, Tuple[int, ...]]]:
+        """Yields (key, signature) for every record below `directory`, without parsing any."""
+        for key, entry in scan_tree(str(self._root / directory), f"{directory}/"):
+            if key.endswith(".json"):
+                try:
+                    file_stat = entry.stat()
+                except FileNotFoundError:
+                    continue  # Deleted between the scan and the stat.
+                yield key, (file_stat.st_mtime_ns, file_stat.st_size)
+
+    def compact(self) -> int:
+        return 0
+
+    def close(self) -> None:
+        pass
+
+
+class _SegmentStorage:
+    """Compact JSON records appended to a SegmentStore under <root>/segments/."""
+
+    def __init__(self, root: Path, segment_bytes: int, compaction_interval: Optional[float]):
+        self._store = SegmentStore(
+            str(root / "segments"),
+            segment_bytes=segment_bytes,
+            compaction_interval=compaction_interval,
+        )
+        self._dirty = False
+
+    def load(self, key: str) -> RepositoryRecord:
+        try:
+            data = self._store.get(key)
+        except KeyError:
+            raise FileNotFoundError(f"Record not found: {key}") from None
+        return RepositoryRecord.from_dict(json.loads(data))
+
+    def save(self, key: str, record: RepositoryRecord, durable: bool = False) -> None:
+        self.save_many([(key, record)], durable)
+
+    def save_many(self, items: Iterable[Tuple[str, RepositoryRecord]], durable: bool = False) -> None:
+        """Appends records with one write, and with `durable` one fsync."""
+        self._store.put_many((key, _encode_record(record)) for key, record in items)
+        if durable:
+            self._store.sync()
+            self._dirty = False
+        else:
+            self._dirty = True
+
+    def sync(self) -> None:
+        if self._dirty:
+            self._dirty = False
+            self._store.sync()
+
+    def iter_keys(self, directory: str, cursor: Optional[str] = None, name_prefix: str = "") -> Iterator[str]:
+        keys = self._store.iter_keys(directory, cursor)
+        if name_prefix:
+            # Names sharing a prefix are contiguous in listing order.
+            start = f"{directory}/{name_prefix}"
+            keys = itertools.dropwhile(lambda key: not key.startswith(start), keys)
+            keys = itertools.takewhile(lambda key: key.startswith(start), keys)
+        return keys
+
+    def signature(self, key: str) -> Optional[Tuple[int, ...]]:
+        """Length and checksum of the newest version; compaction leaves it unchanged."""
+        return self._store.fingerprint(key)
+
+    def children(self, directory: str) -> List[Tuple[str, bool]]:
+        return self._store.children(directory) or []
+
+    def iter_signatures(self, directory: str) -> Iterator[Tuple[str, Tuple[int, ...]]]:
+        for key in self._store.iter_keys(directory):
+            yield key, self._store.fingerprint(key)
+
+    def compact(self) -> int:
+        return self._store.compact()
+
+    def close(self) -> None:
+        self._store.close()
+
+
+def _encode_record(record: RepositoryRecord) -> bytes:
+    return json.dumps(record.to_dict(), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+_STORAGES = ("json", "segments")
+
+_DURABILITY = ("always", "interval", "os")
+
+# Bucket directories of time-partitioned history, as time.strftime formats (UTC).
+_HISTORY_PARTITIONS = {"day": "%Y/%m/%d", "hour": "%Y/%m/%d/%H"}
+# Name `append_history` gives an entry: its creation time (seconds in the flat
+# layout, nanoseconds in the partitioned one), then a uuid4 hex.
+_ENTRY_NAME_RE = re.compile(r"(\d+)_[0-9a-f]{32}\.json")
+
+
+def _open_storage(
+    root: Path,
+    storage: str,
+    segment_bytes: int = 64 * 1024 * 1024,
+    compaction_interval: Optional[float] = None,
+):
+    if storage == "json":
+        return _JsonStorage(root)
+    if storage == "segments":
+        return _SegmentStorage(root, segment_bytes, compaction_interval)
+    raise ValueError(f"Unknown storage '{storage}' (expected one of {', '.join(_STORAGES)})")
+
+
+def migrate_repository(
+    source_root: str,
+    target_root: str,
+    source_storage: str = "json",
+    target_storage: str = "segments",
+    batch_size: int = 1000,
+) -> int:
+    """Copies every record of a repository into another storage layout.
+
+    The two layouts use different files (<layer>/ directories versus
+    segments/), so `target_root` may be the same directory as `source_root`;
+    the source records are left in place either way.
+
+    Returns:
+        The number of records copied.
+    """
+    if source_storage == target_storage and Path(source_root).resolve() == Path(target_root).resolve():
+        raise ValueError("Source and target are the same repository")
+    source = _open_storage(Path(source_root), source_storage)
+    target = _open_storage(Path(target_root), target_storage)
+    count = 0
+    try:
+        for layer in _LAYERS:
+            keys = source.iter_keys(layer)
+            while True:
+                batch = [(key, source.load(key)) for key in itertools.islice(keys, batch_size)]
+                if not batch:
+                    break
+                target.save_many(batch)
+                count += len(batch)
+        target.sync()
+    finally:
+        source.close()
+        target.close()
+    return count
+
+
+class _IndexFile:
+    """On-disk copy of a token index: a checksummed snapshot plus a journal.
+
+    Both hold, per record key, the storage signature the record had when it
+    was indexed and its term counts. The snapshot starts with a header line
+    carrying its generation and the CRC-32 of its body; the journal starts
+    with the generation of the snapshot it extends, followed by one
+    checksummed line per update. Updates are appended to the journal in
+    batches, and the journal is folded into a new snapshot once it outgrows
+    the index. A snapshot or journal that fails its checks is ignored, and
+    the repository re-indexes whatever it cannot vouch for.
+    """
+
+    def __init__(self, path: Path):
+        self._snapshot_path = path.with_suffix(".idx")
+        self._journal_path = path.with_suffix(".journal")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._generation = 0
+        self._journal_lines = 0
+        # Until a valid snapshot is loaded or written, updates go to a new snapshot.
+        self._stale = True
+
+    def load(self) -> Dict[str, Tuple[Tuple[int, ...], Dict[str, int]]]:
+        """Returns key -> (signature, term counts) from the snapshot and journal."""
+        docs: Dict[str, Tuple[Tuple[int, ...], Dict[str, int]]] = {}
+        try:
+            with self._snapshot_path.open("rb") as handle:
+                header = json.loads(handle.readline())
+                body = handle.read()
+            if header.get("version") != _INDEX_VERSION or zlib.crc32(body) != header.get("checksum"):
+                return {}
+            for key, (signature, terms) in json.loads(body).items():
+                docs[key] = (tuple(signature or ()), terms)
+            self._generation = header["generation"]
+            self._stale = False
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            return {}
+        try:
+            with self._journal_path.open("rb") as handle:
+                if json.loads(handle.readline()).get("generation") != self._generation:
+                    # Written before the current snapshot, which already includes it.
+                    return docs
+                for line in handle:
+                    checksum, _, payload = line.rstrip(b"\n").partition(b" ")
+                    if not line.endswith(b"\n") or int(checksum, 16) != zlib.crc32(payload):
+                        break
+                    key, signature, terms = json.loads(payload)
+                    if signature is None:
+                        docs.pop(key, None)
+                    else:
+                        docs[key] = (tuple(signature), terms)
+                    self._journal_lines += 1
+        except (FileNotFoundError, ValueError, AttributeError):
+            pass
+        return docs
+
+    def append(self, updates: List[Tuple[str, Optional[Tuple[int, ...]], Dict[str, int]]]) -> None:
+        """Journals (key, signature, term counts) updates; a None signature records a removal."""
+        lines = []
+        for key, signature, terms in updates:
+            payload = json.dumps([key, signature, terms], separators=(",", ":")).encode("utf-8")
+            lines.append(b"%08x %s\n" % (zlib.crc32(payload), payload))
+        with self._journal_path.open("ab") as handle:
+            handle.write(b"".join(lines))
+        self._journal_lines += len(lines)
+
+    def needs_snapshot(self, pending: int, size: int) -> bool:
+        """Whether journaling `pending` more updates would outgrow an index of `size` records."""
+        return self._stale or self._journal_lines + pending > max(_JOURNAL_MIN_LINES, size)
+
+    def write_snapshot(self, docs: Dict[str, Tuple[Optional[Tuple[int, ...]], Dict[str, int]]]) -> None:
+        """Replaces the snapshot with `docs` and starts an empty journal."""
+        body = json.dumps(
+            {key: [signature, terms] for key, (signature, terms) in docs.items()},
+            separators=(",", ":"),
+        ).encode("utf-8")
+        self._generation += 1
+        header = {"version": _INDEX_VERSION, "generation": self._generation, "checksum": zlib.crc32(body)}
+        tmp_path = self._snapshot_path.with_suffix(".idx.tmp")
+        with tmp_path.open("wb") as handle:
+            handle.write(json.dumps(header).encode("utf-8") + b"\n")
+            handle.write(body)
+        os.replace(tmp_path, self._snapshot_path)
+        self._stale = False
+        self._start_journal()
+
+    def _start_journal(self) -> None:
+        tmp_path = self._journal_path.with_suffix(".journal.tmp")
+        with tmp_path.open("wb") as handle:
+            handle.write(json.dumps({"generation": self._generation}).encode("utf-8") + b"\n")
+        os.replace(tmp_path, self._journal_path)
+        self._journal_lines = 0
+
+
+class _LayerIndex:
+    """Inverted token index over the records of one layer.
+
+    The postings map each token to the records containing it and how often,
+    which is all BM25 scoring (`score`) needs; per record only its length and
+    the tuple of its tokens are kept, so an update can find the postings to
+    drop without a second copy of every record's term counts. It also keeps
+    the vocabulary sorted forwards and by reversed token, so the tokens that
+    start or end with a given string are one bisection away, and a map from
+    each trigram to the tokens containing it for infix lookups;
+    `substring_candidates` uses them to narrow a raw substring query down to
+    the records that can contain it. These are built on first use and then
+    kept up to date, so bulk loads never pay for them.
+    Updates are buffered and written to an optional `_IndexFile` in batches.
+    """
+
+    def __init__(self, index_file: Optional[_IndexFile], batch_size: int):
+        # token -> {key: frequency}
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self._tokens: Dict[str, Tuple[str, ...]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._total_length = 0
+        self._signatures: Dict[str, Optional[Tuple[int, ...]]] = {}
+        # Built lazily by `_sorted_vocabularies` and `_token_grams`.
+        self._vocabulary: Optional[List[str]] = None
+        self._reversed_vocabulary: List[str] = []
+        self._grams: Optional[Dict[str, Set[str]]] = None
+        self._index_file = index_file
+        self._batch_size = batch_size
+        self._pending: Dict[str, Optional[Tuple[int, ...]]] = {}
+
+    def update(
+        self, key: str, terms: Dict[str, int], signature: Optional[Tuple[int, ...]], journal: bool = True
+    ) -> None:
+        for token in self._tokens.get(key, ()):
+            if token not in terms:
+                keys = self.postings[token]
+                del keys[key]
+                if not keys:
+                    self._remove_token(token)
+        for token, frequency in terms.items():
+            keys = self.postings.get(token)
+            if keys is None:
+                keys = self.postings[token] = {}
+                self._add_token(token)
+            keys[key] = frequency
+        length = sum(terms.values())
+        self._total_length += length - self._lengths.get(key, 0)
+        self._tokens[key] = tuple(terms)
+        self._lengths[key] = length
+        self._signatures[key] = signature
+        if journal:
+            self._journal(key, signature)
+
+    def remove(self, key: str) -> None:
+        if key in self._tokens:
+            self.update(key, {}, None, journal=False)
+            del self._tokens[key]
+            del self._lengths[key]
+            del self._signatures[key]
+        self._journal(key, None)
+
+    def reconcile(
+        self,
+        signatures: Iterable[Tuple[str, Tuple[int, ...]]],
+        tokenize: Callable[[str], Dict[str, int]],
+    ) -> None:
+        """Loads the saved index and re-tokenizes records whose signature changed."""
+        saved = self._index_file.load() if self._index_file is not None else {}
+        for key, signature in signatures:
+            entry = saved.pop(key, None)
+            if entry is not None and entry[0] == signature:
+                self.update(key, entry[1], signature, journal=False)
+            else:
+                self.update(key, tokenize(key), signature)
+        # Whatever is left was deleted behind the index's back.
+        for key in saved:
+            self._journal(key, None)
+        self.flush()
+
+    def rebuild(
+        self,
+        signatures: Iterable[Tuple[str, Tuple[int, ...]]],
+        tokenize: Callable[[str], Dict[str, int]],
+    ) -> None:
+        """Re-tokenizes every record and replaces the saved index."""
+        self.postings.clear()
+        self._tokens.clear()
+        self._lengths.clear()
+        self._total_length = 0
+        self._signatures.clear()
+        self._vocabulary = None
+        self._reversed_vocabulary = []
+        self._grams = None
+        self._pending.clear()
+        for key, signature in signatures:
+            self.update(key, tokenize(key), signature, journal=False)
+        if self._index_file is not None:
+            self._index_file.write_snapshot(self._snapshot())
+
+    def flush(self) -> None:
+        if self._index_file is None or not self._pending:
+            return
+        updates = [(key, signature, self._terms(key)) for key, signature in self._pending.items()]
+        self._pending.clear()
+        if self._index_file.needs_snapshot(len(updates), len(self._tokens)):
+            self._index_file.write_snapshot(self._snapshot())
+        else:
+            self._index_file.append(updates)
+
+    def signature(self, key: str) -> Optional[Tuple[int, ...]]:
+        """Storage signature of the indexed version, or None if unknown or still uncommitted."""
+        return self._signatures.get(key)
+
+    def score(self, tokens: Iterable[str]) -> Dict[str, float]:
+        """BM25 scores of the records containing any of `tokens`."""
+        scores: Dict[str, float] = {}
+        count = len(self._tokens)
+        if not count:
+            return scores
+        average_length = self._total_length / count or 1.0
+        for token in tokens:
+            keys = self.postings.get(token)
+            if not keys:
+                continue
+            idf = math.log(1.0 + (count - len(keys) + 0.5) / (len(keys) + 0.5))
+            for key, frequency in keys.items():
+                norm = _BM25_K1 * (1.0 - _BM25_B + _BM25_B * self._lengths[key] / average_length)
+                scores[key] = scores.get(key, 0.0) + idf * frequency * (_BM25_K1 + 1.0) / (frequency + norm)
+        return scores
+
+    def substring_candidates(self, query: str) -> Optional[Set[str]]:
+        """Keys of the records that can contain `query` as a substring.
+
+        Every token of `query` must occur in a matching record: tokens inside
+        the query exactly, while a token at the start of the query may be the
+        tail of a longer token, one at the end its head, and one spanning the
+        whole query any part of it. Matching is case-insensitive, so the
+        result is a superset to verify. Returns None if the query has no
+        tokens to look up.
+        """
+        constraints = []
+        for match in _TOKEN_RE.finditer(query):
+            token = match.group(0).lower()
+            at_start, at_end = match.start() == 0, match.end() == len(query)
+            if not at_start and not at_end:
+                constraints.append((0, token, lambda token=token: self.postings.get(token, {}).keys()))
+            elif at_start and at_end:
+                constraints.append((3, token, lambda token=token: self._infix_keys(token)))
+            elif at_start:
+                constraints.append((2, token, lambda token=token: self._suffix_keys(token)))
+            else:
+                constraints.append((1, token, lambda token=token: self._prefix_keys(token)))
+        if not constraints:
+            return None
+        # Exact lookups first: they are the cheapest and usually the most selective.
+        candidates: Optional[Set[str]] = None
+        for _, _, lookup in sorted(constraints, key=lambda constraint: (constraint[0], -len(constraint[1]))):
+            keys = lookup()
+            candidates = set(keys) if candidates is None else candidates.intersection(keys)
+            if not candidates:
+                break
+        return candidates
+
+    def _prefix_keys(self, prefix: str) -> Set[str]:
+        keys: Set[str] = set()
+        for token in _starting_with(self._sorted_vocabularies()[0], prefix):
+            keys.update(self.postings[token])
+        return keys
+
+    def _suffix_keys(self, suffix: str) -> Set[str]:
+        keys: Set[str] = set()
+        for reversed_token in _starting_with(self._sorted_vocabularies()[1], suffix[::-1]):
+            keys.update(self.postings[reversed_token[::-1]])
+        return keys
+
+    def _infix_keys(self, infix: str) -> Set[str]:
+        if len(infix) < 3:
+            # Too short for a trigram; such infixes occur in most tokens anyway.
+            tokens: Iterable[str] = self.postings
+        else:
+            grams = self._token_grams()
+            tokens = set.intersection(*(grams.get(gram, set()) for gram in _trigrams(infix)))
+        keys: Set[str] = set()
+        for token in tokens:
+            if infix in token:
+                keys.update(self.postings[token])
+        return keys
+
+    def _sorted_vocabularies(self) -> Tuple[List[str], List[str]]:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+            self._reversed_vocabulary = sorted(token[::-1] for token in self.postings)
+        return self._vocabulary, self._reversed_vocabulary
+
+    def _token_grams(self) -> Dict[str, Set[str]]:
+        if self._grams is None:
+            self._grams = {}
+            for token in self.postings:
+                for gram in _trigrams(token):
+                    self._grams.setdefault(gram, set()).add(token)
+        return self._grams
+
+    def _add_token(self, token: str) -> None:
+        if self._vocabulary is not None:
+            bisect.insort(self._vocabulary, token)
+            bisect.insort(self._reversed_vocabulary, token[::-1])
+        if self._grams is not None:
+            for gram in _trigrams(token):
+                self._grams.setdefault(gram, set()).add(token)
+
+    def _remove_token(self, token: str) -> None:
+        del self.postings[token]
+        if self._vocabulary is not None:
+            del self._vocabulary[bisect.bisect_left(self._vocabulary, token)]
+            reversed_token = token[::-1]
+            del self._reversed_vocabulary[bisect.bisect_left(self._reversed_vocabulary, reversed_token)]
+        if self._grams is not None:
+            for gram in _trigrams(token):
+                tokens = self._grams[gram]
+                tokens.discard(token)
+                if not tokens:
+                    del self._grams[gram]
+
+    def _journal(self, key: str, signature: Optional[Tuple[int, ...]]) -> None:
+        if self._index_file is None:
+            return
+        self._pending[key] = signature
+        if len(self._pending) >= self._batch_size:
+            self.flush()
+
+    def _terms(self, key: str) -> Dict[str, int]:
+        """Term counts of one record, read back from the postings."""
+        return {token: self.postings[token][key] for token in self._tokens.get(key, ())}
+
+    def _snapshot(self) -> Dict[str, Tuple[Optional[Tuple[int, ...]], Dict[str, int]]]:
+        return {key: (self._signatures[key], self._terms(key)) for key in self._tokens}
+
+
+def _starting_with(sorted_strings: List[str], prefix: str) -> Iterator[str]:
+    for index in range(bisect.bisect_left(sorted_strings, prefix), len(sorted_strings)):
+        if not sorted_strings[index].startswith(prefix):
+            return
+        yield sorted_strings[index]
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[index:index + 3] for index in range(len(text) - 2)}
+
+
+def _entry_time_ns(name: str, partitioned: bool) -> Optional[int]:
+    """Creation time of a history entry from its name, in nanoseconds.
+
+    Entries filed inside a bucket directory carry nanoseconds; entries of the
+    flat layout, directly under history/, carry whole seconds.
+    """
+    match = _ENTRY_NAME_RE.fullmatch(name)
+    if match is None:
+        return None
+    value = int(match.group(1))
+    return value if partitioned else value * 1_000_000_000
+
+
+def _history_bucket(path: str) -> Optional[Tuple[int, ...]]:
+    """The bucket a "history[/year[/month[/day[/hour]]]]" path names, or None for other paths."""
+    parts = path.strip("/").split("/")
+    if parts[0] != "history" or not all(part.isdigit() for part in parts[1:]):
+        return None
+    bucket = tuple(int(part) for part in parts[1:])
+    if bucket and _bucket_span(bucket) is None:
+        return None
+    return bucket
+
+
+def _bucket_span(bucket: Tuple[int, ...]) -> Optional[Tuple[int, int]]:
+    """[start, end) of a year/month/day/hour bucket in UTC nanoseconds, or None if it is not one."""
+    if len(bucket) > 4:
+        return None
+    year, month, day, hour = bucket + (1, 1, 0)[len(bucket) - 1:]
+    try:
+        start = datetime(year, month, day, hour, tzinfo=timezone.utc)
+    except ValueError:
+        return None
+    if len(bucket) == 1:
+        end = start.replace(year=year + 1) if year < 9999 else datetime.max.replace(tzinfo=timezone.utc)
+    elif len(bucket) == 2:
+        end = start.replace(year=year + month // 12, month=month % 12 + 1)
+    else:
+        end = start + (timedelta(days=1) if len(bucket) == 3 else timedelta(hours=1))
+    epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    return (start - epoch) // timedelta(microseconds=1) * 1000, (end - epoch) // timedelta(microseconds=1) * 1000
+
+
+def _bounds_ns(start: Optional[float], end: Optional[float]) -> Tuple[Optional[int], Optional[int]]:
+    return (
+        None if start is None else int(start * 1_000_000_000),
+        None if end is None else int(end * 1_000_000_000),
+    )
+
+
+def _by_score(item: Tuple[str, float]) -> Tuple[float, str]:
+    return -item[1], item[0]
+
+
 class PersistentContextRepository(ContextSource):
     """Persistent history/memory/scratchpad repository with basic indexing.
 
     Paths are rooted by layer: "history/...", "memory/...", "scratchpad/...".
-    Records are stored as JSON with multiple views.
+    Records are stored as JSON with multiple views, either one file per record
+    (storage="json") or appended to segment files (storage="segments"), which
+    avoids an inode and an open/parse/rewrite cycle per record. Use
+    `migrate_repository` (or `python -m py_context_fs.migrate`) to convert a
+    repository between the two.
+
+    Every layer has a token index, kept under <root>/index/. Memory search
+    matches query tokens against it directly; history and scratchpad search
+    match the raw query as a substring of any view, checking only the records
+    the index admits. At startup the indexes are loaded and reconciled against
+    the storage's record signatures ((mtime_ns, size) for JSON files), so only
+    records changed since they were saved are parsed again.
+
+    Writes are atomic (JSON files are replaced by rename) and made durable
+    according to `durability`. Inside `with repo.batch():` writes are buffered
+    and committed together on exit, with a single fsync for segments.
     """
 
-    def __init__(self, root_dir: str):
+    def __init__(
+        self,
+        root_dir: str,
+        storage: str = "json",
+        segment_bytes: int = 64 * 1024 * 1024,
+        compaction_interval: Optional[float] = 300.0,
+        persist_index: bool = True,
+        index_batch_size: int = 64,
+        durability: str = "os",
+        sync_interval: float = 0.1,
+        cache_bytes: int = 32 * 1024 * 1024,
+        history_partition: Optional[str] = None,
+    ):
+        """
+        Args:
+            root_dir: Repository directory (created if missing).
+            storage: "json" or "segments".
+            segment_bytes: Segment size for storage="segments".
+            compaction_interval: Seconds between background compactions of
+                superseded records for storage="segments" (None disables them).
+            persist_index: Keep the search indexes on disk between restarts.
+            index_batch_size: Index updates buffered before they are journaled.
+                Unjournaled updates are recovered by reconciliation after a crash.
+            durability: When writes reach stable storage: "always" (fsync-ed
+                before the write or batch returns), "interval" (fsync-ed by a
+                background thread every `sync_interval` seconds) or "os"
+                (whenever the operating system flushes its cache).
+            sync_interval: Seconds between background syncs for durability="interval".
+            cache_bytes: Memory budget of the parsed-record cache (0 disables it).
+                Entries are validated against the storage signature on every
+                hit, so records rewritten by other processes are re-read.
+            history_partition: "day" or "hour" to file new history entries
+                under UTC bucket directories (history/YYYY/MM/DD[/HH]/), so
+                `history_range` only visits the buckets it needs; None keeps
+                the flat history/ directory. Both layouts can coexist.
+        """
+        if history_partition is not None and history_partition not in _HISTORY_PARTITIONS:
+            raise ValueError(
+                f"Unknown history partition '{history_partition}' (expected one of {', '.join(_HISTORY_PARTITIONS)})"
+            )
+        if durability not in _DURABILITY:
+            raise ValueError(f"Unknown durability '{durability}' (expected one of {', '.join(_DURABILITY)})")
         self._root = Path(root_dir)
-        self._layers = {
-            "history": self._root / "history",
-            "memory": self._root / "memory",
-            "scratchpad": self._root / "scratchpad",
+        self._root.mkdir(parents=True, exist_ok=True)
+        self._storage = _open_storage(self._root, storage, segment_bytes, compaction_interval)
+        self._durable = durability == "always"
+        self._history_format = _HISTORY_PARTITIONS.get(history_partition)
+        self._cache_bytes = cache_bytes
+        # key -> (signature, record, estimated size), least recently used first.
+        self._cache: "OrderedDict[str, Tuple[Tuple[int, ...], RepositoryRecord, int]]" = OrderedDict()
+        self._cached_size = 0
+        self._cache_lock = threading.Lock()
+        self._cache_stats = CacheStats()
+        # Per-thread `writes`: key -> (record, indexed terms) written inside
+        # `batch()` but not yet committed.
+        self._batches = threading.local()
+
+        self._indexes = {
+            layer: _LayerIndex(
+                _IndexFile(self._root / "index" / f"{layer}-{storage}") if persist_index else None,
+                index_batch_size,
+            )
+            for layer in _LAYERS
         }
-        for layer_dir in self._layers.values():
-            layer_dir.mkdir(parents=True, exist_ok=True)
+        for layer, index in self._indexes.items():
+            if persist_index:
+                index.reconcile(self._storage.iter_signatures(layer), self._record_terms)
+            else:
+                index.rebuild(self._storage.iter_signatures(layer), self._record_terms)
 
-        self._memory_index: Dict[str, Set[str]] = {}
-        self._memory_tokens: Dict[str, Set[str]] = {}
-        self.rebuild_index()
+        self._stop = threading.Event()
+        self._syncer: Optional[threading.Thread] = None
+        if durability == "interval":
+            self._syncer = threading.Thread(target=self._sync_periodically, args=(sync_interval,), daemon=True)
+            self._syncer.start()
 
     def read(self, path: str, view: str = "default") -> ContextFile:
         layer, rel = self._split_path(path)
-        record_path = self._record_path(layer, rel)
-        record = self._load_record(record_path)
+        record = self._load_record(self._record_key(layer, rel))
 
         if view not in record.views:
             raise ValueError(f"View '{view}' not found for file {path}")
 
-        return ContextFile(content=record.views[view], metadata=record.metadata)
+        # Deep copies: nested values (e.g. a `history` list) must not reach the cached record.
+        return ContextFile(content=record.views[view], metadata=copy.deepcopy(record.metadata))
+
+    def stat(self, path: str) -> ContextStat:
+        layer, rel = self._split_path(path)
+        record = self._load_record(self._record_key(layer, rel))
+        token_count = record.metadata.get("token_count")
+        return ContextStat(
+            views=list(record.views),
+            sizes={view: len(content.encode("utf-8")) for view, content in record.views.items()},
+            metadata=copy.deepcopy(record.metadata),
+            token_count=token_count if isinstance(token_count, int) else None,
+            updated_at=record.updated_at,
+        )
 
     def list(self, path: str) -> List[str]:
+        return list(self.ilist(path))
+
+    def ilist(self, path: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> Iterator[str]:
+        """Streams the same entries as `list`, one directory at a time.
+
+        Only the directory currently being walked is held in memory, so paging
+        through a large history layer does not materialize the whole layer.
+        """
         layer, rel = self._split_path(path)
         prefix = rel.as_posix().strip("/")
+        if prefix == ".":
+            prefix = ""
+        *dirs, name_prefix = prefix.split("/")
+        directory = "/".join([layer, *dirs])
 
-        results: List[str] = []
-        for file_path in self._layers[layer].rglob("*.json"):
-            rel_path = file_path.relative_to(self._layers[layer]).as_posix()
-            if prefix and not rel_path.startswith(prefix):
-                continue
-            results.append(f"{layer}/{rel_path}")
-        return results
+        if cursor is not None:
+            if not cursor.startswith(f"{layer}/"):
+                raise ValueError(f"Cursor '{cursor}' is not in layer '{layer}'")
+            if not cursor.startswith(f"{directory}/"):
+                raise ValueError(f"Cursor '{cursor}' is not below '{path}'")
+
+        records = self._storage.iter_keys(directory, cursor, name_prefix)
+        return itertools.islice(records, limit)
 
     def search(self, query: str) -> List[str]:
         results: Set[str] = set()
         tokens = self._tokenize(query)
 
         if tokens:
-            # Indexed search for memory layer
+            # Memory matches any query token
+            postings = self._indexes["memory"].postings
             for token in tokens:
-                for path in self._memory_index.get(token, set()):
+                for path in postings.get(token, {}):
                     results.add(path)
 
-        # Fallback substring search for history and scratchpad layers
+        # History and scratchpad match the raw substring in any view; the
+        # index narrows the records to check.
         for layer in ("history", "scratchpad"):
-            for file_path in self._layers[layer].rglob("*.json"):
-                record = self._load_record(file_path)
+            candidates = self._indexes[layer].substring_candidates(query)
+            keys = sorted(candidates) if candidates is not None else self._storage.iter_keys(layer)
+            for key in keys:
+                try:
+                    record = self._load_record(key)
+                except FileNotFoundError:
+                    self._drop_stale(key)
+                    continue
                 if any(query in view for view in record.views.values()):
-                    rel_path = file_path.relative_to(self._layers[layer]).as_posix()
-                    results.add(f"{layer}/{rel_path}")
+                    results.add(key)
 
         return sorted(results)
 
+    def search_ranked(self, query: str, k: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Ranks the records containing any query token by BM25.
+
+        Every layer is scored against its own index (the default view in
+        memory, all views in history and scratchpad), and only the `k` best
+        records are kept, on a heap.
+
+        Returns:
+            (path, score) pairs, best first; ties are broken by path.
+        """
+        tokens = self._tokenize(query)
+        scores = [index.score(tokens) for index in self._indexes.values()]
+        # Records deleted behind the repository's back are dropped and the
+        # top k taken again without them.
+        stale: Set[str] = set()
+        while True:
+            scored = (
+                (key, score)
+                for key, score in itertools.chain.from_iterable(layer.items() for layer in scores)
+                if key not in stale
+            )
+            top = sorted(scored, key=_by_score) if k is None else heapq.nsmallest(k, scored, key=_by_score)
+            missing = [key for key, _ in top if not self._record_exists(key)]
+            if not missing:
+                return top
+            for key in missing:
+                self._drop_stale(key)
+            stale.update(missing)
+
     def write(self, path: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> None:
         self.write_view(path, view="default", content=content, metadata=metadata)
 
@@ -108,30 +899,131 @@ class PersistentContextRepository(ContextSource):
         metadata: Optional[Dict[str, Any]] = None,
     ) -> None:
         layer, rel = self._split_path(path)
-        record_path = self._record_path(layer, rel)
-        record_path.parent.mkdir(parents=True, exist_ok=True)
+        key = self._record_key(layer, rel)
 
-        if record_path.exists():
-            record = self._load_record(record_path)
-        else:
+        try:
+            current = self._load_record(key)
+        except FileNotFoundError:
             record = RepositoryRecord(views={}, metadata={}, updated_at=time.time())
+        else:
+            # Loaded records may be shared with the record cache; never mutate them.
+            record = RepositoryRecord(views=dict(current.views), metadata=current.metadata, updated_at=current.updated_at)
 
         record.views[view] = content
         if metadata is not None:
-            record.metadata = metadata
+            # The record is cached; later changes to the caller's dict must not reach it.
+            record.metadata = copy.deepcopy(metadata)
         record.updated_at = time.time()
-        self._save_record(record_path, record)
+        terms = self._view_terms(key, record)
+        pending = self._pending_writes
+        if pending is not None:
+            pending[key] = (record, terms)
+            # Searches see the write right away; its signature is known on commit.
+            self._indexes[layer].update(key, terms, None, journal=False)
+            return
+
+        self._storage.save(key, record, durable=self._durable)
+        signature = self._storage.signature(key)
+        self._indexes[layer].update(key, terms, signature)
+        self._cache_record(key, signature, record)
+
+    @contextmanager
+    def batch(self) -> Iterator["PersistentContextRepository"]:
+        """Buffers writes and commits them together when the block exits.
+
+        Reads and searches inside the block see the buffered writes (listings
+        see them once they are committed). On exit they are written with one
+        `save_many` call: a single append and, with durability="always", a
+        single fsync for storage="segments", or one atomic rename per record
+        for storage="json". If the block raises, the buffered writes are
+        discarded. Nested batches join the outermost one.
+
+        A batch belongs to the thread that opened it: writes made by other
+        threads meanwhile are neither buffered nor rolled back with it.
 
-        if layer == "memory":
-            self._update_memory_index(f"{layer}/{rel.as_posix()}", record.views.get("default", ""))
+        Example:
+            with repo.batch():
+                path = repo.append_history(turn)
+                repo.promote_history_to_memory(path, memory_key="latest")
+        """
+        if self._pending_writes is not None:
+            yield self
+            return
+        self._batches.writes = {}
+        try:
+            yield self
+            self._commit_batch()
+        except BaseException:
+            self._discard_batch()
+            raise
+        finally:
+            self._batches.writes = None
+
+    def cache_stats(self) -> CacheStats:
+        """Returns a snapshot of the record cache counters."""
+        with self._cache_lock:
+            return CacheStats(
+                hits=self._cache_stats.hits,
+                misses=self._cache_stats.misses,
+                evictions=self._cache_stats.evictions,
+                invalidations=self._cache_stats.invalidations,
+                entries=len(self._cache),
+                size_bytes=self._cached_size,
+            )
+
+    def sync(self) -> None:
+        """Forces every write made so far to stable storage."""
+        self._storage.sync()
 
     def append_history(self, content: str, metadata: Optional[Dict[str, Any]] = None) -> str:
         """Appends an immutable history entry and returns its path."""
-        entry_id = f"{int(time.time())}_{uuid4().hex}"
-        path = f"history/{entry_id}.json"
+        if self._history_format is None:
+            path = f"history/{int(time.time())}_{uuid4().hex}.json"
+        else:
+            created_ns = time.time_ns()
+            bucket = time.strftime(self._history_format, time.gmtime(created_ns // 1_000_000_000))
+            path = f"history/{bucket}/{created_ns}_{uuid4().hex}.json"
         self.write(path, content, metadata=metadata)
         return path
 
+    def history_range(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        limit: Optional[int] = None,
+        reverse: bool = True,
+    ) -> List[str]:
+        """Returns history entries created within [start, end), by creation time.
+
+        Entries are dated by the timestamp `append_history` puts in their
+        names (entries with other names are skipped). Only the bucket
+        directories overlapping the range are listed, so with a partitioned
+        layout the cost follows the number of entries returned rather than
+        the size of the history; flat entries are always listed.
+
+        Args:
+            start: Earliest UNIX timestamp included (None for no bound).
+            end: UNIX timestamp the range stops before (None for no bound).
+            limit: Maximum number of entries (None for all).
+            reverse: Newest first (the default) instead of oldest first.
+        """
+        return list(itertools.islice(self._iter_history(start, end, reverse), limit))
+
+    def ilist_range(
+        self,
+        path: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        limit: Optional[int] = None,
+        reverse: bool = True,
+    ) -> Iterator[str]:
+        """Lists history and its buckets (e.g. "history/2024/05") by bucket; other paths by `updated_at`."""
+        bucket = _history_bucket(path)
+        if bucket is not None:
+            entries = self._iter_bucket(path.strip("/"), bucket, _bounds_ns(start, end), reverse)
+            return itertools.islice((key for _, key in entries), limit)
+        return super().ilist_range(path, start, end, limit, reverse)
+
     def persist_scratchpad(
         self, content: str, metadata: Optional[Dict[str, Any]] = None, key: Optional[str] = None
     ) -> str:
@@ -171,13 +1063,31 @@ class PersistentContextRepository(ContextSource):
         return memory_path
 
     def rebuild_index(self) -> None:
-        """Rebuilds the in-memory index for memory layer."""
-        self._memory_index.clear()
-        self._memory_tokens.clear()
-        for file_path in self._layers["memory"].rglob("*.json"):
-            rel_path = file_path.relative_to(self._layers["memory"]).as_posix()
-            record = self._load_record(file_path)
-            self._update_memory_index(f"memory/{rel_path}", record.views.get("default", ""))
+        """Rebuilds the search indexes from every record, and saves them."""
+        for layer, index in self._indexes.items():
+            index.rebuild(self._storage.iter_signatures(layer), self._record_terms)
+
+    def flush_index(self) -> None:
+        """Writes buffered index updates to the on-disk indexes."""
+        for index in self._indexes.values():
+            index.flush()
+
+    def compact(self) -> int:
+        """Reclaims space taken by superseded records (storage="segments" only).
+
+        Returns:
+            The number of bytes reclaimed.
+        """
+        return self._storage.compact()
+
+    def close(self) -> None:
+        """Syncs writes (unless durability="os"), saves buffered index updates and closes the storage."""
+        self._stop.set()
+        if self._syncer is not None:
+            self._syncer.join()
+            self._storage.sync()
+        self.flush_index()
+        self._storage.close()
 
     def _split_path(self, path: str) -> Tuple[str, Path]:
         rel_path = Path(path)
@@ -185,37 +1095,160 @@ class PersistentContextRepository(ContextSource):
         if not parts:
             raise ValueError("Path must include a layer prefix (history/memory/scratchpad)")
         layer = parts[0]
-        if layer not in self._layers:
+        if layer not in _LAYERS:
             raise ValueError(f"Unknown layer '{layer}'")
         remainder = Path(*parts[1:]) if len(parts) > 1 else Path("")
         return layer, remainder
 
-    def _record_path(self, layer: str, rel: Path) -> Path:
+    def _record_key(self, layer: str, rel: Path) -> str:
         if not rel.as_posix() or rel.as_posix() == ".":
             raise ValueError("Path must include a file name")
         if rel.suffix != ".json":
             rel = rel.with_suffix(".json")
-        return self._layers[layer] / rel
+        return f"{layer}/{rel.as_posix()}"
 
-    def _load_record(self, path: Path) -> RepositoryRecord:
-        with path.open("r", encoding="utf-8") as handle:
-            data = json.load(handle)
-        return RepositoryRecord.from_dict(data)
+    def _load_record(self, key: str) -> RepositoryRecord:
+        """Returns a record, from the cache if its storage signature still matches.
+
+        The record may be shared with the cache and must not be mutated.
+        """
+        pending = self._pending_writes
+        if pending is not None and key in pending:
+            return pending[key][0]
+        if self._cache_bytes <= 0:
+            return self._storage.load(key)
+        signature = self._storage.signature(key)
+        if signature is None:
+            return self._storage.load(key)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == signature:
+                self._cache.move_to_end(key)
+                self._cache_stats.hits += 1
+                return cached[1]
+            if cached is not None:
+                # Rewritten behind the repository's back.
+                self._uncache(key)
+                self._cache_stats.invalidations += 1
+            self._cache_stats.misses += 1
+        record = self._storage.load(key)
+        self._cache_record(key, signature, record)
+        return record
+
+    def _record_exists(self, key: str) -> bool:
+        pending = self._pending_writes
+        return (pending is not None and key in pending) or self._storage.signature(key) is not None
+
+    def _drop_stale(self, key: str) -> None:
+        """Removes a record deleted outside the repository from its layer's index."""
+        index = self._indexes[key.split("/", 1)[0]]
+        # Keys without a signature are writes still buffered in some thread's batch.
+        if index.signature(key) is not None:
+            index.remove(key)
+
+    @property
+    def _pending_writes(self) -> Optional[Dict[str, Tuple[RepositoryRecord, Dict[str, int]]]]:
+        """The calling thread's uncommitted batch, or None outside `batch()`."""
+        return getattr(self._batches, "writes", None)
+
+    def _cache_record(self, key: str, signature: Optional[Tuple[int, ...]], record: RepositoryRecord) -> None:
+        if self._cache_bytes <= 0:
+            return
+        size = sys.getsizeof(key) + sum(sys.getsizeof(content) for content in record.views.values())
+        with self._cache_lock:
+            self._uncache(key)
+            if signature is None or size > self._cache_bytes:
+                return
+            self._cache[key] = (signature, record, size)
+            self._cached_size += size
+            while self._cached_size > self._cache_bytes:
+                _, (_, _, evicted_size) = self._cache.popitem(last=False)
+                self._cached_size -= evicted_size
+                self._cache_stats.evictions += 1
+
+    def _uncache(self, key: str) -> None:
+        cached = self._cache.pop(key, None)
+        if cached is not None:
+            self._cached_size -= cached[2]
+
+    def _commit_batch(self) -> None:
+        items = self._pending_writes
+        if not items:
+            return
+        self._storage.save_many(((key, record) for key, (record, _) in items.items()), durable=self._durable)
+        for key, (record, terms) in items.items():
+            signature = self._storage.signature(key)
+            self._indexes[key.split("/", 1)[0]].update(key, terms, signature)
+            self._cache_record(key, signature, record)
+
+    def _discard_batch(self) -> None:
+        """Points the indexes back at the stored versions of the discarded records."""
+        items, self._batches.writes = self._pending_writes, None
+        for key in items:
+            index = self._indexes[key.split("/", 1)[0]]
+            try:
+                index.update(key, self._record_terms(key), self._storage.signature(key), journal=False)
+            except FileNotFoundError:
+                index.remove(key)
+
+    def _iter_history(self, start: Optional[float], end: Optional[float], reverse: bool) -> Iterator[str]:
+        for _, key in self._iter_bucket("history", (), _bounds_ns(start, end), reverse):
+            yield key
+
+    def _iter_bucket(
+        self,
+        directory: str,
+        bucket: Tuple[int, ...],
+        bounds: Tuple[Optional[int], Optional[int]],
+        reverse: bool,
+    ) -> Iterator[Tuple[int, str]]:
+        """Yields (created_ns, key) for the history entries of a bucket, in time order.
+
+        Sub-buckets cover disjoint, ordered spans, so they are visited one
+        after another (skipping those outside `bounds`); entries filed
+        directly in the bucket, like flat-layout entries, are merged in.
+        """
+        start_ns, end_ns = bounds
+        entries = []
+        sub_buckets = []
+        for name, is_dir in self._storage.children(directory):
+            if is_dir:
+                span = _bucket_span(bucket + (int(name),)) if name.isdigit() else None
+                if span is not None and (start_ns is None or span[1] > start_ns) and (end_ns is None or span[0] < end_ns):
+                    sub_buckets.append(f"{directory}/{name}")
+                continue
+            created_ns = _entry_time_ns(name, partitioned=bool(bucket))
+            if created_ns is not None and (start_ns is None or created_ns >= start_ns) and (
+                end_ns is None or created_ns < end_ns
+            ):
+                entries.append((created_ns, f"{directory}/{name}"))
+        entries.sort(reverse=reverse)
+        if reverse:
+            sub_buckets.reverse()
+        nested = itertools.chain.from_iterable(
+            self._iter_bucket(sub_bucket, bucket + (int(sub_bucket.rsplit("/", 1)[1]),), bounds, reverse)
+            for sub_bucket in sub_buckets
+        )
+        return heapq.merge(entries, nested, reverse=reverse)
 
-    def _save_record(self, path: Path, record: RepositoryRecord) -> None:
-        with path.open("w", encoding="utf-8") as handle:
-            json.dump(record.to_dict(), handle, ensure_ascii=True, indent=2)
+    def _sync_periodically(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            self._storage.sync()
 
-    def _update_memory_index(self, path: str, content: str) -> None:
-        tokens = self._tokenize(content)
-        old_tokens = self._memory_tokens.get(path, set())
+    def _record_terms(self, key: str) -> Dict[str, int]:
+        return self._view_terms(key, self._load_record(key))
 
-        for token in old_tokens - tokens:
-            self._memory_index.get(token, set()).discard(path)
-        for token in tokens - old_tokens:
-            self._memory_index.setdefault(token, set()).add(path)
+    def _view_terms(self, key: str, record: RepositoryRecord) -> Dict[str, int]:
+        """Term counts indexed for a record: the default view in memory, every view elsewhere."""
+        if key.startswith("memory/"):
+            return self._term_counts(record.views.get("default", ""))
+        terms: Counter = Counter()
+        for content in record.views.values():
+            terms.update(self._term_counts(content))
+        return dict(terms)
 
-        self._memory_tokens[path] = tokens
+    def _term_counts(self, text: str) -> Dict[str, int]:
+        return dict(Counter(match.group(0).lower() for match in _TOKEN_RE.finditer(text)))
 
     def _tokenize(self, text: str) -> Set[str]:
         return {match.group(0).lower() for match in _TOKEN_RE.finditer(text)}
@@ -1,5 +1,237 @@
-from typing import Any, Dict, List, Optional
-from .core import ContextSource, ContextFile
+import asyncio
+import codecs
+import copy
+import functools
+import itertools
+import json
+import lzma
+import mmap
+import os
+import re
+import sqlite3
+import stat
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+import weakref
+import zipfile
+import zlib
+from collections import OrderedDict, deque
+from concurrent import futures
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+from .core import (
+    DEFAULT_CHUNK_SIZE,
+    AsyncContextSource,
+    ContextFile,
+    ContextSource,
+    ContextStat,
+    LazyContextFile,
+    iter_file_chunks,
+)
+from .index import NgramIndex, PathIndex, TokenIndex, path_segments, scan_tree
+
+# Rows fetched per query while streaming a SQLite listing.
+_LIST_PAGE_SIZE = 1000
+
+class _DictStore:
+    """Plain view storage: one dict of views and one metadata dict per path."""
+
+    def __init__(self):
+        self._data: Dict[str, Dict[str, str]] = {}
+        # Simple storage for metadata if checking is needed, 
+        # heavily simplified for this reference implementation
+        self._metadata: Dict[str, Dict[str, Any]] = {} 
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._data
+
+    def paths(self) -> Iterable[str]:
+        return self._data.keys()
+
+    def view_names(self, path: str) -> List[str]:
+        return list(self._data[path])
+
+    def get_view(self, path: str, view: str) -> Optional[str]:
+        return self._data[path].get(view)
+
+    def view_sizes(self, path: str) -> Dict[str, int]:
+        return {view: len(content.encode("utf-8")) for view, content in self._data[path].items()}
+
+    def metadata(self, path: str) -> Dict[str, Any]:
+        return self._metadata.get(path, {})
+
+    def put(self, path: str, views: Dict[str, str], metadata: Optional[Dict[str, Any]]) -> None:
+        self._data[path] = views
+        if metadata:
+            self._metadata[path] = metadata
+
+    def put_view(self, path: str, view: str, content: str, metadata: Optional[Dict[str, Any]]) -> None:
+        self._data.setdefault(path, {})[view] = content
+        if metadata:
+            self._metadata[path] = metadata
+
+
+class _CompactRecord:
+    __slots__ = ("names", "values", "meta_keys", "meta_values")
+
+    def __init__(
+        self,
+        names: Tuple[str, ...],
+        values: Tuple[Any, ...],
+        meta_keys: Tuple[str, ...],
+        meta_values: Tuple[Any, ...],
+    ):
+        self.names = names
+        self.values = values
+        self.meta_keys = meta_keys
+        self.meta_values = meta_values
+
+
+_CODECS = {"zlib": (zlib.compress, zlib.decompress), "lzma": (lzma.compress, lzma.decompress)}
+
+
+def _zlib_compress_with(zdict: bytes, data: bytes) -> bytes:
+    compressor = zlib.compressobj(zlib.Z_BEST_COMPRESSION, zdict=zdict)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _zlib_decompress_with(zdict: bytes, data: bytes) -> bytes:
+    return zlib.decompressobj(zdict=zdict).decompress(data)
+
+# Compressed views are stored as bytes: the UTF-8 size of the text as a
+# 4-byte prefix, followed by the compressed text. Uncompressed views stay str.
+_SIZE_PREFIX = 4
+
+
+class _CompactStore:
+    """Slot-based view storage with interned names and optional compression.
+
+    Each path maps to one `_CompactRecord` holding tuples instead of dicts.
+    Tuples of view names and of metadata keys are shared by every record with
+    the same layout, and the names themselves are interned. Metadata is
+    rebuilt into a fresh dict on every read. With a codec, views of at least
+    `compress_threshold` UTF-8 bytes are stored compressed and decompressed on
+    read through a small LRU of hot views. A zlib preset dictionary of text
+    typical for the store lets short views compress well on their own.
+    """
+
+    def __init__(
+        self,
+        compression: Optional[str],
+        compress_threshold: int,
+        hot_cache_size: int,
+        compression_dictionary: Optional[bytes] = None,
+    ):
+        if compression is not None and compression not in _CODECS:
+            raise ValueError(f"Unknown compression '{compression}' (expected 'zlib' or 'lzma')")
+        if compression_dictionary is not None and compression != "zlib":
+            raise ValueError("compression_dictionary requires compression='zlib'")
+        self._records: Dict[str, _CompactRecord] = {}
+        self._layouts: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+        self._codec = _CODECS.get(compression)
+        if compression_dictionary is not None:
+            self._codec = (
+                functools.partial(_zlib_compress_with, compression_dictionary),
+                functools.partial(_zlib_decompress_with, compression_dictionary),
+            )
+        self._compress_threshold = compress_threshold
+        self._hot: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._hot_cache_size = hot_cache_size
+        self._lock = threading.Lock()
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._records
+
+    def paths(self) -> Iterable[str]:
+        return self._records.keys()
+
+    def view_names(self, path: str) -> List[str]:
+        return list(self._records[path].names)
+
+    def get_view(self, path: str, view: str) -> Optional[str]:
+        record = self._records[path]
+        try:
+            value = record.values[record.names.index(view)]
+        except ValueError:
+            return None
+        if isinstance(value, str):
+            return value
+        key = (path, view)
+        with self._lock:
+            content = self._hot.get(key)
+            if content is not None:
+                self._hot.move_to_end(key)
+                return content
+        content = self._codec[1](value[_SIZE_PREFIX:]).decode("utf-8")
+        if self._hot_cache_size > 0:
+            with self._lock:
+                # Each write installs a new record (under the lock), so the
+                # record doubles as a generation tag: if it was replaced while
+                # decompressing, the content is stale and must not be cached.
+                if self._records.get(path) is not record:
+                    return content
+                self._hot[key] = content
+                while len(self._hot) > self._hot_cache_size:
+                    self._hot.popitem(last=False)
+        return content
+
+    def view_sizes(self, path: str) -> Dict[str, int]:
+        record = self._records[path]
+        return {
+            view: len(value.encode("utf-8")) if isinstance(value, str) else int.from_bytes(value[:_SIZE_PREFIX], "little")
+            for view, value in zip(record.names, record.values)
+        }
+
+    def metadata(self, path: str) -> Dict[str, Any]:
+        record = self._records[path]
+        return dict(zip(record.meta_keys, record.meta_values))
+
+    def put(self, path: str, views: Dict[str, str], metadata: Optional[Dict[str, Any]]) -> None:
+        self._replace(path, {view: self._pack(content) for view, content in views.items()}, metadata)
+
+    def put_view(self, path: str, view: str, content: str, metadata: Optional[Dict[str, Any]]) -> None:
+        record = self._records.get(path)
+        values = dict(zip(record.names, record.values)) if record is not None else {}
+        values[view] = self._pack(content)
+        self._replace(path, values, metadata)
+
+    def _replace(self, path: str, values: Dict[str, Any], metadata: Optional[Dict[str, Any]]) -> None:
+        record = self._records.get(path)
+        if metadata:
+            meta_keys = self._layout(metadata)
+            meta_values = tuple(metadata.values())
+        elif record is not None:
+            meta_keys, meta_values = record.meta_keys, record.meta_values
+        else:
+            meta_keys = meta_values = ()
+        replacement = _CompactRecord(self._layout(values), tuple(values.values()), meta_keys, meta_values)
+        with self._lock:
+            self._drop_hot(path, record)
+            self._records[path] = replacement
+
+    def _layout(self, mapping: Dict[str, Any]) -> Tuple[str, ...]:
+        names = tuple(sys.intern(name) if isinstance(name, str) else name for name in mapping)
+        return self._layouts.setdefault(names, names)
+
+    def _pack(self, content: str) -> Any:
+        if self._codec is None:
+            return content
+        encoded = content.encode("utf-8")
+        if len(encoded) < self._compress_threshold:
+            return content
+        return len(encoded).to_bytes(_SIZE_PREFIX, "little") + self._codec[0](encoded)
+
+    def _drop_hot(self, path: str, record: Optional[_CompactRecord]) -> None:
+        """Evicts the hot views of a record being replaced; call with the lock held."""
+        if record is None or self._codec is None:
+            return
+        for view in record.names:
+            self._hot.pop((path, view), None)
+
 
 class DictResolver(ContextSource):
     """An in-memory implementation of ContextSource using a Python dictionary.
@@ -12,69 +244,1115 @@ class DictResolver(ContextSource):
             ... other views
         }
     }
+
+    Search scans the searchable views by default. Pass `search_index="ngram"`
+    to answer substring queries from a trigram index, or `"token"` to match
+    documents containing every query token (case-insensitive). With
+    `verify=True` index candidates are checked with the exact substring test,
+    so "ngram" returns exactly what a scan would; with `verify=False` the
+    postings answer is returned as is.
+
+    `compact=True` stores each file as a slot-based record with interned view
+    names and metadata keys instead of two dicts; metadata is then returned
+    as a fresh dict per read. Adding `compression="zlib"` (or "lzma") keeps
+    views of at least `compress_threshold` bytes compressed and decompresses
+    them on read, holding the `hot_cache_size` most recently read views in
+    memory. For short, similar views, pass a sample of typical text as
+    `compression_dictionary` (zlib only; it must stay the same for the
+    lifetime of the resolver).
     """
 
-    def __init__(self, check_metadata: bool = False):
-        self._data: Dict[str, Dict[str, str]] = {}
-        # Simple storage for metadata if checking is needed, 
-        # heavily simplified for this reference implementation
-        self._metadata: Dict[str, Dict[str, Any]] = {} 
+    def __init__(
+        self,
+        check_metadata: bool = False,
+        search_index: Optional[str] = None,
+        search_views: Sequence[str] = ("default",),
+        verify: bool = True,
+        compact: bool = False,
+        compression: Optional[str] = None,
+        compress_threshold: int = 512,
+        hot_cache_size: int = 128,
+        compression_dictionary: Optional[bytes] = None,
+    ):
+        if compression is not None and not compact:
+            raise ValueError("compression requires compact=True")
+        if compact:
+            self._store = _CompactStore(compression, compress_threshold, hot_cache_size, compression_dictionary)
+        else:
+            self._store = _DictStore()
+        self._paths = PathIndex()
+        # path -> UNIX timestamp of its last populate or write.
+        self._updated_at: Dict[str, float] = {}
+        self._search_views = tuple(search_views)
+        self._verify = verify
+        if search_index is None:
+            self._search_index = None
+        elif search_index == "ngram":
+            self._search_index = NgramIndex()
+        elif search_index == "token":
+            self._search_index = TokenIndex()
+        else:
+            raise ValueError(f"Unknown search index '{search_index}' (expected 'ngram' or 'token')")
 
     def populate(self, path: str, views: Dict[str, str], metadata: Optional[Dict[str, Any]] = None):
         """Helper to populate data for testing."""
-        self._data[path] = views
-        if metadata:
-            self._metadata[path] = metadata
+        exists = path in self._store
+        old_texts = self._searchable(path) if exists and self._search_index is not None else []
+        if not exists:
+            self._paths.add(path)
+        self._store.put(path, views, metadata)
+        self._updated_at[path] = time.time()
+        if self._search_index is not None:
+            self._search_index.update(path, old_texts, self._searchable(path))
 
     def read(self, path: str, view: str = "default") -> ContextFile:
-        if path not in self._data:
+        if path not in self._store:
              raise FileNotFoundError(f"File not found: {path}")
         
-        views = self._data[path]
-        if view not in views:
+        content = self._store.get_view(path, view)
+        if content is None:
             # Fallback logic could go here, but for now be strict
              raise ValueError(f"View '{view}' not found for file {path}")
         
-        content = views[view]
-        meta = self._metadata.get(path, {})
+        meta = self._store.metadata(path)
         
         return ContextFile(content=content, metadata=meta)
 
+    def stat(self, path: str) -> ContextStat:
+        if path not in self._store:
+             raise FileNotFoundError(f"File not found: {path}")
+
+        meta = self._store.metadata(path)
+        token_count = meta.get("token_count")
+        return ContextStat(
+            views=self._store.view_names(path),
+            sizes=self._store.view_sizes(path),
+            metadata=meta,
+            token_count=token_count if isinstance(token_count, int) else None,
+            updated_at=self._updated_at.get(path),
+        )
+
+    def list(self, path: str, recursive: bool = True) -> List[str]:
+        """Lists files below `path` from the path index.
+
+        Args:
+            path: Directory to list ("" or "." for the root of this node).
+            recursive: If False, return only the immediate entries; directories
+                are returned with a trailing '/'.
+
+        Raises:
+            FileNotFoundError: If a non-recursive listing targets a missing directory.
+        """
+        directory = "" if path in ("", ".") else path
+        if recursive:
+            return list(self._paths.iter_files(directory))
+        entries = self._paths.children(directory)
+        if entries is None:
+            raise FileNotFoundError(f"Directory not found: {path}")
+        base = "".join(f"{segment}/" for segment in directory.strip("/").split("/") if segment)
+        return [f"{base}{name}/" if is_dir else f"{base}{name}" for name, is_dir in entries]
+
+    def glob(self, pattern: str) -> List[str]:
+        """Lists files matching a glob pattern such as 'history/*/notes_*.txt' or 'logs/**/*.json'."""
+        return list(self._paths.glob(pattern))
+
+    def ilist(self, path: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> Iterator[str]:
+        # Same entries as `list`, streamed from the path index.
+        directory = "" if path in ("", ".") else path
+        return itertools.islice(self._paths.iter_files(directory, cursor), limit)
+
+    def search(self, query: str) -> List[str]:
+        if self._search_index is None or not query:
+            return [path for path in self._store.paths() if self._matches(path, query)]
+        candidates = self._search_index.candidates(query)
+        if self._verify:
+            candidates = [path for path in candidates if self._matches(path, query)]
+        return sorted(candidates, key=path_segments)
+
+    def _searchable(self, path: str) -> List[str]:
+        texts = (self._store.get_view(path, view) for view in self._search_views)
+        return [text for text in texts if text is not None]
+
+    def _matches(self, path: str, query: str) -> bool:
+        return any(query in text for text in self._searchable(path))
+
+    def write(self, path: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        exists = path in self._store
+        if not exists:
+            self._paths.add(path)
+        
+        old_texts = self._searchable(path) if exists and self._search_index is not None else []
+        self._store.put_view(path, "default", content, metadata)
+        self._updated_at[path] = time.time()
+        if self._search_index is not None:
+            self._search_index.update(path, old_texts, self._searchable(path))
+
+_FILE_INDEX_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS indexed_files (
+        id INTEGER PRIMARY KEY,
+        path TEXT NOT NULL UNIQUE,
+        mtime_ns INTEGER NOT NULL,
+        size INTEGER NOT NULL,
+        content TEXT
+    )
+    """,
+)
+
+_FILE_INDEX_FTS_SCHEMA = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS indexed_text
+    USING fts5(content, content='indexed_files', content_rowid='id', tokenize='trigram case_sensitive 1')
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS indexed_files_ai AFTER INSERT ON indexed_files BEGIN
+        INSERT INTO indexed_text(rowid, content) VALUES (new.id, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS indexed_files_ad AFTER DELETE ON indexed_files BEGIN
+        INSERT INTO indexed_text(indexed_text, rowid, content) VALUES ('delete', old.id, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS indexed_files_au AFTER UPDATE ON indexed_files BEGIN
+        INSERT INTO indexed_text(indexed_text, rowid, content) VALUES ('delete', old.id, old.content);
+        INSERT INTO indexed_text(rowid, content) VALUES (new.id, new.content);
+    END
+    """,
+)
+
+
+class _FileSearchIndex:
+    """Persistent substring index over the files of a LocalFileResolver.
+
+    One row per file holds its (mtime_ns, size) signature and decoded text
+    (NULL for files that are not valid UTF-8). With an FTS5 trigram index,
+    queries of three or more characters are answered without a scan; shorter
+    queries, and SQLite builds without the trigram tokenizer, use `instr`.
+    """
+
+    def __init__(self, db_path: str):
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            for statement in _FILE_INDEX_SCHEMA:
+                self._conn.execute(statement)
+            try:
+                for statement in _FILE_INDEX_FTS_SCHEMA:
+                    self._conn.execute(statement)
+                self._fts = True
+            except sqlite3.OperationalError:
+                self._fts = False
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def signatures(self) -> Dict[str, Tuple[int, int]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT path, mtime_ns, size FROM indexed_files").fetchall()
+        return {path: (mtime_ns, size) for path, mtime_ns, size in rows}
+
+    def update(
+        self,
+        changed: Iterable[Tuple[str, Tuple[int, int], Optional[str]]],
+        removed: Iterable[str] = (),
+    ) -> None:
+        """Stores (path, signature, content) rows and drops removed paths, in one transaction."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO indexed_files (path, mtime_ns, size, content) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET "
+                "mtime_ns = excluded.mtime_ns, size = excluded.size, content = excluded.content",
+                ((path, mtime_ns, size, content) for path, (mtime_ns, size), content in changed),
+            )
+            self._conn.executemany("DELETE FROM indexed_files WHERE path = ?", ((path,) for path in removed))
+
+    def search(self, query: str) -> List[str]:
+        with self._lock:
+            if self._fts and len(query) >= 3:
+                # A quoted trigram phrase matches exactly the texts containing `query`.
+                rows = self._conn.execute(
+                    "SELECT f.path FROM indexed_text JOIN indexed_files f ON f.id = indexed_text.rowid "
+                    "WHERE indexed_text MATCH ?",
+                    ('"' + query.replace('"', '""') + '"',),
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT path FROM indexed_files WHERE instr(content, ?) > 0", (query,)
+                ).fetchall()
+        return sorted((row[0] for row in rows), key=path_segments)
+
+
+def _file_signature(file_stat: os.stat_result) -> Tuple[int, int]:
+    return file_stat.st_mtime_ns, file_stat.st_size
+
+
+class LocalFileResolver(ContextSource):
+    """Context source backed by a local directory.
+
+    Summary view uses the naming convention: "<name>.summary<suffix>".
+    Example: transcript.txt -> transcript.summary.txt
+
+    Directories are walked with `os.scandir` in `path_segments` order. Decoded
+    files are kept in an LRU cache validated against each file's
+    (st_mtime_ns, st_size), so rereading an unchanged file costs one stat.
+    With a `token_counter`, files are counted when they are read and the
+    counts kept in a bounded LRU validated the same way; `stat` reports a
+    count only once the current version has been read, so it never opens
+    the file.
+    Files of `mmap_threshold` bytes or more bypass the cache: they are read
+    as lazy files decoded from a memory map, and searched in the mapping.
+
+    With `index_path`, `search` is answered from a persistent SQLite index of
+    file contents. Before a search the index is refreshed incrementally: the
+    tree is walked and only files whose (mtime_ns, size) changed are re-read.
+    """
+
+    def __init__(
+        self,
+        root_dir: str,
+        cache_bytes: int = 64 * 1024 * 1024,
+        mmap_threshold: int = 1024 * 1024,
+        token_counter: Optional[Callable[[str], int]] = None,
+        index_path: Optional[str] = None,
+        index_refresh_interval: float = 0.0,
+        token_cache_size: int = 65536,
+    ):
+        """
+        Args:
+            root_dir: Directory holding the files (created if missing).
+            cache_bytes: Total size of the decoded files kept in memory.
+            mmap_threshold: Size in bytes from which files are memory-mapped
+                instead of cached.
+            token_counter: Optional function whose results are reported as
+                `token_count` by `read`, and by `stat` for files already read
+                (e.g. ContextLoader.count_tokens).
+            index_path: SQLite file for a persistent search index. It may live
+                inside `root_dir`; its files are never listed.
+            index_refresh_interval: Seconds a refreshed index is trusted before
+                the next search re-checks the tree (0 re-checks every search).
+            token_cache_size: Number of files whose token counts are kept.
+        """
+        self._root = Path(root_dir)
+        self._root.mkdir(parents=True, exist_ok=True)
+        self._cache_bytes = cache_bytes
+        self._mmap_threshold = mmap_threshold
+        self._token_counter = token_counter
+        self._cache: "OrderedDict[str, Tuple[Tuple[int, int], str]]" = OrderedDict()
+        self._cached_size = 0
+        # file path -> (signature, token count), least recently used first.
+        self._token_counts: "OrderedDict[str, Tuple[Tuple[int, int], int]]" = OrderedDict()
+        self._token_cache_size = token_cache_size
+        self._lock = threading.Lock()
+        self._index: Optional[_FileSearchIndex] = None
+        self._index_lock = threading.Lock()
+        self._index_refresh_interval = index_refresh_interval
+        self._index_refreshed_at: Optional[float] = None
+        self._excluded: Set[str] = set()
+        if index_path is not None:
+            db_path = os.path.abspath(index_path)
+            self._excluded = {db_path + suffix for suffix in ("", "-wal", "-shm", "-journal")}
+            self._index = _FileSearchIndex(db_path)
+
+    def close(self) -> None:
+        """Closes the search index, if any."""
+        if self._index is not None:
+            self._index.close()
+
+    def read(self, path: str, view: str = "default") -> Union[ContextFile, LazyContextFile]:
+        file_path = str(self._resolve_path(path, view=view))
+        signature = self._signature(file_path)
+        if signature is None:
+            raise FileNotFoundError(f"File not found: {path} (view={view})")
+        metadata = {"path": file_path}
+        if signature[1] >= self._mmap_threshold:
+            return LazyContextFile.from_path(
+                file_path, metadata=metadata, token_count=self._cached_token_count(file_path, signature)
+            )
+        content = self._load(file_path, signature)
+        return ContextFile(
+            content=content,
+            metadata=metadata,
+            token_count=self._token_count(file_path, signature, content),
+        )
+
+    def read_stream(self, path: str, view: str = "default", chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+        file_path = self._resolve_path(path, view=view)
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {path} (view={view})")
+        return iter_file_chunks(str(file_path), chunk_size)
+
+    def stat(self, path: str) -> ContextStat:
+        sizes = {}
+        updated_at = None
+        token_count = None
+        default_path = str(self._resolve_path(path, view="default"))
+        for view in ("default", "summary"):
+            try:
+                file_stat = os.stat(self._resolve_path(path, view=view))
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            if not stat.S_ISREG(file_stat.st_mode):
+                continue
+            sizes[view] = file_stat.st_size
+            if view == "default":
+                updated_at = file_stat.st_mtime
+                token_count = self._cached_token_count(default_path, _file_signature(file_stat))
+        if not sizes:
+            raise FileNotFoundError(f"File not found: {path}")
+        return ContextStat(
+            views=list(sizes),
+            sizes=sizes,
+            metadata={"path": default_path},
+            token_count=token_count,
+            updated_at=updated_at,
+        )
+
     def list(self, path: str) -> List[str]:
-        # Naive list implementation: returns all keys that start with path 
-        # In a real FS, this would handle directories properly
+        return list(self.ilist(path))
+
+    def ilist(self, path: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> Iterator[str]:
+        if (self._root / path).is_file():
+            return itertools.islice([path] if cursor is None else [], limit)
+        directory = "" if path in ("", ".") else path.strip("/")
+        prefix = f"{directory}/" if directory else ""
+        after: Tuple[str, ...] = ()
+        if cursor is not None:
+            if not cursor.startswith(prefix):
+                raise ValueError(f"Cursor '{cursor}' is not below '{path}'")
+            after = path_segments(cursor[len(prefix):])
+        files = (rel_path for rel_path, _ in self._iter_files(directory, prefix, after))
+        return itertools.islice(files, limit)
+
+    def search(self, query: str) -> List[str]:
+        if self._index is not None:
+            refreshed_at = self._index_refreshed_at
+            if refreshed_at is None or time.monotonic() - refreshed_at >= self._index_refresh_interval:
+                self.refresh_index()
+            return self._index.search(query)
+        needle = query.encode("utf-8")
         results = []
-        # Normalizing path for simple prefix matching
-        prefix = path if path.endswith("/") or path == "" else f"{path}/"
-        if path == "" or path == ".": # root of this node
-             prefix = ""
-
-        seen_roots = set()
-
-        for key in self._data.keys():
-            if prefix == "" or key.startswith(prefix):
-                # Return relative path from the listing directory
-                # e.g. path="", key="foo.txt" -> "foo.txt"
-                # e.g. path="sub", key="sub/bar.txt" -> "bar.txt" (if we want just filenames)
-                # For this simple dict resolver, let's just return the full relative paths matching
-                results.append(key)
+        for rel_path, entry in self._iter_files():
+            try:
+                signature = _file_signature(entry.stat())
+                if signature[1] >= self._mmap_threshold:
+                    # Valid UTF-8 is self-synchronizing, so a byte match is a text match.
+                    if _mapped_contains(entry.path, needle):
+                        results.append(rel_path)
+                    continue
+                content = self._load(entry.path, signature)
+            except (FileNotFoundError, UnicodeDecodeError):
+                # Deleted since the directory was scanned, or not text.
+                continue
+            if query in content:
+                results.append(rel_path)
         return results
 
+    def refresh_index(self) -> int:
+        """Brings the search index up to date with the directory.
+
+        Only files whose (mtime_ns, size) differ from the indexed signature
+        are read. Returns the number of files added, updated or removed.
+
+        Raises:
+            ValueError: If the resolver was created without `index_path`.
+        """
+        if self._index is None:
+            raise ValueError("LocalFileResolver has no search index (pass index_path)")
+        with self._index_lock:
+            started_at = time.monotonic()
+            indexed = self._index.signatures()
+            changed = []
+            for rel_path, entry in self._iter_files():
+                try:
+                    if indexed.get(rel_path) != _file_signature(entry.stat()):
+                        changed.append((rel_path, *_read_text(entry.path)))
+                except FileNotFoundError:
+                    # Deleted since the directory was scanned.
+                    continue
+                indexed.pop(rel_path, None)
+            # Whatever was not seen during the walk has been deleted.
+            self._index.update(changed, removed=list(indexed))
+            self._index_refreshed_at = started_at
+        return len(changed) + len(indexed)
+
+    def write(self, path: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        file_path = self._resolve_path(path, view="default")
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(content, encoding="utf-8")
+        key = str(file_path)
+        with self._lock:
+            self._drop(key)
+            self._token_counts.pop(key, None)
+        if self._index is not None:
+            rel_path = file_path.relative_to(self._root).as_posix()
+            self._index.update([(rel_path, _file_signature(os.stat(file_path)), content)])
+
+    def _resolve_path(self, path: str, view: str) -> Path:
+        return self._root / _view_path(path, view)
+
+    def _iter_files(
+        self,
+        directory: str = "",
+        base: str = "",
+        after: Tuple[str, ...] = (),
+    ) -> Iterator[Tuple[str, os.DirEntry]]:
+        for rel_path, entry in scan_tree(str(self._root / directory), base, after):
+            if not entry.is_file():
+                continue
+            if self._excluded and os.path.abspath(entry.path) in self._excluded:
+                continue
+            yield rel_path, entry
+
+    def _signature(self, file_path: str) -> Optional[Tuple[int, int]]:
+        try:
+            file_stat = os.stat(file_path)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        if not stat.S_ISREG(file_stat.st_mode):
+            return None
+        return _file_signature(file_stat)
+
+    def _load(self, file_path: str, signature: Tuple[int, int]) -> str:
+        """Returns the decoded file, from the cache if `signature` still matches."""
+        with self._lock:
+            cached = self._cache.get(file_path)
+            if cached is not None and cached[0] == signature:
+                self._cache.move_to_end(file_path)
+                return cached[1]
+        signature, content = _read_text(file_path, strict=True)
+        if signature[1] < self._mmap_threshold and signature[1] <= self._cache_bytes:
+            with self._lock:
+                self._drop(file_path)
+                self._cache[file_path] = (signature, content)
+                self._cached_size += signature[1]
+                while self._cached_size > self._cache_bytes:
+                    _, (old_signature, _) = self._cache.popitem(last=False)
+                    self._cached_size -= old_signature[1]
+        return content
+
+    def _drop(self, file_path: str) -> None:
+        cached = self._cache.pop(file_path, None)
+        if cached is not None:
+            self._cached_size -= cached[0][1]
+
+    def _cached_token_count(self, file_path: str, signature: Tuple[int, int]) -> Optional[int]:
+        with self._lock:
+            cached = self._token_counts.get(file_path)
+            if cached is None or cached[0] != signature:
+                return None
+            self._token_counts.move_to_end(file_path)
+            return cached[1]
+
+    def _token_count(self, file_path: str, signature: Tuple[int, int], content: str) -> Optional[int]:
+        if self._token_counter is None:
+            return None
+        token_count = self._cached_token_count(file_path, signature)
+        if token_count is None:
+            token_count = self._token_counter(content)
+            with self._lock:
+                self._token_counts[file_path] = (signature, token_count)
+                self._token_counts.move_to_end(file_path)
+                while len(self._token_counts) > self._token_cache_size:
+                    self._token_counts.popitem(last=False)
+        return token_count
+
+
+def _read_text(file_path: str, strict: bool = False) -> Tuple[Tuple[int, int], Optional[str]]:
+    """Reads and decodes a file, returning the signature of what was read.
+
+    Undecodable files give None content unless `strict` is set.
+    """
+    with open(file_path, "rb") as handle:
+        signature = _file_signature(os.fstat(handle.fileno()))
+        data = handle.read()
+    try:
+        return signature, data.decode("utf-8")
+    except UnicodeDecodeError:
+        if strict:
+            raise
+        return signature, None
+
+
+def _mapped_contains(file_path: str, needle: bytes) -> bool:
+    with open(file_path, "rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return not needle
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return mapped.find(needle) != -1
+
+
+def _view_path(path: str, view: str) -> str:
+    """Applies the "<name>.<view><suffix>" view naming convention to a relative path."""
+    base = PurePosixPath(path)
+    if view == "default" or not base.name:
+        return path
+    return str(base.with_name(f"{base.stem}.{view}{base.suffix}"))
+
+
+class _ArchiveMember:
+    __slots__ = ("name", "size", "mtime", "info", "offset")
+
+    def __init__(
+        self,
+        name: str,
+        size: int,
+        mtime: float,
+        info: Optional[zipfile.ZipInfo] = None,
+        offset: Optional[int] = None,
+    ):
+        self.name = name
+        self.size = size
+        self.mtime = mtime
+        # Zip members are read through their ZipInfo; tar members are sliced
+        # from the mapped archive starting at `offset`.
+        self.info = info
+        self.offset = offset
+
+
+class ArchiveResolver(ContextSource):
+    """Read-only ContextSource serving the members of a .zip or uncompressed .tar.
+
+    The archive's directory (the zip central directory, or one pass over the
+    tar headers) is read once at open time into a path index, so `list`,
+    `ilist`, `glob` and `stat` never touch member data. Views follow the
+    LocalFileResolver convention: the 'summary' view of "notes/a.txt" is the
+    member "notes/a.summary.txt". Decoded members are kept in an LRU bounded
+    by `cache_bytes`. Tar archives are memory-mapped and members are sliced
+    from the mapping; search matches them without decoding.
+
+    Example:
+        fs.mount("/rubrics", ArchiveResolver("/srv/rubrics.zip"))
+    """
+
+    def __init__(self, archive_path: str, cache_bytes: int = 32 * 1024 * 1024):
+        """
+        Args:
+            archive_path: A .zip file, or a tar file without compression.
+            cache_bytes: Total size of the decoded members kept in memory.
+
+        Raises:
+            ValueError: If the file is neither a zip nor an uncompressed tar.
+        """
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._members: Dict[str, _ArchiveMember] = {}
+        if zipfile.is_zipfile(archive_path):
+            self._zip = zipfile.ZipFile(archive_path)
+            for info in self._zip.infolist():
+                if not info.is_dir():
+                    mtime = time.mktime(info.date_time + (0, 0, -1))
+                    self._add_member(_ArchiveMember(info.filename, info.file_size, mtime, info=info))
+        else:
+            try:
+                with tarfile.open(archive_path, mode="r:") as archive:
+                    for info in archive:
+                        if info.isfile() and not info.issparse():
+                            self._add_member(_ArchiveMember(info.name, info.size, info.mtime, offset=info.offset_data))
+            except tarfile.TarError:
+                raise ValueError(f"Not a zip or uncompressed tar archive: {archive_path}") from None
+            with open(archive_path, "rb") as handle:
+                self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        self._paths = PathIndex()
+        for path in self._members:
+            self._paths.add(path)
+        self._cache_bytes = cache_bytes
+        self._cache: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self._cached_size = 0
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        if self._zip is not None:
+            self._zip.close()
+        if self._mmap is not None:
+            self._mmap.close()
+
+    def __enter__(self) -> "ArchiveResolver":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def read(self, path: str, view: str = "default") -> ContextFile:
+        member = self._member(path, view)
+        return ContextFile(content=self._load(member), metadata={"member": member.name})
+
+    def read_stream(self, path: str, view: str = "default", chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+        member = self._member(path, view)
+        with self._lock:
+            cached = self._cache.get(member.name)
+        if cached is not None:
+            content = cached[0]
+            return (content[start:start + chunk_size] for start in range(0, len(content), chunk_size))
+        return self._iter_decoded(member, chunk_size)
+
+    def stat(self, path: str) -> ContextStat:
+        sizes = {}
+        updated_at = None
+        for view in ("default", "summary"):
+            member = self._members.get(_view_path(path, view))
+            if member is None:
+                continue
+            sizes[view] = member.size
+            if view == "default":
+                updated_at = member.mtime
+        if not sizes:
+            raise FileNotFoundError(f"File not found: {path}")
+        return ContextStat(
+            views=list(sizes),
+            sizes=sizes,
+            metadata={"member": _view_path(path, "default")},
+            updated_at=updated_at,
+        )
+
+    def list(self, path: str) -> List[str]:
+        return list(self.ilist(path))
+
+    def glob(self, pattern: str) -> List[str]:
+        """Lists members matching a glob pattern such as 'rubrics/*/grade_*.md'."""
+        return list(self._paths.glob(pattern))
+
+    def ilist(self, path: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> Iterator[str]:
+        if path in self._members:
+            return itertools.islice([path] if cursor is None else [], limit)
+        directory = "" if path in ("", ".") else path
+        return itertools.islice(self._paths.iter_files(directory, cursor), limit)
+
     def search(self, query: str) -> List[str]:
+        needle = query.encode("utf-8")
         results = []
-        for path, views in self._data.items():
-            # Search in default view content
-            if "default" in views and query in views["default"]:
+        for path in self._paths.iter_files():
+            member = self._members[path]
+            if member.offset is not None:
+                # Valid UTF-8 is self-synchronizing, so a byte match is a text match.
+                if self._mmap.find(needle, member.offset, member.offset + member.size) != -1:
+                    results.append(path)
+                continue
+            try:
+                content = self._load(member)
+            except UnicodeDecodeError:
+                continue
+            if query in content:
                 results.append(path)
         return results
 
     def write(self, path: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> None:
-        if path not in self._data:
-            self._data[path] = {}
-        
-        self._data[path]["default"] = content
-        if metadata:
-             self._metadata[path] = metadata
+        raise PermissionError("Archives are read-only")
+
+    def _add_member(self, member: _ArchiveMember) -> None:
+        path = member.name
+        while path.startswith("./"):
+            path = path[2:]
+        path = path.lstrip("/")
+        if path:
+            # Later entries replace earlier ones, as when extracting.
+            self._members[path] = member
+
+    def _member(self, path: str, view: str) -> _ArchiveMember:
+        member = self._members.get(_view_path(path, view))
+        if member is None:
+            if view != "default" and path in self._members:
+                raise ValueError(f"View '{view}' not found for file {path}")
+            raise FileNotFoundError(f"File not found: {path} (view={view})")
+        return member
+
+    def _raw(self, member: _ArchiveMember) -> bytes:
+        if member.offset is not None:
+            return self._mmap[member.offset:member.offset + member.size]
+        return self._zip.read(member.info)
+
+    def _load(self, member: _ArchiveMember) -> str:
+        with self._lock:
+            cached = self._cache.get(member.name)
+            if cached is not None:
+                self._cache.move_to_end(member.name)
+                return cached[0]
+        content = self._raw(member).decode("utf-8")
+        if member.size <= self._cache_bytes:
+            with self._lock:
+                if member.name not in self._cache:
+                    self._cache[member.name] = (content, member.size)
+                    self._cached_size += member.size
+                    while self._cached_size > self._cache_bytes:
+                        _, (_, size) = self._cache.popitem(last=False)
+                        self._cached_size -= size
+        return content
+
+    def _iter_decoded(self, member: _ArchiveMember, chunk_size: int) -> Iterator[str]:
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        if member.offset is not None:
+            end = member.offset + member.size
+            chunks = (self._mmap[start:min(start + chunk_size, end)] for start in range(member.offset, end, chunk_size))
+            for data in chunks:
+                text = decoder.decode(data)
+                if text:
+                    yield text
+        else:
+            with self._zip.open(member.info) as handle:
+                for data in iter(lambda: handle.read(chunk_size), b""):
+                    text = decoder.decode(data)
+                    if text:
+                        yield text
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+_SQLITE_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS context_files (
+        path TEXT PRIMARY KEY,
+        sort_key TEXT NOT NULL UNIQUE,
+        metadata TEXT NOT NULL DEFAULT '{}',
+        updated_at REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS context_views (
+        path TEXT NOT NULL REFERENCES context_files(path) ON DELETE CASCADE,
+        view TEXT NOT NULL,
+        content TEXT NOT NULL,
+        UNIQUE (path, view)
+    )
+    """,
+)
+
+_SQLITE_FTS_SCHEMA = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS context_fts
+    USING fts5(content, content='context_views', content_rowid='rowid')
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS context_views_ai AFTER INSERT ON context_views BEGIN
+        INSERT INTO context_fts(rowid, content) VALUES (new.rowid, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS context_views_ad AFTER DELETE ON context_views BEGIN
+        INSERT INTO context_fts(context_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS context_views_au AFTER UPDATE ON context_views BEGIN
+        INSERT INTO context_fts(context_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+        INSERT INTO context_fts(rowid, content) VALUES (new.rowid, new.content);
+    END
+    """,
+)
+
+# Bound-parameter list sizes for `IN (...)` batches. Lists are padded with
+# NULL up to the next size so every batch reuses one of a few cached
+# statements.
+_IN_SIZES = (1, 8, 64, 256)
+
+_FTS_TOKEN_RE = re.compile(r"\w+")
+
+
+def _in_batches(values: Sequence[Any]) -> Iterator[List[Any]]:
+    """Splits values into NULL-padded batches whose lengths come from _IN_SIZES."""
+    largest = _IN_SIZES[-1]
+    for start in range(0, len(values), largest):
+        batch = list(values[start:start + largest])
+        size = next(size for size in _IN_SIZES if size >= len(batch))
+        yield batch + [None] * (size - len(batch))
+
+
+def _placeholders(count: int) -> str:
+    return ", ".join("?" * count)
+
+
+class _ThreadConnection:
+    """One thread's SQLite connection, closed once that thread's locals are dropped."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.close = weakref.finalize(self, conn.close)
+
+
+def _sort_key(path: str) -> str:
+    # "\x01" sorts below every other character, so ordering by this key in
+    # SQLite's binary collation matches `path_segments` order.
+    return path.replace("/", "\x01")
+
+
+class SQLiteResolver(ContextSource):
+    """ContextSource stored in a SQLite database (standard-library sqlite3 only).
+
+    Views live in one table keyed by (path, view); per-file metadata is kept
+    as JSON next to the path. Each thread gets its own connection, opened in
+    WAL mode so readers never block the writer, and statements use fixed SQL
+    text so sqlite3's statement cache can reuse them. `search` is answered by
+    an FTS5 index kept in sync by triggers: the query is split into words, all
+    of which must occur, and paths are ranked by BM25. If the SQLite build
+    lacks FTS5, search falls back to an exact substring scan.
+
+    Example:
+        resolver = SQLiteResolver("context.db")
+        resolver.populate("notes/1.txt", {"default": "...", "summary": "..."}, {"priority": 1})
+        fs.mount("/db", resolver)
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        search_views: Sequence[str] = ("default",),
+        timeout: float = 30.0,
+        cached_statements: int = 256,
+    ):
+        """
+        Args:
+            db_path: Database file, or ":memory:" for a private temporary store
+                shared by all threads of this resolver and deleted on `close`.
+            search_views: Views matched by `search`.
+            timeout: Seconds a connection waits for a lock before failing.
+            cached_statements: Size of each connection's prepared-statement cache.
+        """
+        self._temporary: Optional[tempfile.TemporaryDirectory] = None
+        if db_path == ":memory:":
+            # A shared-cache in-memory database would make readers fail on
+            # tables being written (or read uncommitted rows); a private WAL
+            # file gives them the last committed snapshot instead.
+            self._temporary = tempfile.TemporaryDirectory(prefix="py_context_fs_")
+            db_path = os.path.join(self._temporary.name, "context.db")
+        self._uri = Path(db_path).resolve().as_uri()
+        self._search_views = tuple(search_views)
+        self._timeout = timeout
+        self._cached_statements = cached_statements
+        self._local = threading.local()
+        # Only the owning thread's locals keep a connection alive, so it is
+        # closed when that thread ends; this set lets close() reach the rest.
+        self._connections: "weakref.WeakSet[_ThreadConnection]" = weakref.WeakSet()
+        self._lock = threading.Lock()
+        # SQLite admits one writer at a time; queueing this process's writers
+        # here avoids spinning on SQLITE_BUSY.
+        self._write_lock = threading.Lock()
+        conn = self._connection()
+        with self._write_lock, conn:
+            for statement in _SQLITE_SCHEMA:
+                conn.execute(statement)
+            try:
+                for statement in _SQLITE_FTS_SCHEMA:
+                    conn.execute(statement)
+                self._fts = True
+            except sqlite3.OperationalError:
+                self._fts = False
+
+    def close(self) -> None:
+        """Closes every pooled connection."""
+        with self._lock:
+            for pooled in list(self._connections):
+                pooled.close()
+            self._connections.clear()
+        self._local = threading.local()
+        if self._temporary is not None:
+            self._temporary.cleanup()
+
+    def read(self, path: str, view: str = "default") -> ContextFile:
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT v.content, f.metadata FROM context_files f "
+            "LEFT JOIN context_views v ON v.path = f.path AND v.view = ? WHERE f.path = ?",
+            (view, path),
+        ).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"File not found: {path}")
+        if row[0] is None:
+            raise ValueError(f"View '{view}' not found for file {path}")
+        return ContextFile(content=row[0], metadata=json.loads(row[1]))
+
+    def read_many(
+        self,
+        paths: Sequence[str],
+        views: Sequence[str] = ("default",),
+    ) -> Dict[Tuple[str, str], ContextFile]:
+        conn = self._connection()
+        wanted_views = list(dict.fromkeys(views))
+        metadata: Dict[str, Dict[str, Any]] = {}
+        results = {}
+        for path_batch in _in_batches(list(dict.fromkeys(paths))):
+            for view_batch in _in_batches(wanted_views):
+                rows = conn.execute(
+                    "SELECT v.path, v.view, v.content, f.metadata FROM context_views v "
+                    "JOIN context_files f ON f.path = v.path "
+                    f"WHERE v.path IN ({_placeholders(len(path_batch))}) "
+                    f"AND v.view IN ({_placeholders(len(view_batch))})",
+                    path_batch + view_batch,
+                )
+                for path, view, content, raw_metadata in rows:
+                    if path not in metadata:
+                        metadata[path] = json.loads(raw_metadata)
+                    results[(path, view)] = ContextFile(content=content, metadata=metadata[path])
+        return results
+
+    def stat(self, path: str) -> ContextStat:
+        found = self.stat_many([path])
+        if path not in found:
+            raise FileNotFoundError(f"File not found: {path}")
+        return found[path]
+
+    def stat_many(self, paths: Sequence[str]) -> Dict[str, ContextStat]:
+        conn = self._connection()
+        results = {}
+        for batch in _in_batches(list(dict.fromkeys(paths))):
+            files = conn.execute(
+                "SELECT path, metadata, updated_at FROM context_files "
+                f"WHERE path IN ({_placeholders(len(batch))})",
+                batch,
+            ).fetchall()
+            if not files:
+                continue
+            sizes: Dict[str, Dict[str, int]] = {}
+            for path, view, size in conn.execute(
+                "SELECT path, view, length(CAST(content AS BLOB)) FROM context_views "
+                f"WHERE path IN ({_placeholders(len(batch))}) ORDER BY rowid",
+                batch,
+            ):
+                sizes.setdefault(path, {})[view] = size
+            for path, raw_metadata, updated_at in files:
+                metadata = json.loads(raw_metadata)
+                token_count = metadata.get("token_count")
+                view_sizes = sizes.get(path, {})
+                results[path] = ContextStat(
+                    views=list(view_sizes),
+                    sizes=view_sizes,
+                    metadata=metadata,
+                    token_count=token_count if isinstance(token_count, int) else None,
+                    updated_at=updated_at,
+                )
+        return results
+
+    def list(self, path: str) -> List[str]:
+        return list(self.ilist(path))
+
+    def ilist(self, path: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> Iterator[str]:
+        # Every file below `path`, as DictResolver.list; pages are fetched
+        # with keyset pagination on the segment-ordered sort key.
+        directory = "" if path in ("", ".") else path.strip("/")
+        prefix = f"{directory}/" if directory else ""
+        if cursor is not None and not cursor.startswith(prefix):
+            raise ValueError(f"Cursor '{cursor}' is not below '{path}'")
+        lower = _sort_key(cursor if cursor is not None else prefix)
+        upper = f"{_sort_key(directory)}\x02" if directory else None
+        return self._iter_sort_keys(lower, upper, limit)
+
+    def search(self, query: str) -> List[str]:
+        conn = self._connection()
+        results: Dict[str, None] = {}
+        for view_batch in _in_batches(list(self._search_views)):
+            if self._fts:
+                terms = _FTS_TOKEN_RE.findall(query)
+                if not terms:
+                    return []
+                rows = conn.execute(
+                    "SELECT v.path FROM context_fts JOIN context_views v ON v.rowid = context_fts.rowid "
+                    f"WHERE context_fts MATCH ? AND v.view IN ({_placeholders(len(view_batch))}) "
+                    "ORDER BY context_fts.rank, v.path",
+                    [" ".join(f'"{term}"' for term in terms)] + view_batch,
+                )
+            else:
+                rows = conn.execute(
+                    "SELECT path FROM context_views "
+                    f"WHERE instr(content, ?) > 0 AND view IN ({_placeholders(len(view_batch))}) ORDER BY rowid",
+                    [query] + view_batch,
+                )
+            for (path,) in rows:
+                results.setdefault(path, None)
+        return list(results)
+
+    def write(self, path: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        self.write_view(path, "default", content, metadata=metadata)
+
+    def write_view(
+        self,
+        path: str,
+        view: str,
+        content: str,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Writes one view, replacing the file's metadata when `metadata` is given."""
+        conn = self._connection()
+        with self._write_lock, conn:
+            self._upsert_file(conn, path, metadata)
+            self._upsert_view(conn, path, view, content)
+
+    def populate(self, path: str, views: Dict[str, str], metadata: Optional[Dict[str, Any]] = None) -> None:
+        """Replaces all views of a file (and its metadata, when given) in one transaction."""
+        conn = self._connection()
+        with self._write_lock, conn:
+            self._upsert_file(conn, path, metadata)
+            conn.execute("DELETE FROM context_views WHERE path = ?", (path,))
+            for view, content in views.items():
+                self._upsert_view(conn, path, view, content)
+
+    def _connection(self) -> sqlite3.Connection:
+        pooled = getattr(self._local, "pooled", None)
+        if pooled is None:
+            conn = sqlite3.connect(
+                self._uri,
+                uri=True,
+                timeout=self._timeout,
+                cached_statements=self._cached_statements,
+                # Each connection is used by one thread; this only lets
+                # close() and thread-exit finalizers release it elsewhere.
+                check_same_thread=False,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            pooled = self._local.pooled = _ThreadConnection(conn)
+            with self._lock:
+                self._connections.add(pooled)
+        return pooled.conn
+
+    def _upsert_file(self, conn: sqlite3.Connection, path: str, metadata: Optional[Dict[str, Any]]) -> None:
+        now = time.time()
+        if metadata is None:
+            conn.execute(
+                "INSERT INTO context_files (path, sort_key, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET updated_at = excluded.updated_at",
+                (path, _sort_key(path), now),
+            )
+        else:
+            conn.execute(
+                "INSERT INTO context_files (path, sort_key, metadata, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET metadata = excluded.metadata, updated_at = excluded.updated_at",
+                (path, _sort_key(path), json.dumps(metadata), now),
+            )
+
+    def _upsert_view(self, conn: sqlite3.Connection, path: str, view: str, content: str) -> None:
+        conn.execute(
+            "INSERT INTO context_views (path, view, content) VALUES (?, ?, ?) "
+            "ON CONFLICT(path, view) DO UPDATE SET content = excluded.content",
+            (path, view, content),
+        )
+
+    def _iter_sort_keys(self, lower: str, upper: Optional[str], limit: Optional[int]) -> Iterator[str]:
+        remaining = limit
+        while remaining is None or remaining > 0:
+            page_size = _LIST_PAGE_SIZE if remaining is None else min(remaining, _LIST_PAGE_SIZE)
+            if upper is None:
+                rows = self._connection().execute(
+                    "SELECT path, sort_key FROM context_files WHERE sort_key > ? ORDER BY sort_key LIMIT ?",
+                    (lower, page_size),
+                ).fetchall()
+            else:
+                rows = self._connection().execute(
+                    "SELECT path, sort_key FROM context_files WHERE sort_key > ? AND sort_key < ? "
+                    "ORDER BY sort_key LIMIT ?",
+                    (lower, upper, page_size),
+                ).fetchall()
+            for path, _ in rows:
+                yield path
+            if len(rows) < page_size:
+                return
+            lower = rows[-1][1]
+            if remaining is not None:
+                remaining -= len(rows)
 
 class ReadOnlyWrapper(ContextSource):
     """Wrapper that prevents write operations."""
@@ -85,11 +1363,560 @@ class ReadOnlyWrapper(ContextSource):
     def read(self, path: str, view: str = "default") -> ContextFile:
         return self._wrapped.read(path, view)
 
+    def read_many(
+        self,
+        paths: Sequence[str],
+        views: Sequence[str] = ("default",),
+    ) -> Dict[Tuple[str, str], ContextFile]:
+        return self._wrapped.read_many(paths, views)
+
+    def read_stream(self, path: str, view: str = "default", chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+        return self._wrapped.read_stream(path, view, chunk_size)
+
+    def stat(self, path: str) -> ContextStat:
+        return self._wrapped.stat(path)
+
+    def stat_many(self, paths: Sequence[str]) -> Dict[str, ContextStat]:
+        return self._wrapped.stat_many(paths)
+
     def list(self, path: str) -> List[str]:
         return self._wrapped.list(path)
 
+    def ilist(self, path: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> Iterator[str]:
+        return self._wrapped.ilist(path, limit=limit, cursor=cursor)
+
+    def ilist_range(
+        self,
+        path: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        limit: Optional[int] = None,
+        reverse: bool = True,
+    ) -> Iterator[str]:
+        return self._wrapped.ilist_range(path, start, end, limit, reverse)
+
     def search(self, query: str) -> List[str]:
         return self._wrapped.search(query)
 
+    def search_ranked(self, query: str, k: Optional[int] = None) -> List[Tuple[str, Optional[float]]]:
+        return self._wrapped.search_ranked(query, k)
+
     def write(self, path: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> None:
         raise PermissionError(f"Write operation not allowed on ReadOnlyWrapper for path: {path}")
+
+# Flight result for a key that a batched read reported as missing; waiters
+# re-read it themselves to get the source's own exception.
+_ABSENT = object()
+
+@dataclass
+class CoalescingStats:
+    """Counters reported by CoalescingSource.stats() and AsyncCoalescingSource.stats()."""
+    backend_calls: int = 0
+    coalesced: int = 0
+    in_flight: int = 0
+
+class CoalescingSource(ContextSource):
+    """Wrapper that collapses concurrent identical reads and searches.
+
+    While a `read(path, view)` or `search(query)` is in flight, other threads
+    making the same call wait for it and share its result (or exception)
+    instead of calling the wrapped source again. `read_many` joins in-flight
+    reads key by key and fetches the rest in one batched call. Nothing is kept
+    once a call completes; combine with CachingSource for that. A write
+    through this wrapper detaches in-flight reads of the written path and
+    in-flight searches, so later callers never join a call that may predate it.
+
+    Shared ContextFile objects are the same instance for every waiter; search
+    results are copied per caller.
+    """
+
+    def __init__(self, wrapped: ContextSource):
+        self._wrapped = wrapped
+        self._lock = threading.Lock()
+        self._flights: Dict[Tuple[str, ...], futures.Future] = {}
+        self._stats = CoalescingStats()
+
+    def read(self, path: str, view: str = "default") -> ContextFile:
+        file_obj = self._coalesce(("read", path, view), lambda: self._wrapped.read(path, view))
+        if file_obj is _ABSENT:
+            return self._wrapped.read(path, view)
+        return file_obj
+
+    def read_many(
+        self,
+        paths: Sequence[str],
+        views: Sequence[str] = ("default",),
+    ) -> Dict[Tuple[str, str], ContextFile]:
+        led: Dict[Tuple[str, str], futures.Future] = {}
+        joined: Dict[Tuple[str, str], futures.Future] = {}
+        with self._lock:
+            for path in dict.fromkeys(paths):
+                for view in dict.fromkeys(views):
+                    flight = self._flights.get(("read", path, view))
+                    if flight is None:
+                        led[(path, view)] = self._flights[("read", path, view)] = futures.Future()
+                    else:
+                        joined[(path, view)] = flight
+                        self._stats.coalesced += 1
+            if led:
+                self._stats.backend_calls += 1
+        results = {}
+        if led:
+            try:
+                fetched = self._wrapped.read_many(list(dict.fromkeys(path for path, _ in led)), views)
+            except BaseException as error:
+                for (path, view), flight in led.items():
+                    self._land(("read", path, view), flight, error=error)
+                raise
+            for (path, view), flight in led.items():
+                self._land(("read", path, view), flight, result=fetched.get((path, view), _ABSENT))
+                if (path, view) in fetched:
+                    results[(path, view)] = fetched[(path, view)]
+        for key, flight in joined.items():
+            try:
+                file_obj = flight.result()
+            except (FileNotFoundError, ValueError):
+                continue
+            if file_obj is not _ABSENT:
+                results[key] = file_obj
+        return results
+
+    def read_stream(self, path: str, view: str = "default", chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+        return self._wrapped.read_stream(path, view, chunk_size)
+
+    def stat(self, path: str) -> ContextStat:
+        return self._wrapped.stat(path)
+
+    def stat_many(self, paths: Sequence[str]) -> Dict[str, ContextStat]:
+        return self._wrapped.stat_many(paths)
+
+    def list(self, path: str) -> List[str]:
+        return self._wrapped.list(path)
+
+    def ilist(self, path: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> Iterator[str]:
+        return self._wrapped.ilist(path, limit=limit, cursor=cursor)
+
+    def ilist_range(
+        self,
+        path: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        limit: Optional[int] = None,
+        reverse: bool = True,
+    ) -> Iterator[str]:
+        return self._wrapped.ilist_range(path, start, end, limit, reverse)
+
+    def search(self, query: str) -> List[str]:
+        return list(self._coalesce(("search", query), lambda: self._wrapped.search(query)))
+
+    def search_ranked(self, query: str, k: Optional[int] = None) -> List[Tuple[str, Optional[float]]]:
+        return list(self._coalesce(("search", query, k), lambda: self._wrapped.search_ranked(query, k)))
+
+    def write(self, path: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        try:
+            self._wrapped.write(path, content, metadata)
+        finally:
+            with self._lock:
+                for key in [key for key in self._flights if _affected_by_write(key, path)]:
+                    del self._flights[key]
+
+    def stats(self) -> CoalescingStats:
+        """Returns a snapshot of the coalescing counters."""
+        with self._lock:
+            return CoalescingStats(
+                backend_calls=self._stats.backend_calls,
+                coalesced=self._stats.coalesced,
+                in_flight=len(self._flights),
+            )
+
+    def _coalesce(self, key: Tuple[str, ...], call: Callable[[], Any]) -> Any:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = futures.Future()
+                self._stats.backend_calls += 1
+            else:
+                self._stats.coalesced += 1
+        if leader:
+            try:
+                result = call()
+            except BaseException as error:
+                self._land(key, flight, error=error)
+                raise
+            self._land(key, flight, result=result)
+            return result
+        return flight.result()
+
+    def _land(
+        self,
+        key: Tuple[str, ...],
+        flight: futures.Future,
+        result: Any = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        if error is not None:
+            flight.set_exception(error)
+        else:
+            flight.set_result(result)
+
+class AsyncCoalescingSource(AsyncContextSource):
+    """Asyncio counterpart of CoalescingSource for an AsyncContextSource.
+
+    Concurrent identical `aread` / `asearch` calls on one event loop share a
+    single task. The task is shielded from its callers, so cancelling one
+    waiter (e.g. on a timeout) does not cancel the call for the others.
+    Synchronous sources mounted on an AsyncContextRouter run on executor
+    threads; wrap those in CoalescingSource instead.
+    """
+
+    def __init__(self, wrapped: AsyncContextSource):
+        self._wrapped = wrapped
+        self._flights: Dict[Tuple[str, ...], asyncio.Future] = {}
+        self._stats = CoalescingStats()
+
+    async def aread(self, path: str, view: str = "default") -> ContextFile:
+        file_obj = await self._coalesce(("read", path, view), lambda: self._wrapped.aread(path, view))
+        if file_obj is _ABSENT:
+            return await self._wrapped.aread(path, view)
+        return file_obj
+
+    async def aread_many(
+        self,
+        paths: Sequence[str],
+        views: Sequence[str] = ("default",),
+    ) -> Dict[Tuple[str, str], ContextFile]:
+        loop = asyncio.get_running_loop()
+        led: Dict[Tuple[str, str], asyncio.Future] = {}
+        waiting: Dict[Tuple[str, str], asyncio.Future] = {}
+        for path in dict.fromkeys(paths):
+            for view in dict.fromkeys(views):
+                flight = self._flights.get(("read", path, view))
+                if flight is None:
+                    flight = led[(path, view)] = self._flights[("read", path, view)] = loop.create_future()
+                else:
+                    self._stats.coalesced += 1
+                waiting[(path, view)] = flight
+        if led:
+            self._stats.backend_calls += 1
+            task = asyncio.ensure_future(
+                self._wrapped.aread_many(list(dict.fromkeys(path for path, _ in led)), views)
+            )
+            task.add_done_callback(functools.partial(self._land_many, led))
+        results = {}
+        for key, flight in waiting.items():
+            try:
+                file_obj = await asyncio.shield(flight)
+            except (FileNotFoundError, ValueError):
+                continue
+            if file_obj is not _ABSENT:
+                results[key] = file_obj
+        return results
+
+    async def alist(self, path: str) -> List[str]:
+        return await self._wrapped.alist(path)
+
+    async def ailist(
+        self, path: str, limit: Optional[int] = None, cursor: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        async for listed in self._wrapped.ailist(path, limit=limit, cursor=cursor):
+            yield listed
+
+    async def ailist_range(
+        self,
+        path: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        limit: Optional[int] = None,
+        reverse: bool = True,
+    ) -> AsyncIterator[str]:
+        async for listed in self._wrapped.ailist_range(path, start, end, limit, reverse):
+            yield listed
+
+    async def asearch(self, query: str) -> List[str]:
+        return list(await self._coalesce(("search", query), lambda: self._wrapped.asearch(query)))
+
+    async def asearch_ranked(self, query: str, k: Optional[int] = None) -> List[Tuple[str, Optional[float]]]:
+        return list(await self._coalesce(("search", query, k), lambda: self._wrapped.asearch_ranked(query, k)))
+
+    async def awrite(self, path: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        try:
+            await self._wrapped.awrite(path, content, metadata)
+        finally:
+            for key in [key for key in self._flights if _affected_by_write(key, path)]:
+                del self._flights[key]
+
+    async def astat(self, path: str) -> ContextStat:
+        return await self._wrapped.astat(path)
+
+    async def astat_many(self, paths: Sequence[str]) -> Dict[str, ContextStat]:
+        return await self._wrapped.astat_many(paths)
+
+    def stats(self) -> CoalescingStats:
+        """Returns a snapshot of the coalescing counters."""
+        return CoalescingStats(
+            backend_calls=self._stats.backend_calls,
+            coalesced=self._stats.coalesced,
+            in_flight=len(self._flights),
+        )
+
+    async def _coalesce(self, key: Tuple[str, ...], call: Callable[[], Awaitable[Any]]) -> Any:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._flights[key] = asyncio.ensure_future(call())
+            self._stats.backend_calls += 1
+            flight.add_done_callback(functools.partial(self._discard, key))
+        else:
+            self._stats.coalesced += 1
+        return await asyncio.shield(flight)
+
+    def _discard(self, key: Tuple[str, ...], flight: asyncio.Future) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.cancelled():
+            # Mark the exception retrieved even if every waiter was cancelled.
+            flight.exception()
+
+    def _land_many(self, flights: Dict[Tuple[str, str], asyncio.Future], task: asyncio.Future) -> None:
+        for (path, view), flight in flights.items():
+            if self._flights.get(("read", path, view)) is flight:
+                del self._flights[("read", path, view)]
+            if task.cancelled():
+                flight.cancel()
+            elif task.exception() is not None:
+                flight.set_exception(task.exception())
+            else:
+                flight.set_result(task.result().get((path, view), _ABSENT))
+
+def _affected_by_write(key: Tuple[str, ...], path: str) -> bool:
+    return key[0] == "search" or key[1] == path
+
+@dataclass
+class CacheStats:
+    """Counters reported by CachingSource.stats() and PersistentContextRepository.cache_stats()."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    entries: int = 0
+    size_bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+class CachingSource(ContextSource):
+    """Read-through cache in front of another ContextSource.
+
+    Reads are cached per (path, view) in an LRU bounded by the total UTF-8
+    size of cached content, with an optional time-to-live; expired entries
+    are purged whenever a new one is cached. Lazy files whose content has not
+    been loaded are passed through uncached, since the cache would hold
+    nothing but a handle back to the source.
+    Every read returns its own copy of the cached file, so callers may modify
+    it freely. Writes through this wrapper (and therefore through
+    ContextRouter.write) invalidate every cached view of the written path.
+    Mount one wrapper per source, so entries are effectively keyed by
+    (mount, path, view).
+    """
+
+    def __init__(
+        self,
+        wrapped: ContextSource,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._wrapped = wrapped
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        # (path, view) -> (file, size, expires_at)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[ContextFile, int, Optional[float]]]" = OrderedDict()
+        self._views_by_path: Dict[str, Set[str]] = {}
+        # (expires_at, key) in the order entries were cached, which with one
+        # ttl is also the order they expire in; may hold superseded pairs.
+        self._expiry: "deque[Tuple[float, Tuple[str, str]]]" = deque()
+        self._size = 0
+        # Bumped by every invalidation; fills that raced with one are dropped.
+        self._epoch = 0
+        self._stats = CacheStats()
+
+    def read(self, path: str, view: str = "default") -> ContextFile:
+        with self._lock:
+            cached = self._get(path, view)
+            epoch = self._epoch
+        if cached is not None:
+            return cached
+        file_obj = self._wrapped.read(path, view)
+        with self._lock:
+            if epoch == self._epoch:
+                self._put(path, view, file_obj)
+        return file_obj
+
+    def read_many(
+        self,
+        paths: Sequence[str],
+        views: Sequence[str] = ("default",),
+    ) -> Dict[Tuple[str, str], ContextFile]:
+        results = {}
+        missing_paths = []
+        with self._lock:
+            for path in paths:
+                complete = True
+                for view in views:
+                    cached = self._get(path, view)
+                    if cached is None:
+                        complete = False
+                    else:
+                        results[(path, view)] = cached
+                if not complete:
+                    missing_paths.append(path)
+            epoch = self._epoch
+        if not missing_paths:
+            return results
+        fetched = self._wrapped.read_many(missing_paths, views)
+        with self._lock:
+            if epoch == self._epoch:
+                for (path, view), file_obj in fetched.items():
+                    self._put(path, view, file_obj)
+        results.update(fetched)
+        return results
+
+    def read_stream(self, path: str, view: str = "default", chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+        return self._wrapped.read_stream(path, view, chunk_size)
+
+    def stat(self, path: str) -> ContextStat:
+        return self._wrapped.stat(path)
+
+    def stat_many(self, paths: Sequence[str]) -> Dict[str, ContextStat]:
+        return self._wrapped.stat_many(paths)
+
+    def list(self, path: str) -> List[str]:
+        return self._wrapped.list(path)
+
+    def ilist(self, path: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> Iterator[str]:
+        return self._wrapped.ilist(path, limit=limit, cursor=cursor)
+
+    def ilist_range(
+        self,
+        path: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        limit: Optional[int] = None,
+        reverse: bool = True,
+    ) -> Iterator[str]:
+        return self._wrapped.ilist_range(path, start, end, limit, reverse)
+
+    def search(self, query: str) -> List[str]:
+        return self._wrapped.search(query)
+
+    def search_ranked(self, query: str, k: Optional[int] = None) -> List[Tuple[str, Optional[float]]]:
+        return self._wrapped.search_ranked(query, k)
+
+    def write(self, path: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        try:
+            self._wrapped.write(path, content, metadata)
+        finally:
+            self.invalidate(path)
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """Drops cached views of `path`, or the whole cache when path is None."""
+        with self._lock:
+            self._epoch += 1
+            if path is None:
+                keys = list(self._entries)
+            else:
+                keys = [(path, view) for view in self._views_by_path.get(path, ())]
+            for key in keys:
+                self._remove(key)
+                self._stats.invalidations += 1
+
+    def stats(self) -> CacheStats:
+        """Returns a snapshot of the cache counters."""
+        with self._lock:
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                expirations=self._stats.expirations,
+                invalidations=self._stats.invalidations,
+                entries=len(self._entries),
+                size_bytes=self._size,
+            )
+
+    def _get(self, path: str, view: str) -> Optional[ContextFile]:
+        key = (path, view)
+        entry = self._entries.get(key)
+        if entry is None:
+            self._stats.misses += 1
+            return None
+        file_obj, _, expires_at = entry
+        if expires_at is not None and expires_at <= self._clock():
+            self._remove(key)
+            self._stats.expirations += 1
+            self._stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._stats.hits += 1
+        return _copy_file(file_obj)
+
+    def _put(self, path: str, view: str, file_obj: ContextFile) -> None:
+        size = _cached_size(file_obj)
+        if size is None or size > self._max_bytes:
+            return
+        key = (path, view)
+        if key in self._entries:
+            self._remove(key)
+        now = self._clock()
+        self._purge_expired(now)
+        expires_at = now + self._ttl if self._ttl is not None else None
+        self._entries[key] = (_copy_file(file_obj), size, expires_at)
+        if expires_at is not None:
+            self._expiry.append((expires_at, key))
+        self._views_by_path.setdefault(path, set()).add(view)
+        self._size += size
+        while self._size > self._max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._stats.evictions += 1
+
+    def _purge_expired(self, now: float) -> None:
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, key = self._expiry.popleft()
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] == expires_at:
+                self._remove(key)
+                self._stats.expirations += 1
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._size -= entry[1]
+        path, view = key
+        views = self._views_by_path.get(path)
+        if views is not None:
+            views.discard(view)
+            if not views:
+                del self._views_by_path[path]
+
+
+def _cached_size(file_obj: Union[ContextFile, LazyContextFile]) -> Optional[int]:
+    """UTF-8 size charged to the cache for a file, or None for a lazy file not loaded yet."""
+    if isinstance(file_obj, LazyContextFile) and not file_obj.is_loaded:
+        return None
+    return len(file_obj.content.encode("utf-8"))
+
+
+def _copy_file(file_obj: Union[ContextFile, LazyContextFile]) -> Union[ContextFile, LazyContextFile]:
+    duplicate = copy.copy(file_obj)
+    if file_obj.metadata is not None:
+        duplicate.metadata = dict(file_obj.metadata)
+    return duplicate
@@ -0,0 +1,358 @@
+import json
+import os
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .index import PathIndex
+
+# Segment files are sequences of records:
+#
+#   header      crc32 of key + value, key length, value length
+#   key         UTF-8 key
+#   value       opaque bytes
+#
+# Records are only ever appended, so the newest record of a key supersedes
+# the older ones. Replaying segments in id order therefore rebuilds the
+# index, and a torn tail (a crash mid-append) fails its checksum and is cut
+# off. The index is also saved to INDEX_FILE so that opening a store only has
+# to replay what was appended after the last save.
+_RECORD = struct.Struct("<III")
+_SEGMENT_SUFFIX = ".seg"
+_INDEX_FILE = "index.json"
+_INDEX_VERSION = 2
+
+
+def _segment_name(segment_id: int) -> str:
+    return f"{segment_id:08d}{_SEGMENT_SUFFIX}"
+
+
+class SegmentStore:
+    """Append-only key/value log split into segment files.
+
+    Every `put` appends a record to the active segment; a small in-memory
+    index maps each key to the (segment, offset, length) of its newest value,
+    so reads are one positioned read. Keys are '/'-separated paths and are
+    also kept in a PathIndex, so listings come back in `path_segments` order.
+
+    Superseded records are garbage. `compact()` rewrites the live records of
+    sealed segments whose garbage ratio reaches `min_garbage_ratio` into the
+    active segment and deletes them; with `compaction_interval` a daemon
+    thread does this periodically.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_bytes: int = 64 * 1024 * 1024,
+        compaction_interval: Optional[float] = None,
+        min_garbage_ratio: float = 0.5,
+    ):
+        """
+        Args:
+            directory: Directory holding the segment files (created if missing).
+            segment_bytes: Size after which the active segment is sealed and a
+                new one started.
+            compaction_interval: Seconds between background compactions, or
+                None to compact only when `compact()` is called.
+            min_garbage_ratio: Fraction of superseded bytes from which a sealed
+                segment is compacted.
+        """
+        self._dir = Path(directory)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._segment_bytes = segment_bytes
+        self._min_garbage_ratio = min_garbage_ratio
+        self._lock = threading.RLock()
+        # Serializes compactions (background and explicit).
+        self._compaction_lock = threading.Lock()
+        # key -> (segment id, value offset, value length, record checksum)
+        self._entries: Dict[str, Tuple[int, int, int, int]] = {}
+        self._keys = PathIndex()
+        self._sizes: Dict[int, int] = {}
+        self._live: Dict[int, int] = {}
+        self._readers: Dict[int, int] = {}
+        self._load()
+        self._active_id = max(self._sizes, default=0) or 1
+        self._sizes.setdefault(self._active_id, 0)
+        self._live.setdefault(self._active_id, 0)
+        self._active = open(self._dir / _segment_name(self._active_id), "ab")
+        self._stop = threading.Event()
+        self._compactor: Optional[threading.Thread] = None
+        if compaction_interval is not None:
+            self._compactor = threading.Thread(
+                target=self._compact_periodically, args=(compaction_interval,), daemon=True
+            )
+            self._compactor.start()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str) -> bytes:
+        """Returns the newest value of `key`.
+
+        Raises:
+            KeyError: If the key was never written.
+        """
+        with self._lock:
+            segment_id, offset, length, _ = self._entries[key]
+            return _pread(self._reader(segment_id), length, offset)
+
+    def location(self, key: str) -> Optional[Tuple[int, int, int]]:
+        """Returns the (segment, offset, length) of the newest value, or None.
+
+        The location changes whenever the key is rewritten or compacted.
+        """
+        entry = self._entries.get(key)
+        return entry[:3] if entry is not None else None
+
+    def fingerprint(self, key: str) -> Optional[Tuple[int, int]]:
+        """Returns the (length, CRC-32) of the newest record, or None.
+
+        Unlike the location, the fingerprint survives compaction (which copies
+        records byte for byte), so it serves as a version stamp that stays
+        valid across restarts.
+        """
+        entry = self._entries.get(key)
+        return (entry[2], entry[3]) if entry is not None else None
+
+    def put(self, key: str, value: bytes) -> None:
+        self.put_many([(key, value)])
+
+    def put_many(self, items: Iterable[Tuple[str, bytes]]) -> None:
+        """Appends several records with a single write."""
+        with self._lock:
+            buffer = bytearray()
+            appended = []
+            offset = self._sizes[self._active_id]
+            for key, value in items:
+                encoded_key = key.encode("utf-8")
+                start = offset + len(buffer)
+                checksum = zlib.crc32(encoded_key + value)
+                buffer += _RECORD.pack(checksum, len(encoded_key), len(value))
+                buffer += encoded_key
+                buffer += value
+                appended.append((key, start + _RECORD.size + len(encoded_key), len(value), checksum))
+            if not appended:
+                return
+            self._active.write(buffer)
+            self._active.flush()
+            self._sizes[self._active_id] += len(buffer)
+            for key, value_offset, length, checksum in appended:
+                self._index(key, (self._active_id, value_offset, length, checksum))
+            if self._sizes[self._active_id] >= self._segment_bytes:
+                self._roll()
+
+    def sync(self) -> None:
+        """Forces appended records to stable storage."""
+        with self._lock:
+            self._active.flush()
+            os.fsync(self._active.fileno())
+
+    def iter_keys(self, directory: str = "", cursor: Optional[str] = None) -> Iterator[str]:
+        """Yields keys below `directory` in `path_segments` order; see PathIndex.iter_files."""
+        return self._keys.iter_files(directory, cursor)
+
+    def children(self, directory: str = "") -> Optional[List[Tuple[str, bool]]]:
+        """Immediate entries of a key directory; see PathIndex.children."""
+        return self._keys.children(directory)
+
+    def garbage_ratio(self) -> float:
+        """Fraction of segment bytes taken by superseded records."""
+        with self._lock:
+            total = sum(self._sizes.values())
+            return 1.0 - sum(self._live.values()) / total if total else 0.0
+
+    def compact(self, force: bool = False) -> int:
+        """Rewrites the live records of mostly-garbage sealed segments.
+
+        Args:
+            force: Compact every sealed segment holding any garbage.
+
+        Returns:
+            The number of segment bytes reclaimed.
+        """
+        with self._compaction_lock:
+            return self._compact(force)
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._compactor is not None:
+            self._compactor.join()
+        with self._lock:
+            if self._active.closed:
+                return
+            self._active.flush()
+            self._save_index()
+            self._active.close()
+            for fd in self._readers.values():
+                os.close(fd)
+            self._readers.clear()
+
+    def _index(self, key: str, location: Tuple[int, int, int, int]) -> None:
+        previous = self._entries.get(key)
+        if previous is None:
+            self._keys.add(key)
+        else:
+            self._live[previous[0]] -= _record_size(key, previous[2])
+        self._entries[key] = location
+        self._live[location[0]] = self._live.get(location[0], 0) + _record_size(key, location[2])
+
+    def _roll(self) -> None:
+        # `sync` only covers the active segment, so seal this one durably.
+        os.fsync(self._active.fileno())
+        self._active.close()
+        self._active_id += 1
+        self._sizes[self._active_id] = 0
+        self._live[self._active_id] = 0
+        self._active = open(self._dir / _segment_name(self._active_id), "ab")
+        _fsync_directory(self._dir)
+        # Sealing a segment bounds how much the next open has to replay.
+        self._save_index()
+
+    def _reader(self, segment_id: int) -> int:
+        fd = self._readers.get(segment_id)
+        if fd is None:
+            flags = os.O_RDONLY | getattr(os, "O_BINARY", 0)
+            fd = self._readers[segment_id] = os.open(self._dir / _segment_name(segment_id), flags)
+        return fd
+
+    def _compact(self, force: bool) -> int:
+        with self._lock:
+            candidates = [
+                segment_id
+                for segment_id, size in self._sizes.items()
+                if segment_id != self._active_id
+                and size
+                and (size - self._live[segment_id]) / size >= (1e-9 if force else self._min_garbage_ratio)
+            ]
+        reclaimed = 0
+        for segment_id in sorted(candidates):
+            reclaimed += self._compact_segment(segment_id)
+        if candidates:
+            with self._lock:
+                self._save_index()
+        return reclaimed
+
+    def _compact_segment(self, segment_id: int) -> int:
+        path = self._dir / _segment_name(segment_id)
+        # Sealed segments are immutable, so they can be scanned unlocked;
+        # each record is re-checked against the index under the lock.
+        with open(path, "rb") as handle:
+            records = list(_scan(handle))
+        with self._lock:
+            self.put_many(
+                (key, value)
+                for key, value_offset, value, checksum in records
+                if self._entries.get(key) == (segment_id, value_offset, len(value), checksum)
+            )
+            if self._live[segment_id] > 0:
+                return 0
+            # The copies must be on disk before the only other copy is deleted.
+            self.sync()
+            _fsync_directory(self._dir)
+            fd = self._readers.pop(segment_id, None)
+            if fd is not None:
+                os.close(fd)
+            size = self._sizes.pop(segment_id)
+            del self._live[segment_id]
+            path.unlink()
+            return size
+
+    def _compact_periodically(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            self.compact()
+
+    def _load(self) -> None:
+        segment_ids = sorted(
+            int(path.name[:-len(_SEGMENT_SUFFIX)])
+            for path in self._dir.glob(f"*{_SEGMENT_SUFFIX}")
+            if path.name[:-len(_SEGMENT_SUFFIX)].isdigit()
+        )
+        indexed = self._load_index(segment_ids)
+        for segment_id in segment_ids:
+            path = self._dir / _segment_name(segment_id)
+            start = indexed.get(segment_id, 0)
+            with open(path, "rb+") as handle:
+                handle.seek(start)
+                end = start
+                for key, value_offset, value, checksum in _scan(handle, start):
+                    self._index(key, (segment_id, value_offset, len(value), checksum))
+                    end = value_offset + len(value)
+                if end < os.fstat(handle.fileno()).st_size:
+                    # Torn or corrupt tail from an interrupted append.
+                    handle.truncate(end)
+            self._sizes[segment_id] = end
+            self._live.setdefault(segment_id, 0)
+
+    def _load_index(self, segment_ids: List[int]) -> Dict[int, int]:
+        """Loads the saved index; returns how far into each segment it covers."""
+        try:
+            with open(self._dir / _INDEX_FILE, "r", encoding="utf-8") as handle:
+                data = json.load(handle)
+        except (FileNotFoundError, ValueError):
+            return {}
+        segments = {int(segment_id): size for segment_id, size in data.get("segments", {}).items()}
+        if data.get("version") != _INDEX_VERSION or any(
+            segment_id not in segment_ids or os.path.getsize(self._dir / _segment_name(segment_id)) < size
+            for segment_id, size in segments.items()
+        ):
+            # Stale index (e.g. segments deleted after it was saved): replay everything.
+            return {}
+        for key, segment_id, offset, length, checksum in data["entries"]:
+            self._index(key, (segment_id, offset, length, checksum))
+        return segments
+
+    def _save_index(self) -> None:
+        data = {
+            "version": _INDEX_VERSION,
+            "segments": {str(segment_id): size for segment_id, size in self._sizes.items()},
+            "entries": [[key, *location] for key, location in self._entries.items()],
+        }
+        tmp_path = self._dir / f"{_INDEX_FILE}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(data, handle, separators=(",", ":"))
+        os.replace(tmp_path, self._dir / _INDEX_FILE)
+
+
+def _record_size(key: str, value_length: int) -> int:
+    return _RECORD.size + len(key.encode("utf-8")) + value_length
+
+
+def _scan(handle, offset: int = 0) -> Iterator[Tuple[str, int, bytes, int]]:
+    """Yields (key, value offset, value, checksum) for each intact record from `offset` on."""
+    while True:
+        header = handle.read(_RECORD.size)
+        if len(header) < _RECORD.size:
+            return
+        checksum, key_length, value_length = _RECORD.unpack(header)
+        body = handle.read(key_length + value_length)
+        if len(body) < key_length + value_length or zlib.crc32(body) != checksum:
+            return
+        value_offset = offset + _RECORD.size + key_length
+        yield body[:key_length].decode("utf-8"), value_offset, body[key_length:], checksum
+        offset = value_offset + value_length
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Makes file creations, renames and deletions in `directory` durable, where the platform allows it."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        # Directories cannot be opened on Windows; renames there need no fsync.
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _pread(fd: int, length: int, offset: int) -> bytes:
+    if hasattr(os, "pread"):
+        return os.pread(fd, length, offset)
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.read(fd, length)
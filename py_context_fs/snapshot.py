@@ -0,0 +1,269 @@
+import codecs
+import itertools
+import json
+import mmap
+import os
+import struct
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .core import DEFAULT_CHUNK_SIZE, ContextFile, ContextSource, ContextStat
+from .index import path_segments
+
+# File layout (all integers little-endian):
+#
+#   header      magic, version, path count, view count, and the offsets of
+#               the tables below
+#   blob        path bytes, metadata JSON and view contents (UTF-8), written
+#               in path order
+#   paths       one _PATH_ENTRY per path, sorted by `path_segments`
+#   views       one _VIEW_ENTRY per (path, view); each path owns a contiguous run
+#   names       JSON list of view names, indexed by _VIEW_ENTRY.name_id
+#
+# Offsets are absolute, so a reader only needs the header and can slice the
+# mapped file directly.
+_MAGIC = b"PCFSNAP\x00"
+_VERSION = 1
+_HEADER = struct.Struct("<8sIQQQQQQ")
+_PATH_ENTRY = struct.Struct("<QIIIQI")  # path offset, path length, first view, view count, metadata offset, metadata length
+_VIEW_ENTRY = struct.Struct("<IQQ")  # name id, content offset, content length
+
+
+def freeze_snapshot(source: ContextSource, file_path: str, path: str = "") -> int:
+    """Writes every file listed under `path` in `source` to an immutable snapshot.
+
+    Files are enumerated with `source.ilist(path)` and described with
+    `source.stat`, so every view a source reports is captured (for sources
+    relying on the default `stat`, which only lists 'summary' for
+    summary-only files, 'summary' is also probed with `read`). The snapshot
+    is written to a temporary file and renamed into place, so readers never
+    see a partial file.
+
+    Args:
+        source: The source to freeze (e.g. a populated DictResolver).
+        file_path: Where to write the snapshot.
+        path: Directory of the source to freeze ("" for everything).
+
+    Returns:
+        The number of files written.
+    """
+    names: Dict[str, int] = {}
+    path_table = bytearray()
+    view_table = bytearray()
+    view_count = 0
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, "wb") as handle:
+        handle.write(b"\0" * _HEADER.size)
+        offset = _HEADER.size
+
+        def append(data: bytes) -> int:
+            nonlocal offset
+            start = offset
+            handle.write(data)
+            offset += len(data)
+            return start
+
+        count = 0
+        for file_path_in_source in source.ilist(path):
+            file_stat = source.stat(file_path_in_source)
+            encoded_path = file_path_in_source.encode("utf-8")
+            path_offset = append(encoded_path)
+            metadata = json.dumps(file_stat.metadata, ensure_ascii=False).encode("utf-8") if file_stat.metadata else b""
+            metadata_offset = append(metadata)
+            first_view = view_count
+            views: Dict[str, Optional[ContextFile]] = dict.fromkeys(file_stat.views)
+            if "summary" not in views and type(source).stat is ContextSource.stat:
+                try:
+                    views["summary"] = source.read(file_path_in_source, view="summary")
+                except (FileNotFoundError, ValueError):
+                    pass
+            for view, file_obj in views.items():
+                if file_obj is None:
+                    file_obj = source.read(file_path_in_source, view=view)
+                content = file_obj.content.encode("utf-8")
+                name_id = names.setdefault(view, len(names))
+                view_table += _VIEW_ENTRY.pack(name_id, append(content), len(content))
+                view_count += 1
+            path_table += _PATH_ENTRY.pack(
+                path_offset, len(encoded_path), first_view, view_count - first_view,
+                metadata_offset, len(metadata),
+            )
+            count += 1
+
+        path_table_offset = append(bytes(path_table))
+        view_table_offset = append(bytes(view_table))
+        names_blob = json.dumps(sorted(names, key=names.get), ensure_ascii=False).encode("utf-8")
+        names_offset = append(names_blob)
+        handle.seek(0)
+        handle.write(_HEADER.pack(
+            _MAGIC, _VERSION, count, view_count,
+            path_table_offset, view_table_offset, names_offset, len(names_blob),
+        ))
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp_path, file_path)
+    return count
+
+
+class SnapshotResolver(ContextSource):
+    """Read-only ContextSource over a memory-mapped snapshot file.
+
+    Opening a snapshot maps the file and parses its header; nothing else is
+    loaded. Processes that open the same file share one page-cache copy, and
+    content is decoded straight from the mapping. Paths are looked up by
+    binary search over the sorted path table, and search matches the UTF-8
+    query against the mapped 'default' views without decoding them.
+
+    Example:
+        freeze_snapshot(resolver, "/srv/corpus.snap")   # once, at build time
+        fs.mount("/corpus", SnapshotResolver("/srv/corpus.snap"))  # per worker
+    """
+
+    def __init__(self, file_path: str):
+        with open(file_path, "rb") as handle:
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+        (magic, version, self._path_count, self._view_count, self._path_table,
+         self._view_table, names_offset, names_length) = _HEADER.unpack_from(self._buffer, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self.close()
+            raise ValueError(f"Not a snapshot file (or unsupported version): {file_path}")
+        self._names: List[str] = json.loads(str(self._buffer[names_offset:names_offset + names_length], "utf-8"))
+        self._name_ids = {name: index for index, name in enumerate(self._names)}
+
+    def close(self) -> None:
+        self._buffer.release()
+        self._mmap.close()
+
+    def __enter__(self) -> "SnapshotResolver":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._path_count
+
+    def read(self, path: str, view: str = "default") -> ContextFile:
+        entry = self._entry(path)
+        offset, length = self._view_span(path, entry, view)
+        return ContextFile(content=str(self._buffer[offset:offset + length], "utf-8"), metadata=self._metadata(entry))
+
+    def read_stream(self, path: str, view: str = "default", chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+        offset, length = self._view_span(path, self._entry(path), view)
+        return self._iter_chunks(offset, offset + length, chunk_size)
+
+    def stat(self, path: str) -> ContextStat:
+        entry = self._entry(path)
+        _, _, first_view, view_count, _, _ = entry
+        views = []
+        sizes = {}
+        for index in range(first_view, first_view + view_count):
+            name_id, _, length = _VIEW_ENTRY.unpack_from(self._buffer, self._view_table + index * _VIEW_ENTRY.size)
+            views.append(self._names[name_id])
+            sizes[self._names[name_id]] = length
+        metadata = self._metadata(entry)
+        token_count = metadata.get("token_count")
+        return ContextStat(
+            views=views,
+            sizes=sizes,
+            metadata=metadata,
+            token_count=token_count if isinstance(token_count, int) else None,
+        )
+
+    def list(self, path: str) -> List[str]:
+        return list(self.ilist(path))
+
+    def ilist(self, path: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> Iterator[str]:
+        # Same semantics as DictResolver.list: every file below `path`.
+        directory = "" if path in ("", ".") else path.strip("/")
+        prefix = f"{directory}/" if directory else ""
+        if cursor is not None:
+            if not cursor.startswith(prefix):
+                raise ValueError(f"Cursor '{cursor}' is not below '{path}'")
+            start = self._bisect(path_segments(cursor), right=True)
+        else:
+            # A file named like the directory itself sorts first; skip it.
+            start = self._bisect(path_segments(directory), right=True) if directory else 0
+        return itertools.islice(self._iter_prefix(start, prefix), limit)
+
+    def search(self, query: str) -> List[str]:
+        needle = query.encode("utf-8")
+        default_id = self._name_ids.get("default")
+        if default_id is None:
+            return []
+        results = []
+        for index in range(self._path_count):
+            entry = self._path_entry(index)
+            _, _, first_view, view_count, _, _ = entry
+            for view_index in range(first_view, first_view + view_count):
+                name_id, offset, length = _VIEW_ENTRY.unpack_from(
+                    self._buffer, self._view_table + view_index * _VIEW_ENTRY.size
+                )
+                if name_id == default_id:
+                    if self._mmap.find(needle, offset, offset + length) != -1:
+                        results.append(self._path(entry))
+                    break
+        return results
+
+    def write(self, path: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        raise PermissionError("Snapshots are read-only")
+
+    def _path_entry(self, index: int) -> Tuple[int, int, int, int, int, int]:
+        return _PATH_ENTRY.unpack_from(self._buffer, self._path_table + index * _PATH_ENTRY.size)
+
+    def _path(self, entry: Tuple[int, int, int, int, int, int]) -> str:
+        offset, length = entry[0], entry[1]
+        return str(self._buffer[offset:offset + length], "utf-8")
+
+    def _bisect(self, key: Tuple[str, ...], right: bool = False) -> int:
+        low, high = 0, self._path_count
+        while low < high:
+            middle = (low + high) // 2
+            probe = path_segments(self._path(self._path_entry(middle)))
+            if probe < key or (right and probe == key):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _entry(self, path: str) -> Tuple[int, int, int, int, int, int]:
+        index = self._bisect(path_segments(path))
+        if index < self._path_count:
+            entry = self._path_entry(index)
+            if self._path(entry) == path:
+                return entry
+        raise FileNotFoundError(f"File not found: {path}")
+
+    def _view_span(self, path: str, entry: Tuple[int, int, int, int, int, int], view: str) -> Tuple[int, int]:
+        name_id = self._name_ids.get(view)
+        _, _, first_view, view_count, _, _ = entry
+        for index in range(first_view, first_view + view_count):
+            entry_name, offset, length = _VIEW_ENTRY.unpack_from(
+                self._buffer, self._view_table + index * _VIEW_ENTRY.size
+            )
+            if entry_name == name_id:
+                return offset, length
+        raise ValueError(f"View '{view}' not found for file {path}")
+
+    def _metadata(self, entry: Tuple[int, int, int, int, int, int]) -> Dict[str, Any]:
+        offset, length = entry[4], entry[5]
+        if not length:
+            return {}
+        return json.loads(str(self._buffer[offset:offset + length], "utf-8"))
+
+    def _iter_prefix(self, start: int, prefix: str) -> Iterator[str]:
+        for index in range(start, self._path_count):
+            path = self._path(self._path_entry(index))
+            if not path.startswith(prefix):
+                return
+            yield path
+
+    def _iter_chunks(self, start: int, end: int, chunk_size: int) -> Iterator[str]:
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        for offset in range(start, end, chunk_size):
+            text = decoder.decode(self._buffer[offset:min(offset + chunk_size, end)])
+            if text:
+                yield text
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail